@@ -3,6 +3,10 @@ ASGI config for Industrium project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Потік сповіщень (notifications/stream/) працює лише під ASGI-сервером:
+    uvicorn config.asgi:application --host 0.0.0.0 --port 8000 --workers 4
+Під WSGI (runserver, config/wsgi.py) потік вимкнений, і клієнт опитує notifications/count/.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -14,3 +18,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_asgi_application()
+
+# звіти, що формувались у пулі попереднього процесу, інакше лишились би в черзі назавжди
+from production.reports import schedule_report_recovery  # noqa: E402
+
+schedule_report_recovery()
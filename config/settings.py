@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'corsheaders',
     'rest_framework.authtoken',
     'rest_framework',
@@ -98,6 +99,24 @@ WSGI_APPLICATION = 'config.wsgi.application'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Поблочне завантаження вкладень: тимчасові файли (бажано на тому ж диску, що й MEDIA_ROOT)
+ATTACHMENT_UPLOAD_TEMP_DIR = BASE_DIR / 'uploads_tmp'
+# Сесії без нових частин довше за цей час (секунди) видаляє expire_attachment_uploads
+ATTACHMENT_UPLOAD_EXPIRY = 24 * 60 * 60
+# SHA-256 файлів з multipart-запитів рахується під час прийому (для сховища за вмістом)
+FILE_UPLOAD_HANDLERS = [
+    'production.storage.HashingMemoryFileUploadHandler',
+    'production.storage.HashingTemporaryFileUploadHandler',
+]
+# Мініатюри і превʼю вкладень (зображення, перша сторінка PDF), створюються у фоновому пулі
+ATTACHMENT_THUMBNAIL_SIZE = (320, 320)
+ATTACHMENT_PREVIEW_SIZE = (1280, 1280)
+ATTACHMENT_PREVIEW_QUALITY = 80
+# Віддача файлів веб-сервером: None, 'x-accel-redirect' (nginx) або 'x-sendfile' (Apache/lighttpd)
+ATTACHMENT_DOWNLOAD_OFFLOAD = None
+# internal location nginx, що відповідає MEDIA_ROOT (для x-accel-redirect)
+ATTACHMENT_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 from decouple import config
@@ -113,6 +132,60 @@ DATABASES = {
     }
 }
 
+# Кеш. Зведення для головної сторінки і отримувачі сповіщень скидаються сигналами, тому при
+# кількох процесах (workers) потрібен спільний бекенд, інакше інші процеси не бачать скидання:
+# напр. CACHE_BACKEND=django.core.cache.backends.db.DatabaseCache, CACHE_LOCATION=cache_table
+# (python manage.py createcachetable) або PyMemcacheCache/RedisCache.
+# LocMemCache (типово) — лише для розробки в одному процесі; `check --deploy` про це попереджає.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='industrium'),
+    }
+}
+
+# Скільки секунд зберігається зведення для головної сторінки
+DASHBOARD_CACHE_TIMEOUT = 300
+
+# Фонові задачі (пул потоків у процесі)
+BACKGROUND_WORKERS = 4
+BACKGROUND_TASKS_EAGER = False
+
+# Записувати сповіщення у фоновому пулі, а не в запиті
+NOTIFICATIONS_ASYNC = False
+# Скільки секунд кешуються отримувачі сповіщень (керівники відділів); з кешем, не спільним
+# для процесів, — найдовша затримка, з якою інші процеси бачать зміну керівника
+NOTIFICATION_RECIPIENTS_CACHE_TIMEOUT = 60
+
+# Потік сповіщень (SSE): брокер pub/sub і інтервал keepalive у секундах. Потік працює лише
+# під ASGI-сервером (uvicorn config.asgi:application); під WSGI (runserver, gunicorn без
+# uvicorn-воркерів) він вимкнений, і клієнт опитує notifications/count/.
+NOTIFICATIONS_BROKER = 'production.streams.InProcessBroker'
+NOTIFICATIONS_STREAM_KEEPALIVE = 20
+# Скільки секунд дійсний одноразовий квиток на підключення до потоку
+NOTIFICATIONS_STREAM_TICKET_TTL = 30
+
+# Масові зміни задач (tasks/bulk/): максимум елементів у запиті і розмір пакета INSERT/UPDATE
+TASK_BULK_MAX_ITEMS = 1000
+TASK_BULK_BATCH_SIZE = 500
+
+# Імпорт працівників (employees/import/, import_employees): рядків у пакеті bulk_create
+# і кількість процесів для хешування паролів у команді import_employees (None — за кількістю CPU,
+# 0 — без пулу). API хешує в процесі запиту: пул процесів у багатопотоковому веб-воркері не створюється
+EMPLOYEE_IMPORT_BATCH_SIZE = 500
+EMPLOYEE_IMPORT_HASH_WORKERS = None
+
+# Експорт задач і проєктів (CSV/XLSX): рядків на одне читання з курсора
+EXPORT_CHUNK_SIZE = 2000
+
+# Звіти у PDF: TTF-шрифт з кирилицею (стандартні шрифти PDF її не містять)
+REPORT_PDF_FONT = config('REPORT_PDF_FONT', default='/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf')
+# Звіт у стані running довше за цей час (секунди) вважається перерваним (див. recover_reports)
+REPORT_STALE_AFTER = 30 * 60
+
+# Індекс підказок (відділи, посади, проєкти) у пам'яті процесу: максимальний вік у секундах
+SUGGEST_INDEX_TTL = 300
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
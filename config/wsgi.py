@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# звіти, що формувались у пулі попереднього процесу, інакше лишились би в черзі назавжди
+from production.reports import schedule_report_recovery  # noqa: E402
+
+schedule_report_recovery()
@@ -76,10 +76,10 @@ export default function FilterPopover({ onFilter }) {
             {suggestions.map((s, i) => (
               <li
                 key={i}
-                onClick={() => handleSelect(s.name)}
+                onClick={() => handleSelect(s.label)}
                 className="px-3 py-1 hover:bg-gray-100 cursor-pointer"
               >
-                {s.name}
+                {s.label}
               </li>
             ))}
           </ul>
@@ -99,7 +99,7 @@ export default function FilterPopover({ onFilter }) {
                 onClick={()=>handleSelectName(u)}
                 className="px-3 py-1 hover:bg-gray-100 cursor-pointer"
               >
-                {u.full_name}
+                {u.label}
               </li>
             ))}
           </ul>
@@ -110,7 +110,7 @@ export default function FilterPopover({ onFilter }) {
             <ul className="space-y-1">
               {selectedNames.map((n,i)=>(
                 <li key={i} className="flex justify-between bg-gray-100 px-2 py-1 rounded">
-                  {n.full_name}
+                  {n.label}
                   <button onClick={()=>removeName(i)} className="text-red-500 text-xs">✕</button>
                 </li>
               ))}
@@ -102,10 +102,10 @@ export default function FilterPopover({ onFilter }) {
             {suggestions.map((s, idx) => (
               <li
                 key={idx}
-                onClick={() => handleNameSelect(s.name)}
+                onClick={() => handleNameSelect(s.label)}
                 className="px-3 py-1 hover:bg-gray-100 cursor-pointer"
               >
-                {s.name}
+                {s.label}
               </li>
             ))}
           </ul>
@@ -0,0 +1,52 @@
+import React, { useEffect, useState } from 'react';
+import api from '../api';
+
+// Файли API (мініатюри, превʼю) віддаються лише з токеном, тож <img src> і посилання
+// отримують їх через api як blob і показують через object URL.
+export async function openAuthorizedFile(url) {
+  const { data } = await api.get(url, { responseType: 'blob' });
+  const objectUrl = URL.createObjectURL(data);
+  window.open(objectUrl, '_blank', 'noreferrer');
+  setTimeout(() => URL.revokeObjectURL(objectUrl), 60000);
+}
+
+export default function useAuthorizedFile(url) {
+  const [objectUrl, setObjectUrl] = useState(null);
+
+  useEffect(() => {
+    if (!url) return undefined;
+    let current = null;
+    let cancelled = false;
+
+    api.get(url, { responseType: 'blob' })
+      .then(({ data }) => {
+        if (cancelled) return;
+        current = URL.createObjectURL(data);
+        setObjectUrl(current);
+      })
+      .catch(err => console.error('Не вдалося завантажити файл:', err));
+
+    return () => {
+      cancelled = true;
+      if (current) URL.revokeObjectURL(current);
+      setObjectUrl(null);
+    };
+  }, [url]);
+
+  return objectUrl;
+}
+
+// Мініатюра вкладення; клік відкриває превʼю (або саму мініатюру)
+export function AuthorizedThumbnail({ src, href, alt }) {
+  const objectUrl = useAuthorizedFile(src);
+
+  return (
+    <button type="button" onClick={() => openAuthorizedFile(href || src)} className="p-0 border-0 bg-transparent">
+      {objectUrl ? (
+        <img src={objectUrl} alt={alt} className="w-10 h-10 object-cover rounded" />
+      ) : (
+        <span className="inline-block w-10 h-10 rounded bg-gray-100" />
+      )}
+    </button>
+  );
+}
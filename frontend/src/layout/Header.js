@@ -17,12 +17,16 @@ const titles = {
   '/task/tasks': 'Завдання',
 };
 
+// Інтервал опитування кількості непрочитаних, якщо потік сповіщень недоступний
+const NOTIFICATIONS_POLL_INTERVAL = 30000;
+
 export default function Header() {
   const { pathname } = useLocation();
   const title = titles[pathname] || 'Industrium';
   const navigate = useNavigate();
 
   const [notifications, setNotifications] = useState([]);
+  const [unreadCount, setUnreadCount] = useState(0);
   const [showPopover, setShowPopover] = useState(false);
   const [showLogoutMenu, setShowLogoutMenu] = useState(false);
   const [currentUser, setCurrentUser] = useState(null);
@@ -30,10 +34,89 @@ export default function Header() {
   const popoverRef = useRef(null);
   const logoutMenuRef = useRef(null);
 
+  // Потік сповіщень (SSE): кількість непрочитаних і нові сповіщення без повторних запитів.
+  // Перед кожним підключенням береться новий одноразовий квиток (запит іде з актуальним
+  // access-токеном). Якщо сервер працює під WSGI (503), опитуємо кількість непрочитаних.
   useEffect(() => {
-    api.get('/notifications/unread/').then(res => setNotifications(res.data));
+    if (!localStorage.getItem('access_token')) return undefined;
+
+    let source = null;
+    let retryTimer = null;
+    let pollTimer = null;
+    let attempt = 0;
+    let stopped = false;
+
+    const poll = () => {
+      api.get('/notifications/count/')
+        .then(res => setUnreadCount(res.data.unread))
+        .catch(() => {});
+    };
+
+    const reconnect = () => {
+      // 1, 2, 4 ... 30 секунд між спробами
+      const delay = Math.min(30000, 1000 * 2 ** attempt);
+      attempt += 1;
+      retryTimer = setTimeout(connect, delay);
+    };
+
+    const connect = async () => {
+      let ticket;
+      try {
+        ({ data: { ticket } } = await api.post('/notifications/stream/ticket/'));
+      } catch (err) {
+        if (stopped) return;
+        if (err.response?.status === 503) {
+          poll();
+          pollTimer = setInterval(poll, NOTIFICATIONS_POLL_INTERVAL);
+        } else {
+          reconnect();
+        }
+        return;
+      }
+      if (stopped) return;
+
+      source = new EventSource(
+        `${api.defaults.baseURL}/notifications/stream/?ticket=${encodeURIComponent(ticket)}`
+      );
+      source.onopen = () => {
+        attempt = 0;
+      };
+      // квиток одноразовий, тож автоматичне перепідключення EventSource не спрацює
+      source.onerror = () => {
+        source.close();
+        if (!stopped) reconnect();
+      };
+      source.addEventListener('unread', e => {
+        const data = JSON.parse(e.data);
+        if (data.count !== undefined) {
+          setUnreadCount(data.count);
+        } else {
+          setUnreadCount(c => Math.max(0, c + data.delta));
+        }
+      });
+      source.addEventListener('notification', e => {
+        const data = JSON.parse(e.data);
+        setNotifications(prev => [data.notification, ...prev]);
+        setUnreadCount(c => c + data.delta);
+      });
+    };
+
+    connect();
+    return () => {
+      stopped = true;
+      if (source) source.close();
+      clearTimeout(retryTimer);
+      clearInterval(pollTimer);
+    };
   }, []);
 
+  // Список завантажуємо лише при відкритті
+  useEffect(() => {
+    if (showPopover) {
+      api.get('/notifications/unread/').then(res => setNotifications(res.data));
+    }
+  }, [showPopover]);
+
   useEffect(() => {
     api.get('/auth/profile/')
       .then(res => setCurrentUser(res.data))
@@ -77,9 +160,9 @@ export default function Header() {
         {/* Сповіщення */}
         <button onClick={() => setShowPopover(!showPopover)} className="relative">
           <BellIcon className="h-6 w-6 text-gray-600 cursor-pointer" />
-          {notifications.length > 0 && (
+          {unreadCount > 0 && (
             <span className="absolute top-0 right-0 bg-red-600 text-white text-xs rounded-full px-1">
-              {notifications.length}
+              {unreadCount}
             </span>
           )}
         </button>
@@ -100,7 +100,7 @@ export default function ProjectFilterPopover({ onFilter }) {
                 onClick={() => handleSelectProject(p)}
                 className="px-3 py-1 hover:bg-gray-100 cursor-pointer"
               >
-                {p.name}
+                {p.label}
               </li>
             ))}
           </ul>
@@ -111,7 +111,7 @@ export default function ProjectFilterPopover({ onFilter }) {
             <ul className="space-y-1">
               {selectedProjects.map((p, i) => (
                 <li key={i} className="flex justify-between bg-gray-100 px-2 py-1 rounded">
-                  {p.name}
+                  {p.label}
                   <button onClick={() => removeProject(i)} className="text-red-500 text-xs">✕</button>
                 </li>
               ))}
@@ -3,6 +3,7 @@ import { useParams, useNavigate } from 'react-router-dom';
 import api from '../../api';
 import useUserRole from '../../hooks/useUserRole';
 import useDeleteItem from '../../hooks/useDeleteItem';
+import { AuthorizedThumbnail } from '../../hooks/useAuthorizedFile';
 
 export default function ProjectDetail() {
   const { id } = useParams();
@@ -209,7 +210,7 @@ export default function ProjectDetail() {
                 <p className="text-sm text-gray-500">Немає прикріплених файлів</p>
               ) : (
                 project.files.map(f => {
-                  const fileName = decodeURIComponent(f.file.split('/').pop());
+                  const fileName = f.filename || decodeURIComponent(f.file.split('/').pop());
                   const ext = fileName.split('.').pop().toLowerCase();
 
                   let icon = '📎';
@@ -224,7 +225,11 @@ export default function ProjectDetail() {
                   return (
                     <div key={f.id} className="flex items-center justify-between text-sm">
                       <div className="flex items-center space-x-2">
-                        <span>{icon}</span>
+                        {f.thumbnail ? (
+                          <AuthorizedThumbnail src={f.thumbnail} href={f.preview} alt={fileName} />
+                        ) : (
+                          <span>{icon}</span>
+                        )}
                         <a
                           href={f.file}
                           download={fileName}
@@ -136,7 +136,7 @@ export default function TaskFilterPopover({ onFilter }) {
         <ul className="max-h-32 overflow-y-auto border rounded mb-2">
           {titleSuggestions.map((task, i) => (
             <li key={i} onClick={() => handleSelect(task, setSelectedTitles, setTitleQuery)} className="px-3 py-1 hover:bg-gray-100 cursor-pointer">
-              {task.title}
+              {task.label}
             </li>
           ))}
         </ul>
@@ -146,7 +146,7 @@ export default function TaskFilterPopover({ onFilter }) {
             <ul className="space-y-1">
               {selectedTitles.map((t, i) => (
                 <li key={i} className="flex justify-between bg-gray-100 px-2 py-1 rounded">
-                  {t.title}
+                  {t.label}
                   <button onClick={() => handleRemove(i, setSelectedTitles)} className="text-red-500 text-xs">✕</button>
                 </li>
               ))}
@@ -186,7 +186,7 @@ export default function TaskFilterPopover({ onFilter }) {
           <ul className="max-h-32 overflow-y-auto border rounded mb-2">
             {assigneeSuggestions.map((a, i) => (
               <li key={i} onClick={() => handleSelect(a, setSelectedAssignees, setAssigneeQuery)} className="px-3 py-1 hover:bg-gray-100 cursor-pointer">
-                {a.full_name}
+                {a.label}
               </li>
             ))}
           </ul>
@@ -194,7 +194,7 @@ export default function TaskFilterPopover({ onFilter }) {
             <ul className="space-y-1 mb-3">
               {selectedAssignees.map((a, i) => (
                 <li key={i} className="flex justify-between bg-gray-100 px-2 py-1 rounded">
-                  {a.full_name}
+                  {a.label}
                   <button onClick={() => handleRemove(i, setSelectedAssignees)} className="text-red-500 text-xs">✕</button>
                 </li>
               ))}
@@ -214,7 +214,7 @@ export default function TaskFilterPopover({ onFilter }) {
           <ul className="max-h-32 overflow-y-auto border rounded mb-2">
             {projectSuggestions.map((p, i) => (
               <li key={i} onClick={() => handleSelect(p, setSelectedProjects, setProjectQuery)} className="px-3 py-1 hover:bg-gray-100 cursor-pointer">
-                {p.name}
+                {p.label}
               </li>
             ))}
           </ul>
@@ -222,7 +222,7 @@ export default function TaskFilterPopover({ onFilter }) {
             <ul className="space-y-1 mb-3">
               {selectedProjects.map((p, i) => (
                 <li key={i} className="flex justify-between bg-gray-100 px-2 py-1 rounded">
-                  {p.name}
+                  {p.label}
                   <button onClick={() => handleRemove(i, setSelectedProjects)} className="text-red-500 text-xs">✕</button>
                 </li>
               ))}
@@ -4,6 +4,7 @@ import { useParams, useNavigate } from 'react-router-dom';
 import api from '../../api';
 import useUserRole from '../../hooks/useUserRole';
 import useDeleteItem from '../../hooks/useDeleteItem';
+import { AuthorizedThumbnail } from '../../hooks/useAuthorizedFile';
 
 export default function TaskDetail() {
   const { id } = useParams();
@@ -261,7 +262,7 @@ export default function TaskDetail() {
                 <p className="text-sm text-gray-500">Немає прикріплених файлів</p>
               ) : (
                 task.files.map(f => {
-                  const fileName = decodeURIComponent(f.file.split('/').pop());
+                  const fileName = f.filename || decodeURIComponent(f.file.split('/').pop());
                   const ext = fileName.split('.').pop().toLowerCase();
 
                   let icon = '📎';
@@ -276,7 +277,11 @@ export default function TaskDetail() {
                   return (
                     <div key={f.id} className="flex items-center justify-between text-sm">
                       <div className="flex items-center space-x-2">
-                        <span>{icon}</span>
+                        {f.thumbnail ? (
+                          <AuthorizedThumbnail src={f.thumbnail} href={f.preview} alt={fileName} />
+                        ) : (
+                          <span>{icon}</span>
+                        )}
                         <a
                           href={f.file}
                           download={fileName}
@@ -3,7 +3,8 @@ from .models import (
     Position, Department, User, Project, Order, Task,
     Material, Product, Equipment, Report,
     MaterialUsageLog, EmployeePerformance,
-    Comments, Attachment, TaskNotification
+    Comments, Attachment, TaskNotification, NotificationCounter,
+    TaskStatusTransition
 )
 
 
@@ -56,8 +57,8 @@ class TaskAdmin(admin.ModelAdmin):
 
 @admin.register(Report)
 class ReportAdmin(admin.ModelAdmin):
-    list_display = ('title', 'report_type', 'created_by', 'created_at')
-    list_filter = ('report_type',)
+    list_display = ('title', 'report_type', 'format', 'status', 'created_by', 'created_at')
+    list_filter = ('report_type', 'format', 'status')
     search_fields = ('title', 'description')
     autocomplete_fields = ('created_by', 'project', 'order')
 
@@ -114,3 +115,17 @@ class TaskNotificationAdmin(admin.ModelAdmin):
     list_display = ('task', 'sender', 'recipient', 'is_read', 'created_at')
     list_filter = ('is_read', 'created_at')
     autocomplete_fields = ('task', 'sender', 'recipient')
+
+
+
+@admin.register(NotificationCounter)
+class NotificationCounterAdmin(admin.ModelAdmin):
+    list_display = ('user', 'unread')
+    autocomplete_fields = ('user',)
+
+
+@admin.register(TaskStatusTransition)
+class TaskStatusTransitionAdmin(admin.ModelAdmin):
+    list_display = ('task', 'from_status', 'to_status', 'assignee', 'actor', 'at')
+    list_filter = ('to_status', 'at')
+    autocomplete_fields = ('task', 'assignee', 'actor')
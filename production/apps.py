@@ -6,4 +6,5 @@ class ProductionConfig(AppConfig):
     name = 'production'
     
     def ready(self):
-        import production.signals
\ No newline at end of file
+        import production.signals
+        import production.checks
\ No newline at end of file
@@ -0,0 +1,346 @@
+import hashlib
+import mimetypes
+import os
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils import timezone
+from django.utils.http import content_disposition_header, http_date
+
+from .models import Attachment, AttachmentUpload, Blob
+from .previews import PREVIEW_SUFFIX, THUMBNAIL_SUFFIX, delete_previews, schedule_previews
+from .storage import attachment_storage, blob_name, blob_sha256, is_blob_name
+
+# Розмір блоку при читанні тіла запиту і віддачі файлу
+STREAM_BLOCK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class UploadError(Exception):
+    def __init__(self, message, offset=None):
+        super().__init__(message)
+        self.offset = offset
+
+
+class UploadOffsetMismatch(UploadError):
+    """Клієнт надіслав частину не з того місця — має продовжити з offset."""
+
+
+class PartFile(File):
+    """Тимчасовий файл сесії: FileSystemStorage переносить його, а не копіює."""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+# SHA-256 незавершених завантажень у цьому процесі: id сесії -> (offset, hasher).
+# Якщо частини приходили в інший процес, хеш рахується при finalize окремим проходом.
+_upload_hashers = {}
+
+
+def upload_temp_path(upload):
+    return os.path.join(settings.ATTACHMENT_UPLOAD_TEMP_DIR, f'{upload.pk}.part')
+
+
+def _upload_hasher(upload):
+    if upload.offset == 0:
+        return hashlib.sha256()
+    offset, hasher = _upload_hashers.pop(upload.pk, (None, None))
+    return hasher if offset == upload.offset else None
+
+
+def append_chunk(upload_id, user, offset, stream):
+    """
+    Дописує частину з потоку тіла запиту у тимчасовий файл, не буферизуючи її в пам'яті.
+    Рядок сесії блокується, тож паралельні запити для однієї сесії виконуються по черзі.
+    """
+    with transaction.atomic():
+        upload = AttachmentUpload.objects.select_for_update().get(pk=upload_id, uploaded_by=user)
+        if offset != upload.offset:
+            raise UploadOffsetMismatch('Невірний зсув частини', upload.offset)
+
+        limit = None if upload.size is None else upload.size - upload.offset
+        hasher = _upload_hasher(upload)
+        path = upload_temp_path(upload)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        written = 0
+        # r+b: після обірваного запиту у файлі можуть бути зайві байти за offset
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as part:
+            part.seek(upload.offset)
+            for block in iter(lambda: stream.read(STREAM_BLOCK_SIZE), b''):
+                written += len(block)
+                if limit is not None and written > limit:
+                    raise UploadError('Частина виходить за межі заявленого розміру', upload.offset)
+                part.write(block)
+                if hasher is not None:
+                    hasher.update(block)
+            part.truncate()
+
+        upload.offset += written
+        upload.save(update_fields=['offset', 'updated_at'])
+        if hasher is not None:
+            _upload_hashers[upload.pk] = (upload.offset, hasher)
+        return upload
+
+
+def finalize_upload(upload_id, user):
+    with transaction.atomic():
+        upload = AttachmentUpload.objects.select_for_update().get(pk=upload_id, uploaded_by=user)
+        if upload.size is not None and upload.offset != upload.size:
+            raise UploadError('Файл завантажено не повністю', upload.offset)
+
+        path = upload_temp_path(upload)
+        if not os.path.exists(path):
+            open(path, 'wb').close()
+        # невдалий шматок міг дописати байти за offset — до вмісту вони не належать
+        os.truncate(path, upload.offset)
+
+        attachment = Attachment(
+            filename=upload.filename,
+            description=upload.description,
+            uploaded_by=upload.uploaded_by,
+            content_type=upload.content_type,
+            object_id=upload.object_id,
+        )
+        offset, hasher = _upload_hashers.pop(upload.pk, (None, None))
+        with open(path, 'rb') as part:
+            content = PartFile(part)
+            if hasher is not None and offset == upload.offset:
+                content.sha256 = hasher.hexdigest()
+            attachment.file.save(upload.filename, content, save=False)
+        attachment.save()
+        upload.delete()
+    # якщо такий вміст уже був у сховищі, тимчасовий файл не переноситься
+    if os.path.exists(path):
+        os.remove(path)
+    return attachment
+
+
+def discard_upload(upload):
+    path = upload_temp_path(upload)
+    _upload_hashers.pop(upload.pk, None)
+    upload.delete()
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def expire_uploads(max_age=None):
+    """
+    Видаляє сесії завантаження, у які нічого не дописувалось довше за max_age
+    (ATTACHMENT_UPLOAD_EXPIRY), разом з тимчасовими файлами, а також файли без сесії.
+    Повертає кількість видалених сесій.
+    """
+    if max_age is None:
+        max_age = timedelta(seconds=settings.ATTACHMENT_UPLOAD_EXPIRY)
+    cutoff = timezone.now() - max_age
+    expired = list(AttachmentUpload.objects.filter(updated_at__lt=cutoff))
+    for upload in expired:
+        discard_upload(upload)
+
+    temp_dir = settings.ATTACHMENT_UPLOAD_TEMP_DIR
+    if os.path.isdir(temp_dir):
+        active = {str(pk) for pk in AttachmentUpload.objects.values_list('pk', flat=True)}
+        for entry in os.scandir(temp_dir):
+            upload_id, ext = os.path.splitext(entry.name)
+            # файл сесії, якої вже немає (напр. процес упав між delete і remove)
+            if ext == '.part' and upload_id not in active and entry.stat().st_mtime < cutoff.timestamp():
+                os.remove(entry.path)
+    return len(expired)
+
+
+def attach_existing_blob(sha256, size, filename, **fields):
+    """
+    Якщо вміст з таким SHA-256 і розміром уже є у сховищі, створює вкладення без передачі файлу.
+    Повертає None, якщо блоба немає.
+    """
+    name = blob_name(sha256.lower())
+    with transaction.atomic():
+        # блокування не дає одночасно видалити блоб, на який більше ніхто не посилається
+        blob = Blob.objects.select_for_update().filter(name=name, size=size).first()
+        if blob is None or not attachment_storage.exists(name):
+            return None
+        attachment = Attachment(file=name, filename=filename, blob=blob, **fields)
+        attachment.save()
+        return attachment
+
+
+def retain_blob(name):
+    """
+    Збільшує лічильник посилань на блоб; для нового вмісту створює Blob і ставить
+    у чергу створення превʼю. Повертає id блоба (None для файлів поза сховищем за вмістом).
+    """
+    if not is_blob_name(name):
+        return None
+    blobs = Blob.objects.filter(name=name)
+    if blobs.update(ref_count=F('ref_count') + 1):
+        return blobs.values_list('pk', flat=True).first()
+    try:
+        with transaction.atomic():
+            blob = Blob.objects.create(
+                name=name, sha256=blob_sha256(name),
+                size=attachment_storage.size(name), ref_count=1,
+            )
+    except IntegrityError:
+        blobs.update(ref_count=F('ref_count') + 1)
+        return blobs.values_list('pk', flat=True).first()
+    schedule_previews(blob.pk)
+    return blob.pk
+
+
+def release_blob(name):
+    if not is_blob_name(name):
+        return
+    Blob.objects.filter(name=name, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+    transaction.on_commit(lambda: delete_unreferenced_blob(name))
+
+
+def delete_unreferenced_blob(name):
+    with transaction.atomic():
+        blob = Blob.objects.select_for_update().filter(name=name, ref_count=0).first()
+        if blob is None:
+            return
+        attachment_storage.delete(name)
+        delete_previews(blob)
+        blob.delete()
+
+
+class FileRange:
+    """Обмежене читання файлу з позиції start довжиною length."""
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.name = file.name
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+class AttachmentFileResponse(FileResponse):
+    block_size = STREAM_BLOCK_SIZE
+
+
+def parse_range(header, size):
+    """
+    Повертає (start, end) включно для одного діапазону "bytes=..." або None,
+    якщо заголовок не підтримується (кілька діапазонів тощо) — тоді віддається весь файл.
+    ValueError, якщо діапазон не перетинається з файлом (для порожнього файлу — будь-який).
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if size == 0:
+        raise ValueError(header)
+    if not first:
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def file_etag(stat):
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def etag_matches(header, etag):
+    """If-None-Match: список тегів через кому або "*"; слабке порівняння (префікс W/ ігнорується)."""
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag == '*':
+            return True
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag and tag == etag:
+            return True
+    return False
+
+
+def download_response(request, attachment):
+    return stored_file_response(request, attachment.file.name, attachment.display_name)
+
+
+def preview_response(request, attachment, field):
+    """Мініатюра (field='thumbnail') або превʼю ('preview') вкладення; 404, доки їх не створено."""
+    name = getattr(attachment.blob, field, '') if attachment.blob_id else ''
+    if not name:
+        raise Http404('Превʼю ще не створено')
+    suffix = THUMBNAIL_SUFFIX if field == 'thumbnail' else PREVIEW_SUFFIX
+    return stored_file_response(request, name, os.path.splitext(attachment.display_name)[0] + suffix)
+
+
+def stored_file_response(request, name, filename):
+    """
+    Віддача файлу сховища вкладень: ETag/If-None-Match, один діапазон Range (206/416) через FileResponse.
+    Якщо налаштовано ATTACHMENT_DOWNLOAD_OFFLOAD, файл віддає веб-сервер.
+    """
+    path = attachment_storage.path(name)
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    offload = settings.ATTACHMENT_DOWNLOAD_OFFLOAD
+
+    if offload:
+        response = HttpResponse(content_type=content_type)
+        if offload == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = settings.ATTACHMENT_ACCEL_REDIRECT_PREFIX + name
+        else:
+            response['X-Sendfile'] = path
+        response['Content-Disposition'] = content_disposition_header(False, filename)
+        return response
+
+    stat = os.stat(path)
+    etag = file_etag(stat)
+    if etag_matches(request.headers.get('If-None-Match', ''), etag):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    byte_range = None
+    range_header = request.headers.get('Range')
+    # If-Range: діапазон лише для тієї ж версії файлу, інакше весь файл
+    if range_header and request.headers.get('If-Range', etag) == etag:
+        try:
+            byte_range = parse_range(range_header, stat.st_size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+
+    file = open(path, 'rb')
+    if byte_range is None:
+        response = AttachmentFileResponse(file, content_type=content_type, filename=filename)
+    else:
+        start, end = byte_range
+        response = AttachmentFileResponse(
+            FileRange(file, start, end - start + 1), status=206,
+            content_type=content_type, filename=filename,
+        )
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    return response
@@ -0,0 +1,78 @@
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'BACKGROUND_WORKERS', 4),
+                thread_name_prefix='industrium-bg',
+            )
+    return _executor
+
+
+def _run(func, args, kwargs):
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        # з'єднання з БД прив'язані до потоку — закриваємо їх після виконання
+        connections.close_all()
+
+
+def submit(func, *args, **kwargs):
+    """
+    Виконує func у фоновому пулі потоків поточного процесу.
+    Якщо BACKGROUND_TASKS_EAGER = True, виконує одразу (зручно для тестів).
+    """
+    if getattr(settings, 'BACKGROUND_TASKS_EAGER', False):
+        future = Future()
+        try:
+            future.set_result(func(*args, **kwargs))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+    return get_executor().submit(_run, func, args, kwargs)
+
+
+class CommitBatch:
+    """
+    Callback після коміту, спільний для всіх змін у межах транзакції (див. commit_batch).
+    Підкласи накопичують дані й виконують дію в run().
+    """
+    done = False
+
+    def __call__(self):
+        self.done = True
+        self.run()
+
+    def run(self):
+        raise NotImplementedError
+
+
+def commit_batch(factory, using=None):
+    """
+    Екземпляр factory, зареєстрований в transaction.on_commit поточної транзакції:
+    при першому виклику створюється й реєструється, далі повертається той самий.
+    Реєстр зберігається на з'єднанні і тримає слабкі посилання: після коміту чи відкату
+    Django відпускає callback, і запис зникає сам.
+    Поза транзакцією повертає None — дію слід виконати одразу.
+    """
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        return None
+    registry = connection.__dict__.setdefault('commit_batches', weakref.WeakValueDictionary())
+    batch = registry.get(factory)
+    if batch is None or batch.done:
+        batch = registry[factory] = factory()
+        transaction.on_commit(batch, using=using)
+    return batch
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core import checks
+
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Скидання кешу зведення (версія в кеші) має бачити кожен процес."""
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if backend in LOCAL_CACHE_BACKENDS:
+        return [checks.Warning(
+            f"Кеш за замовчуванням ({backend}) не спільний для процесів: скидання кешу "
+            "зведення в одному процесі не бачать інші.",
+            hint="Вкажіть спільний бекенд через CACHE_BACKEND/CACHE_LOCATION (DatabaseCache, Memcached, Redis).",
+            id='production.W001',
+        )]
+    return []
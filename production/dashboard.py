@@ -0,0 +1,190 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .background import CommitBatch, commit_batch
+from .models import Project, Task, TaskDailyStats
+
+ACTIVE_PROJECT_STATUSES = ['InProgress', 'Planned']
+WEEKS_IN_SUMMARY = 4
+UPCOMING_DAYS = 30
+
+CACHE_VERSION_KEY = 'dashboard:summary:version'
+CACHE_HITS_KEY = 'dashboard:summary:hits'
+CACHE_MISSES_KEY = 'dashboard:summary:misses'
+
+
+def task_counters(start_of_month, today):
+    """Усі лічильники задач за місяць одним запитом."""
+    tasks = Task.objects.filter(created_at__date__gte=start_of_month)
+    return tasks.aggregate(
+        tasks_done=Count('id', filter=Q(status='Completed')),
+        tasks_in_progress=Count('id', filter=Q(status='InProgress')),
+        tasks_overdue=Count('id', filter=Q(status='PendingConfirmation', due_date__lt=today)),
+        uncompleted_tasks_count=Count('id', filter=Q(status__in=['InProgress', 'PendingConfirmation'])),
+    )
+
+
+def weekly_tasks(start_of_month):
+    """Кількість створених задач по тижнях місяця з денної статистики (без читання задач)."""
+    last_day = start_of_month + timedelta(weeks=WEEKS_IN_SUMMARY) - timedelta(days=1)
+    per_day = (
+        TaskDailyStats.objects
+        .filter(dimension='total', key=0, date__range=(start_of_month, last_day))
+        .values_list('date', 'created')
+    )
+
+    buckets = [0] * WEEKS_IN_SUMMARY
+    for day, count in per_day:
+        buckets[(day - start_of_month).days // 7] += count
+    return [{"week": f"{i + 1} тиждень", "tasks": count} for i, count in enumerate(buckets)]
+
+
+def projects_progress():
+    """Відсоток завершених задач для кожного активного проєкту одним згрупованим запитом."""
+    rows = (
+        Project.objects
+        .filter(status__in=ACTIVE_PROJECT_STATUSES)
+        .annotate(
+            total=Count('tasks'),
+            completed=Count('tasks', filter=Q(tasks__status='Completed')),
+        )
+        .values('id', 'name', 'total', 'completed')
+    )
+    return [
+        {
+            'id': row['id'],
+            'name': row['name'],
+            'percent': round((row['completed'] / row['total'] * 100), 1) if row['total'] > 0 else 0,
+        }
+        for row in rows
+    ]
+
+
+def project_counters(start_of_month):
+    return Project.objects.aggregate(
+        active_projects=Count('id', filter=Q(status__in=ACTIVE_PROJECT_STATUSES, start_date__gte=start_of_month)),
+        completed_projects=Count('id', filter=Q(status='Completed', end_date__gte=start_of_month)),
+    )
+
+
+def upcoming_tasks(today):
+    """Легка проєкція задач із дедлайном у найближчі UPCOMING_DAYS днів."""
+    status_display = dict(Task.STATUS_CHOICES)
+    rows = (
+        Task.objects
+        .filter(due_date__gte=today, due_date__lte=today + timedelta(days=UPCOMING_DAYS))
+        .order_by('due_date', 'id')
+        .values(
+            'id', 'title', 'status', 'priority', 'due_date',
+            'assignee', 'assignee__last_name', 'assignee__first_name',
+            'project', 'project__name',
+        )
+    )
+    return [
+        {
+            'id': row['id'],
+            'title': row['title'],
+            'status': row['status'],
+            'status_display': status_display.get(row['status'], row['status']),
+            'priority': row['priority'],
+            'due_date': row['due_date'],
+            'assignee': row['assignee'],
+            'assignee_name': f"{row['assignee__last_name']} {row['assignee__first_name']}",
+            'project': row['project'],
+            'project_name': row['project__name'],
+        }
+        for row in rows
+    ]
+
+
+def build_dashboard_summary(today=None):
+    """
+    Зведення для головної сторінки. Кількість запитів стала і не залежить
+    від кількості активних проєктів чи задач.
+    """
+    today = today or timezone.now().date()
+    start_of_month = today.replace(day=1)
+
+    summary = {}
+    summary.update(task_counters(start_of_month, today))
+    summary['weekly_tasks'] = weekly_tasks(start_of_month)
+    summary.update(project_counters(start_of_month))
+    summary['upcoming_tasks'] = upcoming_tasks(today)
+    summary['projects_progress'] = projects_progress()
+    return summary
+
+
+# === Кеш зведення ===
+def _incr(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def _cache_version():
+    # time_ns як початкове значення: якщо ключ версії витіснено, старі записи не підхопляться
+    return cache.get_or_set(CACHE_VERSION_KEY, time.time_ns, None)
+
+
+def summary_cache_key(today):
+    # зведення однакове для всіх ролей, тож один запис на день
+    return f"dashboard:summary:{_cache_version()}:{today:%Y-%m}:{today.day}"
+
+
+def get_dashboard_summary(today=None):
+    """
+    Зведення з кешу (окремо для кожного місяця/дня).
+    При влучанні в кеш до БД не звертаємося.
+    Версія ключа береться до побудови, тож зведення, побудоване паралельно
+    зі скиданням кешу, записується під старою версією і не підхоплюється.
+    """
+    today = today or timezone.now().date()
+    key = summary_cache_key(today)
+    summary = cache.get(key)
+    if summary is not None:
+        _incr(CACHE_HITS_KEY)
+        return summary
+
+    _incr(CACHE_MISSES_KEY)
+    summary = build_dashboard_summary(today)
+    cache.set(key, summary, getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300))
+    return summary
+
+
+def invalidate_dashboard_summary():
+    try:
+        cache.incr(CACHE_VERSION_KEY)
+    except ValueError:
+        cache.set(CACHE_VERSION_KEY, time.time_ns(), None)
+
+
+class DashboardInvalidation(CommitBatch):
+    def run(self):
+        invalidate_dashboard_summary()
+
+
+def schedule_dashboard_invalidation(using=None):
+    """
+    Скидає кеш зведення після коміту поточної транзакції (один раз на транзакцію):
+    інакше паралельний запит встиг би закешувати ще незакомічений стан.
+    """
+    if commit_batch(DashboardInvalidation, using) is None:
+        invalidate_dashboard_summary()
+
+
+def dashboard_cache_stats():
+    hits = cache.get(CACHE_HITS_KEY, 0)
+    misses = cache.get(CACHE_MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 3) if total else 0,
+    }
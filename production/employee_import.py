@@ -0,0 +1,230 @@
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from .models import Department, Position, User
+from .notifications import invalidate_recipients
+from .serializers import generate_password, generate_username
+
+# Назви колонок у файлі -> поле User. Порівняння без урахування регістру.
+COLUMN_ALIASES = {
+    'last_name': 'last_name', 'прізвище': 'last_name',
+    'first_name': 'first_name', "ім'я": 'first_name', 'імʼя': 'first_name',
+    'middle_name': 'middle_name', 'по батькові': 'middle_name',
+    'email': 'email', 'e-mail': 'email', 'пошта': 'email',
+    'phone_number': 'phone_number', 'phone': 'phone_number', 'телефон': 'phone_number',
+    'department': 'department', 'відділ': 'department',
+    'position': 'position', 'посада': 'position',
+    'role': 'role', 'роль': 'role',
+    'password': 'password', 'пароль': 'password',
+}
+REQUIRED_COLUMNS = ('last_name', 'first_name', 'email', 'department', 'position')
+ROLES = {value.casefold(): value for value, _ in User.ROLE_CHOICES}
+ROLES.update({label.casefold(): value for value, label in User.ROLE_CHOICES})
+
+
+class EmployeeImportError(Exception):
+    pass
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        # числові телефони з XLSX
+        value = int(value)
+    return str(value).strip()
+
+
+def _rows_from_table(rows):
+    """Перший рядок — заголовок; повертає (номер рядка у файлі, словник поле -> значення)."""
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        raise EmployeeImportError('Файл порожній')
+    columns = [COLUMN_ALIASES.get(_cell(name).casefold()) for name in header]
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise EmployeeImportError(f"Немає колонок: {', '.join(missing)}")
+
+    for number, row in enumerate(rows, start=2):
+        values = {name: _cell(value) for name, value in zip(columns, row) if name}
+        if any(values.values()):
+            yield number, values
+
+
+def read_rows(file, filename):
+    """
+    Потокове читання CSV або XLSX (за розширенням): рядки не завантажуються у пам'ять усі разом.
+    file — бінарний файл.
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == '.xlsx':
+        from openpyxl import load_workbook
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        try:
+            yield from _rows_from_table(workbook.active.iter_rows(values_only=True))
+        finally:
+            workbook.close()
+    elif ext == '.csv':
+        text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+        try:
+            sample = text.read(4096)
+            text.seek(0)
+            try:
+                # Excel з українською локаллю зберігає CSV з крапкою з комою
+                dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+            except csv.Error:
+                dialect = csv.excel
+            yield from _rows_from_table(csv.reader(text, dialect))
+        finally:
+            text.detach()
+    else:
+        raise EmployeeImportError('Підтримуються файли .csv і .xlsx')
+
+
+class EmployeeImporter:
+    """
+    Імпорт працівників пакетами по EMPLOYEE_IMPORT_BATCH_SIZE рядків: відділи й посади
+    шукаються в словниках у пам'яті, запис — bulk_create. Помилки рядків збираються в errors,
+    решта рядків імпортується.
+    Паролі хешуються в поточному процесі; пул із workers процесів (None — за кількістю CPU)
+    — лише для окремого процесу команди import_employees, не для веб-воркера.
+    """
+
+    def __init__(self, workers=0, batch_size=None):
+        self.workers = workers
+        self.batch_size = batch_size or settings.EMPLOYEE_IMPORT_BATCH_SIZE
+        self.departments = {name.casefold(): pk for pk, name in Department.objects.values_list('pk', 'name')}
+        self.positions = {
+            (department_id, name.casefold()): pk
+            for pk, department_id, name in Position.objects.values_list('pk', 'department_id', 'name')
+        }
+        self.seen_emails = set()
+        self.created = []
+        self.errors = []
+
+    def run(self, rows):
+        # 0 — хешувати в поточному процесі
+        pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers != 0 else None
+        try:
+            rows = iter(rows)
+            while batch := list(islice(rows, self.batch_size)):
+                self.import_batch(batch, pool)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        if self.created:
+            invalidate_recipients()
+        return self
+
+    def import_batch(self, batch, pool):
+        emails = {values['email'] for _, values in batch if values.get('email')}
+        taken = {email.casefold() for email in User.objects.filter(email__in=emails).values_list('email', flat=True)}
+
+        valid = []
+        for number, values in batch:
+            errors, fields = self.validate(values, taken)
+            if errors:
+                self.errors.append({'row': number, 'errors': errors})
+            else:
+                valid.append((number, fields))
+        if not valid:
+            return
+
+        passwords = [fields.pop('password') for _, fields in valid]
+        hashes = pool.map(make_password, passwords, chunksize=8) if pool else map(make_password, passwords)
+        users = [
+            User(username=generate_username(fields['email']), password=password_hash, **fields)
+            for (_, fields), password_hash in zip(valid, hashes)
+        ]
+        self.fix_username_collisions(users)
+
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+        except IntegrityError:
+            # паралельний запис з тим самим email/логіном: зберігаємо по одному, щоб знайти рядок
+            users = self.save_one_by_one(valid, users)
+
+        for (number, _), user, password in zip(valid, users, passwords):
+            if user is not None:
+                self.created.append({'row': number, 'id': user.pk, 'username': user.username, 'password': password})
+
+    def validate(self, values, taken):
+        errors = {}
+        for name in REQUIRED_COLUMNS:
+            if not values.get(name):
+                errors[name] = "Обов'язкове поле"
+
+        email = values.get('email', '')
+        if email:
+            try:
+                validate_email(email)
+            except ValidationError:
+                errors['email'] = 'Невірний email'
+            else:
+                if email.casefold() in taken or email.casefold() in self.seen_emails:
+                    errors['email'] = 'Працівник з таким email уже існує'
+
+        department_id = self.departments.get(values.get('department', '').casefold())
+        if values.get('department') and department_id is None:
+            errors['department'] = 'Відділ не знайдено'
+        position_id = self.positions.get((department_id, values.get('position', '').casefold()))
+        if values.get('position') and department_id is not None and position_id is None:
+            errors['position'] = 'Посаду не знайдено у відділі'
+
+        role = ROLES.get(values.get('role', '').casefold()) if values.get('role') else 'Worker'
+        if role is None:
+            errors['role'] = 'Невідома роль'
+
+        if errors:
+            return errors, None
+        self.seen_emails.add(email.casefold())
+        return None, {
+            'last_name': values['last_name'],
+            'first_name': values['first_name'],
+            'middle_name': values.get('middle_name', ''),
+            'email': email,
+            'phone_number': values.get('phone_number', ''),
+            'department_id': department_id,
+            'position_id': position_id,
+            'role': role,
+            'password': values.get('password') or generate_password(),
+        }
+
+    @staticmethod
+    def fix_username_collisions(users):
+        names = {user.username for user in users}
+        existing = set(User.objects.filter(username__in=names).values_list('username', flat=True))
+        used = set()
+        for user in users:
+            while user.username in existing or user.username in used:
+                user.username = generate_username(user.email)
+            used.add(user.username)
+
+    def save_one_by_one(self, valid, users):
+        saved = []
+        for (number, _), user in zip(valid, users):
+            try:
+                with transaction.atomic():
+                    user.save()
+            except IntegrityError:
+                self.errors.append({'row': number, 'errors': {'email': 'Працівник з таким email уже існує'}})
+                saved.append(None)
+            else:
+                saved.append(user)
+        return saved
+
+
+def import_employees(file, filename, **options):
+    """Імпортує працівників з CSV/XLSX. Повертає EmployeeImporter з created і errors."""
+    return EmployeeImporter(**options).run(read_rows(file, filename))
@@ -0,0 +1,267 @@
+import csv
+import io
+import re
+import zipfile
+from datetime import date, datetime
+from itertools import chain, islice
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils.http import content_disposition_header
+from django.utils.timezone import localtime
+
+from .models import Project, Task
+
+# Розмір буфера, після якого накопичені рядки віддаються клієнту
+STREAM_BUFFER_SIZE = 64 * 1024
+# Обмеження Excel — 1 048 576 рядків на аркуш (з рядком заголовка)
+XLSX_MAX_ROWS = 1048575
+
+ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+# Початок тексту, з якого Excel/LibreOffice читають формулу (CSV/formula injection)
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class Column:
+    """Колонка експорту: заголовок, поля для values_list і необов'язкове форматування значень."""
+
+    def __init__(self, header, *fields, format=None):
+        self.header = header
+        self.fields = fields
+        self.format = format
+
+    def value(self, values):
+        return self.format(*values) if self.format else values[0]
+
+
+def full_name(last_name, first_name):
+    return ' '.join(filter(None, [last_name, first_name]))
+
+
+def choice_display(choices):
+    labels = dict(choices)
+    return lambda value: labels.get(value, value)
+
+
+TASK_EXPORT_COLUMNS = [
+    Column('ID', 'id'),
+    Column('Назва', 'title'),
+    Column('Статус', 'status', format=choice_display(Task.STATUS_CHOICES)),
+    Column('Пріоритет', 'priority', format=choice_display(Task.PRIORITY_CHOICES)),
+    Column('Проєкт', 'project__name'),
+    Column('Виконавець', 'assignee__last_name', 'assignee__first_name', format=full_name),
+    Column('Автор', 'creator__last_name', 'creator__first_name', format=full_name),
+    Column('Термін', 'due_date'),
+    Column('Створено', 'created_at'),
+]
+
+PROJECT_EXPORT_COLUMNS = [
+    Column('ID', 'id'),
+    Column('Назва', 'name'),
+    Column('Статус', 'status', format=choice_display(Project.STATUS_CHOICES)),
+    Column('Початок', 'start_date'),
+    Column('Завершення', 'end_date'),
+    Column('Змінено', 'last_modified_at'),
+    Column('Змінив', 'last_modified_by__last_name', 'last_modified_by__first_name', format=full_name),
+    Column('Створено', 'created_at'),
+]
+
+
+def export_rows(queryset, columns):
+    """
+    Рядки експорту з queryset-у: лише потрібні колонки (values_list), читання частинами
+    через iterator(), тож у пам'яті не тримається весь результат.
+    """
+    lookups = [field for column in columns for field in column.fields]
+    rows = (
+        queryset.select_related(None).prefetch_related(None)
+        .values_list(*lookups)
+        .iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    )
+    for row in rows:
+        values = []
+        start = 0
+        for column in columns:
+            end = start + len(column.fields)
+            values.append(column.value(row[start:end]))
+            start = end
+        yield values
+
+
+def format_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return localtime(value).strftime('%d.%m.%Y %H:%M')
+    if isinstance(value, date):
+        return value.strftime('%d.%m.%Y')
+    return str(value)
+
+
+def spreadsheet_text(value):
+    """
+    format_text для клітинок CSV/XLSX: текст, що починається як формула, отримує префікс-апостроф.
+    Навіть inlineStr в XLSX екранується — після збереження файлу як CSV він став би формулою.
+    """
+    text = format_text(value)
+    return "'" + text if text.startswith(FORMULA_PREFIXES) else text
+
+
+def csv_stream(columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM — щоб Excel відкривав UTF-8 з кирилицею без імпорту
+    buffer.write('\ufeff')
+    writer.writerow([column.header for column in columns])
+    for row in rows:
+        writer.writerow([spreadsheet_text(value) for value in row])
+        if buffer.tell() >= STREAM_BUFFER_SIZE:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+class _StreamBuffer:
+    """Файл лише для запису: ZipFile пише сюди, а генератор забирає накопичені байти."""
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        self.size = 0
+        return data
+
+
+def column_letter(index):
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def xlsx_cell(ref, value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    text = escape(ILLEGAL_XML_CHARS.sub('', spreadsheet_text(value)))
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def xlsx_row(number, letters, values):
+    cells = ''.join(xlsx_cell(f'{letter}{number}', value) for letter, value in zip(letters, values))
+    return f'<row r="{number}">{cells}</row>'.encode('utf-8')
+
+
+SHEET_HEADER = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+SHEET_FOOTER = b'</sheetData></worksheet>'
+
+
+def xlsx_package_parts(sheet_names):
+    sheets = ''.join(
+        f'<sheet name="{escape(name)}" sheetId="{i}" r:id="rId{i}"/>' for i, name in enumerate(sheet_names, start=1)
+    )
+    relationships = ''.join(
+        f'<Relationship Id="rId{i}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        f'Target="worksheets/sheet{i}.xml"/>' for i in range(1, len(sheet_names) + 1)
+    )
+    overrides = ''.join(
+        f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+        f'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        for i in range(1, len(sheet_names) + 1)
+    )
+    return {
+        '[Content_Types].xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            f'{overrides}</Types>'
+        ),
+        '_rels/.rels': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="xl/workbook.xml"/></Relationships>'
+        ),
+        'xl/workbook.xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets>{sheets}</sheets></workbook>'
+        ),
+        'xl/_rels/workbook.xml.rels': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'{relationships}</Relationships>'
+        ),
+    }
+
+
+def xlsx_stream(columns, rows, title):
+    """
+    XLSX, що формується на льоту: аркуші пишуться в ZIP потоково (рядки inlineStr,
+    без sharedStrings), службові частини — наприкінці, коли відома кількість аркушів.
+    Понад XLSX_MAX_ROWS рядків продовжуються на наступному аркуші.
+    """
+    letters = [column_letter(i) for i in range(len(columns))]
+    header = [column.header for column in columns]
+    buffer = _StreamBuffer()
+    rows = iter(rows)
+    sheet_names = []
+
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        first = next(rows, None)
+        while True:
+            sheet_names.append(title if not sheet_names else f'{title} ({len(sheet_names) + 1})')
+            name = f'xl/worksheets/sheet{len(sheet_names)}.xml'
+            with archive.open(name, 'w', force_zip64=True) as sheet:
+                sheet.write(SHEET_HEADER)
+                sheet.write(xlsx_row(1, letters, header))
+                number = 1
+                sheet_rows = chain([first], islice(rows, XLSX_MAX_ROWS - 1)) if first is not None else ()
+                for number, row in enumerate(sheet_rows, start=2):
+                    sheet.write(xlsx_row(number, letters, row))
+                    if buffer.size >= STREAM_BUFFER_SIZE:
+                        yield buffer.drain()
+                sheet.write(SHEET_FOOTER)
+            first = next(rows, None)
+            if first is None:
+                break
+
+        for part, content in xlsx_package_parts(sheet_names).items():
+            archive.writestr(part, content)
+    yield buffer.drain()
+
+
+def export_response(queryset, columns, filename, file_format, title):
+    """StreamingHttpResponse з CSV або XLSX; ValueError для невідомого формату."""
+    if file_format == 'csv':
+        content = csv_stream(columns, export_rows(queryset, columns))
+        content_type = 'text/csv; charset=utf-8'
+    elif file_format == 'xlsx':
+        content = xlsx_stream(columns, export_rows(queryset, columns), title)
+        content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    else:
+        raise ValueError(file_format)
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = content_disposition_header(True, f'{filename}.{file_format}')
+    return response
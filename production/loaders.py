@@ -0,0 +1,47 @@
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+
+
+class GenericRelationLoader:
+    """
+    Пакетне завантаження generic-зв'язків (Comments, Attachment) для багатьох об'єктів:
+    пари (content_type, object_id) збираються з усього пакета, рядки читаються одним
+    запитом на тип вмісту і роздаються назад в атрибут to_attr кожного об'єкта.
+    Об'єкти, для яких атрибут уже є (Prefetch з тим самим to_attr), пропускаються.
+    """
+
+    def __init__(self, model, to_attr, select_related=(), order_by=()):
+        self.model = model
+        self.to_attr = to_attr
+        self.select_related = select_related
+        self.order_by = order_by
+
+    def get_queryset(self):
+        queryset = self.model.objects.all()
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.order_by:
+            queryset = queryset.order_by(*self.order_by)
+        return queryset
+
+    def load(self, instances):
+        by_model = defaultdict(dict)
+        for obj in instances:
+            if obj.pk is not None and not hasattr(obj, self.to_attr):
+                by_model[type(obj)].setdefault(obj.pk, []).append(obj)
+        if not by_model:
+            return
+
+        content_types = ContentType.objects.get_for_models(*by_model)
+        for model, objects in by_model.items():
+            rows = defaultdict(list)
+            queryset = self.get_queryset().filter(
+                content_type=content_types[model],
+                object_id__in=list(objects),
+            )
+            for row in queryset:
+                rows[row.object_id].append(row)
+            for pk, same_pk in objects.items():
+                for obj in same_pk:
+                    setattr(obj, self.to_attr, rows.get(pk, []))
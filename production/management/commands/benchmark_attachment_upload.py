@@ -0,0 +1,83 @@
+import gc
+import os
+import resource
+import shutil
+import tempfile
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from production.models import Attachment, Department, Position, Project, User
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = ('Завантажує файл (за замовчуванням 2 ГБ) частинами через API і скачує його назад, '
+            'вимірюючи швидкість і піковий RSS процесу. Дані й файли видаляються.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size-mb', type=int, default=2048)
+        parser.add_argument('--chunk-mb', type=int, default=8)
+
+    def handle(self, *args, **options):
+        size = options['size_mb'] * 1024 * 1024
+        chunk = os.urandom(options['chunk_mb'] * 1024 * 1024)
+        media_root = tempfile.mkdtemp()
+        try:
+            with override_settings(MEDIA_ROOT=media_root, ATTACHMENT_UPLOAD_TEMP_DIR=f'{media_root}/tmp'):
+                with transaction.atomic():
+                    self.run(size, chunk)
+                    transaction.set_rollback(True)
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+
+    def run(self, size, chunk):
+        department = Department.objects.create(name='Бенчмарк')
+        position = Position.objects.create(name='Бенчмарк', department=department)
+        user = User.objects.create(username='benchmark', department=department, position=position)
+        project = Project.objects.create(name='Бенчмарк', start_date=date.today())
+
+        client = APIClient(SERVER_NAME='localhost')
+        client.force_authenticate(user=user)
+        baseline = peak_rss_mb()
+
+        started = time.perf_counter()
+        upload_id = client.post(reverse('attachment-upload'), {
+            'content_type_app': 'production', 'content_type_model': 'project',
+            'object_id': project.id, 'filename': 'benchmark.bin', 'size': size,
+        }, format='json').data['id']
+        url = reverse('attachment-upload-detail', args=[upload_id])
+        for offset in range(0, size, len(chunk)):
+            body = chunk[:size - offset]
+            response = client.put(url, body, content_type='application/octet-stream', HTTP_UPLOAD_OFFSET=str(offset))
+            assert response.status_code == 200, response.data
+            # тестовий клієнт тримає копію тіла в циклічних посиланнях request/response
+            del response
+            gc.collect()
+        response = client.post(reverse('attachment-upload-finalize', args=[upload_id]))
+        upload_time = time.perf_counter() - started
+        upload_peak = peak_rss_mb()
+
+        attachment = Attachment.objects.get(pk=response.data['id'])
+        started = time.perf_counter()
+        response = client.get(reverse('attachment-download', args=[attachment.id]))
+        received = sum(len(block) for block in response.streaming_content)
+        response.close()
+        download_time = time.perf_counter() - started
+        assert received == size, received
+
+        mb = size / 1024 / 1024
+        self.stdout.write(
+            f"size={mb:.0f}MB chunk={len(chunk) / 1024 / 1024:.0f}MB "
+            f"upload={mb / upload_time:.0f}MB/s download={mb / download_time:.0f}MB/s "
+            f"peak_rss: baseline={baseline:.0f}MB after_upload={upload_peak:.0f}MB "
+            f"after_download={peak_rss_mb():.0f}MB"
+        )
@@ -0,0 +1,67 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from production.dashboard import build_dashboard_summary
+from production.models import Department, Position, Project, Task, User
+
+
+class Command(BaseCommand):
+    help = 'Заповнює БД тестовими даними (за замовчуванням 10k задач і 500 проєктів) і вимірює dashboard_summary. Дані відкочуються.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=10000)
+        parser.add_argument('--projects', type=int, default=500)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options['projects'], options['tasks'])
+
+            timings = []
+            for _ in range(options['repeat']):
+                with CaptureQueriesContext(connection) as ctx:
+                    started = time.perf_counter()
+                    build_dashboard_summary()
+                    timings.append(time.perf_counter() - started)
+
+            self.stdout.write(
+                f"projects={options['projects']} tasks={options['tasks']} "
+                f"queries={len(ctx.captured_queries)} "
+                f"best={min(timings) * 1000:.1f}ms avg={sum(timings) / len(timings) * 1000:.1f}ms"
+            )
+            transaction.set_rollback(True)
+
+    def seed(self, project_count, task_count):
+        department = Department.objects.create(name='Бенчмарк')
+        position = Position.objects.create(name='Бенчмарк', department=department)
+        user = User.objects.create(
+            username='benchmark', email='benchmark@example.com',
+            department=department, position=position,
+        )
+
+        today = timezone.now().date()
+        projects = Project.objects.bulk_create([
+            Project(
+                name=f'Проєкт {i}',
+                start_date=today - timedelta(days=i % 60),
+                status=random.choice(['Planned', 'InProgress', 'Completed']),
+            )
+            for i in range(project_count)
+        ])
+        Task.objects.bulk_create([
+            Task(
+                title=f'Задача {i}',
+                creator=user,
+                assignee=user,
+                project=projects[i % project_count],
+                status=random.choice(['InProgress', 'PendingConfirmation', 'Completed']),
+                due_date=today + timedelta(days=random.randint(-30, 60)),
+            )
+            for i in range(task_count)
+        ], batch_size=1000)
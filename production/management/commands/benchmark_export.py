@@ -0,0 +1,55 @@
+import time
+import tracemalloc
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from production.models import Department, Position, Project, Task, User
+
+
+class Command(BaseCommand):
+    help = ('Експортує задачі в CSV і XLSX для кількох розмірів вибірки і вимірює '
+            'пікову пам\'ять Python під час віддачі відповіді (tracemalloc). Дані відкочуються.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[100, 10000, 200000])
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            department = Department.objects.create(name='Бенчмарк')
+            position = Position.objects.create(name='Бенчмарк', department=department)
+            user = User.objects.create(
+                username='benchmark', email='benchmark@example.com', role='Manager',
+                last_name='Бенчмарк', first_name='Експорт', department=department, position=position,
+            )
+            project = Project.objects.create(name='Бенчмарк', start_date=date(2025, 1, 1))
+            client = APIClient(SERVER_NAME='localhost')
+            client.force_authenticate(user)
+
+            seeded = 0
+            for count in sorted(options['rows']):
+                Task.objects.bulk_create([
+                    Task(title=f'Задача {i}', creator=user, assignee=user, project=project,
+                         status='InProgress', due_date=date(2025, 6, 1))
+                    for i in range(seeded, count)
+                ], batch_size=1000)
+                seeded = count
+                for file_format in ('csv', 'xlsx'):
+                    self.measure(client, count, file_format)
+            transaction.set_rollback(True)
+
+    def measure(self, client, count, file_format):
+        tracemalloc.start()
+        started = time.perf_counter()
+        response = client.get(reverse('tasks-export'), {'type': file_format})
+        size = sum(len(chunk) for chunk in response.streaming_content)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(
+            f"{file_format}: rows={count} size={size / 1024 / 1024:.1f}MB "
+            f"{elapsed:.2f}s ({count / elapsed:.0f} rows/s) peak={peak / 1024 / 1024:.1f}MB"
+        )
@@ -0,0 +1,91 @@
+import asyncio
+import resource
+import time
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from production.streams import get_broker
+
+
+class Command(BaseCommand):
+    help = 'Навантажувальний тест SSE-потоку сповіщень: N одночасних підключень в одному процесі.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--timeout', type=float, default=60)
+
+    def handle(self, *args, **options):
+        asyncio.run(self.run(options['users'], options['timeout']))
+
+    async def run(self, users, timeout):
+        application = get_asgi_application()
+        broker = get_broker()
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        connected = {}
+        delivered = {}
+        disconnect = asyncio.Event()
+
+        def make_connection(user_id):
+            token = AccessToken()
+            token[jwt_settings.USER_ID_CLAIM] = user_id
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+                'method': 'GET', 'scheme': 'http', 'path': '/api/notifications/stream/',
+                'raw_path': b'/api/notifications/stream/', 'root_path': '',
+                'query_string': b'',
+                'headers': [(b'host', b'localhost'), (b'authorization', f'Bearer {token}'.encode())],
+                'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+            }
+            state = {'sent_body': False}
+
+            async def receive():
+                if not state['sent_body']:
+                    state['sent_body'] = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await disconnect.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                if message['type'] != 'http.response.body':
+                    return
+                body = message.get('body', b'')
+                if b'event: unread' in body and user_id not in connected:
+                    connected[user_id] = time.perf_counter()
+                if b'event: notification' in body:
+                    delivered[user_id] = time.perf_counter()
+
+            return application(scope, receive, send)
+
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(make_connection(user_id)) for user_id in range(1, users + 1)]
+        await self.wait_for(lambda: len(connected) == users, timeout)
+        connect_time = time.perf_counter() - started
+
+        published = time.perf_counter()
+        for user_id in range(1, users + 1):
+            broker.publish(user_id, 'notification', {'notification': {'id': user_id}, 'delta': 1})
+        await self.wait_for(lambda: len(delivered) == users, timeout)
+        latencies = sorted(t - published for t in delivered.values())
+
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        disconnect.set()
+        await asyncio.wait(tasks, timeout=timeout)
+
+        self.stdout.write(
+            f"users={users} connected={len(connected)} in {connect_time:.2f}s "
+            f"delivered={len(delivered)} p50={latencies[len(latencies) // 2] * 1000:.1f}ms "
+            f"p99={latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f}ms "
+            f"max_rss_delta={(rss_after - rss_before) / 1024:.1f}MB "
+            f"subscribers_left={broker.subscriber_count()}"
+        )
+
+    async def wait_for(self, predicate, timeout):
+        deadline = time.perf_counter() + timeout
+        while not predicate():
+            if time.perf_counter() > deadline:
+                raise TimeoutError('Не дочекалися завершення навантажувального тесту')
+            await asyncio.sleep(0.01)
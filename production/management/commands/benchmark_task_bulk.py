@@ -0,0 +1,68 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from production.models import Department, Position, Project, Task, User
+
+
+class Command(BaseCommand):
+    help = ('Порівнює створення і перепризначення задач по одній (POST tasks/) і пакетом (POST tasks/bulk/): '
+            'задач за секунду і кількість SQL-запитів. Дані відкочуються.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=500)
+
+    def handle(self, *args, **options):
+        count = options['tasks']
+        with transaction.atomic():
+            client, manager, worker, project = self.seed()
+            payload = [
+                {'title': f'Операція {i}', 'assignee': worker.id, 'project': project.id, 'due_date': '2099-01-01'}
+                for i in range(count)
+            ]
+
+            def single():
+                for item in payload:
+                    client.post(reverse('tasks-list'), item, format='json')
+
+            def bulk_create():
+                response = client.post(reverse('tasks-bulk'), {'create': payload}, format='json')
+                assert response.status_code == 200, response.content[:300]
+
+            def bulk_update():
+                ids = Task.objects.filter(title__startswith='Операція').values_list('pk', flat=True)
+                update = [{'id': pk, 'assignee': manager.id} for pk in ids[:count]]
+                response = client.post(reverse('tasks-bulk'), {'update': update}, format='json')
+                assert response.status_code == 200, response.content[:300]
+
+            for label, run in (('single', single), ('bulk_create', bulk_create), ('bulk_update', bulk_update)):
+                with CaptureQueriesContext(connection) as ctx:
+                    started = time.perf_counter()
+                    run()
+                    elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{label}: tasks={count} {elapsed * 1000:.0f}ms "
+                    f"{count / elapsed:.0f} tasks/s queries={len(ctx.captured_queries)}"
+                )
+            transaction.set_rollback(True)
+
+    def seed(self):
+        department = Department.objects.create(name='Бенчмарк')
+        position = Position.objects.create(name='Бенчмарк', department=department)
+        manager = User.objects.create(
+            username='benchmark_manager', email='benchmark_manager@example.com',
+            role='Manager', department=department, position=position,
+        )
+        worker = User.objects.create(
+            username='benchmark_worker', email='benchmark_worker@example.com',
+            role='Worker', department=department, position=position,
+        )
+        project = Project.objects.create(name='Бенчмарк', start_date=date(2025, 1, 1))
+        client = APIClient(SERVER_NAME='localhost')
+        client.force_authenticate(manager)
+        return client, manager, worker, project
@@ -0,0 +1,43 @@
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from production.models import Attachment
+from production.storage import BLOB_PREFIX, attachment_storage
+
+
+class Command(BaseCommand):
+    help = ('Переносить вкладення, збережені до сховища за вмістом (attachments/...), у блоби: '
+            'однакові файли зберігаються один раз, старі копії видаляються.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        legacy = Attachment.objects.exclude(file__startswith=BLOB_PREFIX).exclude(file='').order_by('id')
+        moved = missing = removed = 0
+        for attachment in legacy.iterator():
+            old_name = attachment.file.name
+            if not attachment_storage.exists(old_name):
+                missing += 1
+                continue
+            if options['dry_run']:
+                moved += 1
+                continue
+
+            # блоб заблокований від збереження файлу до збільшення лічильника
+            with transaction.atomic(), attachment_storage.open(old_name, 'rb') as f:
+                new_name = attachment_storage.save(old_name, File(f))
+                attachment.filename = attachment.display_name
+                attachment.file.name = new_name
+                attachment.save(update_fields=['file', 'filename'])
+            moved += 1
+
+            if not Attachment.objects.filter(file=old_name).exists():
+                attachment_storage.delete(old_name)
+                removed += 1
+
+        self.stdout.write(
+            f"moved={moved} missing={missing} removed_files={removed}"
+            + (" (dry run)" if options['dry_run'] else "")
+        )
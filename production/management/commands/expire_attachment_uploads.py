@@ -0,0 +1,16 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from production.attachments import expire_uploads
+
+
+class Command(BaseCommand):
+    help = 'Видаляє покинуті сесії поблочного завантаження вкладень і їхні тимчасові файли (запускати за розкладом).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, help='Вік сесії без нових частин; типово ATTACHMENT_UPLOAD_EXPIRY')
+
+    def handle(self, *args, **options):
+        max_age = timedelta(hours=options['hours']) if options['hours'] is not None else None
+        self.stdout.write(f"expired={expire_uploads(max_age)}")
@@ -0,0 +1,25 @@
+from collections import Counter
+from concurrent.futures import as_completed
+
+from django.core.management.base import BaseCommand
+
+from production import background
+from production.models import Blob
+from production.previews import generate_previews
+
+
+class Command(BaseCommand):
+    help = 'Створює мініатюри і превʼю для блобів, які ще не оброблені (напр. після dedupe_attachments).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retry-failed', action='store_true', help='Повторити і для блобів зі статусом failed')
+
+    def handle(self, *args, **options):
+        statuses = ['pending', 'failed'] if options['retry_failed'] else ['pending']
+        blob_ids = list(Blob.objects.filter(preview_status__in=statuses).values_list('pk', flat=True))
+
+        futures = [background.submit(generate_previews, blob_id) for blob_id in blob_ids]
+        results = Counter(future.result() for future in as_completed(futures))
+        self.stdout.write(
+            f"blobs={len(blob_ids)} " + ' '.join(f"{status}={count}" for status, count in sorted(results.items()))
+        )
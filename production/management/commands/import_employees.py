@@ -0,0 +1,47 @@
+import csv
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from production.employee_import import EmployeeImportError, import_employees
+
+
+class Command(BaseCommand):
+    help = ('Імпортує працівників з CSV/XLSX. Рядки з помилками пропускаються і виводяться; '
+            'логіни й паролі створених працівників записуються у --credentials.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--credentials', help='CSV-файл для логінів і паролів створених працівників')
+        parser.add_argument('--workers', type=int,
+                            help='Процесів для хешування паролів (0 — без пулу); типово EMPLOYEE_IMPORT_HASH_WORKERS')
+        parser.add_argument('--batch-size', type=int)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        workers = settings.EMPLOYEE_IMPORT_HASH_WORKERS if options['workers'] is None else options['workers']
+        try:
+            with open(options['path'], 'rb') as file:
+                result = import_employees(
+                    file, options['path'],
+                    workers=workers, batch_size=options['batch_size'],
+                )
+        except (OSError, EmployeeImportError) as exc:
+            raise CommandError(exc)
+        elapsed = time.perf_counter() - started
+
+        for error in result.errors:
+            details = '; '.join(f'{field}: {message}' for field, message in error['errors'].items())
+            self.stderr.write(f"рядок {error['row']}: {details}")
+
+        if options['credentials']:
+            with open(options['credentials'], 'w', newline='', encoding='utf-8') as out:
+                writer = csv.DictWriter(out, fieldnames=['row', 'id', 'username', 'password'])
+                writer.writeheader()
+                writer.writerows(result.created)
+
+        self.stdout.write(
+            f"created={len(result.created)} errors={len(result.errors)} "
+            f"{elapsed:.1f}s ({len(result.created) / elapsed:.0f} rows/s)"
+        )
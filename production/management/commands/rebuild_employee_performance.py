@@ -0,0 +1,24 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from production.models import Task
+from production.performance import rebuild_performance
+
+
+class Command(BaseCommand):
+    help = ('Перераховує денні підсумки EmployeePerformance з підтверджених задач одним '
+            'згрупованим запитом (виконавець, день). Примітки в наявних рядках зберігаються.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=date.fromisoformat, help='Перерахувати лише з цієї дати (YYYY-MM-DD)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = rebuild_performance(options['since'], options['batch_size'])
+        skipped = Task.objects.filter(status='Completed', completed_at__isnull=True).count()
+        self.stdout.write(
+            f"rows={written} skipped_without_completed_at={skipped} {time.perf_counter() - started:.2f}s"
+        )
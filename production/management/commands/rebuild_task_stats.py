@@ -0,0 +1,19 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from production.stats import rebuild_task_stats
+
+
+class Command(BaseCommand):
+    help = ('Перераховує денну статистику задач (створені, підтверджені, з терміном, прострочені) '
+            'у розрізі всіх задач, проєктів і виконавців згрупованими запитами.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=date.fromisoformat, help='Перерахувати лише з цієї дати (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rows = rebuild_task_stats(options['since'])
+        self.stdout.write(f"rows={rows} {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,18 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from production.reports import recover_reports
+
+
+class Command(BaseCommand):
+    help = ('Ставить у чергу звіти зі статусом queued і позначає failed ті, що формуються довше '
+            'за REPORT_STALE_AFTER (після перезапуску чи падіння процесу). Запускати за розкладом.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--minutes', type=float, help='Скільки може формуватися звіт; типово REPORT_STALE_AFTER')
+
+    def handle(self, *args, **options):
+        stale_after = timedelta(minutes=options['minutes']) if options['minutes'] is not None else None
+        requeued, failed = recover_reports(stale_after)
+        self.stdout.write(f"requeued={requeued} failed={failed}")
@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-18 08:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('production', '0011_remove_comments_project_comments_content_type_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='task',
+            name='priority',
+            field=models.IntegerField(choices=[(1, 'Низький'), (2, 'Середній'), (3, 'Високий')], db_index=True, default=2),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='status',
+            field=models.CharField(choices=[('Planned', 'Заплановано'), ('InProgress', 'В роботі'), ('PendingConfirmation', 'Очікує підтвердження'), ('Completed', 'Завершено')], db_index=True, default='Planned', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='comments',
+            index=models.Index(fields=['content_type', '-created_at', 'id'], name='production__content_a8b13d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['-created_at', 'id'], name='production__created_2a8170_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['-created_at', 'id'], name='production__created_807d6a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-date_joined', 'id'], name='production__date_jo_85489d_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-18 08:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_counters(apps, schema_editor):
+    TaskNotification = apps.get_model('production', 'TaskNotification')
+    NotificationCounter = apps.get_model('production', 'NotificationCounter')
+    unread = (
+        TaskNotification.objects.filter(is_read=False)
+        .order_by()
+        .values('recipient')
+        .annotate(count=models.Count('id'))
+    )
+    NotificationCounter.objects.bulk_create([
+        NotificationCounter(user_id=row['recipient'], unread=row['count']) for row in unread
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0012_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='tasknotification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['recipient', '-created_at'], name='notification_unread_idx'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2 on 2026-10-18 09:02
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+TRIGRAM_INDEXES = (
+    ('department', 'department_name_trgm'),
+    ('position', 'position_name_trgm'),
+    ('project', 'project_name_trgm'),
+    ('task', 'task_title_trgm'),
+    ('user', 'user_full_name_trgm'),
+)
+
+
+def _trigram_indexes(apps):
+    for model_name, index_name in TRIGRAM_INDEXES:
+        model = apps.get_model('production', model_name)
+        index = next(i for i in model._meta.indexes if i.name == index_name)
+        yield model, index
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # GIN-індекси з gin_trgm_ops існують лише в PostgreSQL
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model, index in _trigram_indexes(apps):
+        schema_editor.add_index(model, index)
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model, index in _trigram_indexes(apps):
+        schema_editor.remove_index(model, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('production', '0013_notification_counter'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='department',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='department_name_trgm', opclasses=['gin_trgm_ops']),
+                ),
+                migrations.AddIndex(
+                    model_name='position',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='position_name_trgm', opclasses=['gin_trgm_ops']),
+                ),
+                migrations.AddIndex(
+                    model_name='project',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='project_name_trgm', opclasses=['gin_trgm_ops']),
+                ),
+                migrations.AddIndex(
+                    model_name='task',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['title'], name='task_title_trgm', opclasses=['gin_trgm_ops']),
+                ),
+                migrations.AddIndex(
+                    model_name='user',
+                    index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Concat('last_name', models.Value(' '), 'first_name', models.Value(' '), 'middle_name', output_field=models.CharField()), name='gin_trgm_ops'), name='user_full_name_trgm'),
+                ),
+            ],
+        ),
+        # після зміни стану: RunPython бачить нові індекси в apps
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
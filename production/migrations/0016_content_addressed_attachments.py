@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-18 09:17
+
+import os
+
+import production.storage
+from django.db import migrations, models
+
+
+def fill_filenames(apps, schema_editor):
+    Attachment = apps.get_model('production', 'Attachment')
+    attachments = list(Attachment.objects.only('id', 'file'))
+    for attachment in attachments:
+        attachment.filename = os.path.basename(attachment.file.name)
+    Attachment.objects.bulk_update(attachments, ['filename'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0015_attachment_upload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('sha256', models.CharField(db_index=True, max_length=64)),
+                ('size', models.PositiveBigIntegerField()),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='filename',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='attachment',
+            name='file',
+            field=models.FileField(max_length=255, storage=production.storage.get_attachment_storage, upload_to='attachments/'),
+        ),
+        migrations.RunPython(fill_filenames, migrations.RunPython.noop),
+    ]
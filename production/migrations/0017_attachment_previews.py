@@ -0,0 +1,42 @@
+# Generated by Django 5.2 on 2026-10-18 09:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def link_blobs(apps, schema_editor):
+    Attachment = apps.get_model('production', 'Attachment')
+    Blob = apps.get_model('production', 'Blob')
+    for blob in Blob.objects.only('id', 'name').iterator():
+        Attachment.objects.filter(file=blob.name).update(blob=blob)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0016_content_addressed_attachments'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attachment',
+            name='blob',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attachments', to='production.blob'),
+        ),
+        migrations.AddField(
+            model_name='blob',
+            name='preview',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='blob',
+            name='preview_status',
+            field=models.CharField(choices=[('pending', 'Очікує'), ('ready', 'Готово'), ('unsupported', 'Не підтримується'), ('failed', 'Помилка')], default='pending', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='blob',
+            name='thumbnail',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.RunPython(link_blobs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2 on 2026-10-18 09:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+OBJECT_INDEXES = (
+    ('attachment', 'attachment_object_idx'),
+    ('comments', 'comments_object_thread_idx'),
+)
+
+
+def _object_indexes(apps):
+    for model_name, index_name in OBJECT_INDEXES:
+        model = apps.get_model('production', model_name)
+        index = next(i for i in model._meta.indexes if i.name == index_name)
+        yield model, index
+
+
+def create_object_indexes(apps, schema_editor):
+    # на великих таблицях PostgreSQL будує індекс без блокування запису
+    concurrently = schema_editor.connection.vendor == 'postgresql'
+    for model, index in _object_indexes(apps):
+        if concurrently:
+            schema_editor.add_index(model, index, concurrently=True)
+        else:
+            schema_editor.add_index(model, index)
+
+
+def drop_object_indexes(apps, schema_editor):
+    for model, index in _object_indexes(apps):
+        schema_editor.remove_index(model, index)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY не можна виконувати в транзакції
+    atomic = False
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('production', '0017_attachment_previews'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='attachment',
+                    index=models.Index(fields=['content_type', 'object_id', '-uploaded_at', 'id'], name='attachment_object_idx'),
+                ),
+                migrations.AddIndex(
+                    model_name='comments',
+                    index=models.Index(fields=['content_type', 'object_id', '-created_at', 'id'], name='comments_object_thread_idx'),
+                ),
+            ],
+        ),
+        # після зміни стану: RunPython бачить нові індекси в apps
+        migrations.RunPython(create_object_indexes, drop_object_indexes),
+        # одноколонкові індекси FK content_type дублюють префікс складених індексів
+        migrations.AlterField(
+            model_name='attachment',
+            name='content_type',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype'),
+        ),
+        migrations.AlterField(
+            model_name='comments',
+            name='content_type',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype'),
+        ),
+    ]
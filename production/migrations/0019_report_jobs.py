@@ -0,0 +1,54 @@
+# Generated by Django 5.2 on 2026-10-18 09:56
+
+from django.db import migrations, models
+
+
+def mark_existing_ready(apps, schema_editor):
+    # звіти, створені до фонового формування, не є завданнями в черзі
+    Report = apps.get_model('production', 'Report')
+    Report.objects.update(status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0018_generic_relation_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='data_version',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='format',
+            field=models.CharField(choices=[('pdf', 'PDF'), ('xlsx', 'Excel'), ('csv', 'CSV')], default='xlsx', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='params',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='status',
+            field=models.CharField(choices=[('queued', 'У черзі'), ('running', 'Формується'), ('ready', 'Готовий'), ('failed', 'Помилка')], default='queued', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(condition=models.Q(('status', 'ready')), fields=['project', 'format', 'data_version'], name='report_ready_idx'),
+        ),
+        migrations.RunPython(mark_existing_ready, migrations.RunPython.noop),
+    ]
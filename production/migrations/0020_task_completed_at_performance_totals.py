@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-18 10:02
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0019_report_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employeeperformance',
+            name='on_time_tasks',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='employeeperformance',
+            name='total_completion_time',
+            field=models.DurationField(default=datetime.timedelta(0)),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='employeeperformance',
+            name='efficiency_score',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=5),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-18 10:06
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0020_task_completed_at_performance_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskStatusTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, choices=[('Planned', 'Заплановано'), ('InProgress', 'В роботі'), ('PendingConfirmation', 'Очікує підтвердження'), ('Completed', 'Завершено')], max_length=20)),
+                ('to_status', models.CharField(choices=[('Planned', 'Заплановано'), ('InProgress', 'В роботі'), ('PendingConfirmation', 'Очікує підтвердження'), ('Completed', 'Завершено')], max_length=20)),
+                ('at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('reason', models.TextField(blank=True)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('assignee', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transitions', to='production.task')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['task', 'at'], name='transition_task_at_idx'), models.Index(fields=['assignee', 'at'], name='transition_assignee_at_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2 on 2026-10-18 10:12
+
+from collections import Counter, defaultdict
+
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+
+
+def fill_stats(apps, schema_editor):
+    # той самий розрахунок, що й stats.grouped_counts, на історичних моделях
+    Task = apps.get_model('production', 'Task')
+    TaskDailyStats = apps.get_model('production', 'TaskDailyStats')
+    tasks = Task.objects.order_by()
+    completed_day = TruncDate('completed_at')
+    metrics = [
+        (TruncDate('created_at'), models.Q(), {'created': models.Count('id')}),
+        (completed_day, models.Q(completed_at__isnull=False), {'completed': models.Count('id')}),
+        (models.F('due_date'), models.Q(due_date__isnull=False), {
+            'due': models.Count('id'),
+            'overdue': models.Count(
+                'id', filter=models.Q(completed_at__isnull=True) | models.Q(due_date__lt=completed_day),
+            ),
+        }),
+    ]
+    rows = defaultdict(Counter)
+    for day, condition, counters in metrics:
+        queryset = tasks.filter(condition).annotate(day=day)
+        for dimension, field in [('total', None), ('assignee', 'assignee_id'), ('project', 'project_id')]:
+            group = ['day'] + ([field] if field else [])
+            for row in queryset.values(*group).annotate(**counters):
+                key = (row[field] or 0) if field else 0
+                for name in counters:
+                    rows[dimension, key, row['day']][name] += row[name]
+    TaskDailyStats.objects.bulk_create(
+        [TaskDailyStats(dimension=dimension, key=key, date=day, **counters)
+         for (dimension, key, day), counters in rows.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0021_task_status_transitions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('total', 'Усі задачі'), ('project', 'Проєкт'), ('assignee', 'Виконавець')], max_length=10)),
+                ('key', models.BigIntegerField(default=0)),
+                ('date', models.DateField()),
+                ('created', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('due', models.IntegerField(default=0)),
+                ('overdue', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'key', 'date'), name='task_daily_stats_unique')],
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-18 11:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('production', '0023_report_started_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='taskstatustransition',
+            name='assignee',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -1,17 +1,127 @@
-from django.db import models
+import os
+import uuid
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
-from datetime import date
+from datetime import date, timedelta
 from django.utils import timezone
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.utils.timezone import localtime
 from django.contrib.contenttypes.fields import GenericRelation
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from .search import employee_name_expression
+from .storage import get_attachment_storage
+
+# === Відстеження змін полів ===
+class TrackedFieldsMixin(models.Model):
+    """
+    Запам'ятовує значення tracked_fields на момент завантаження з БД
+    (або останнього save), щоб порівнювати зміни без повторного SELECT.
+    """
+    tracked_fields = ()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_values()
+        return instance
+
+    def _remember_loaded_values(self, fields=None):
+        deferred = self.get_deferred_fields()
+        loaded = self.__dict__.setdefault('_loaded_values', {})
+        # update_fields може містити назву ForeignKey ('assignee'), а відстежується attname ('assignee_id')
+        names = [self._meta.get_field(name).attname for name in fields] if fields else self.tracked_fields
+        for name in names:
+            if name in self.tracked_fields and name not in deferred:
+                loaded[name] = getattr(self, name)
+
+    def has_loaded_value(self, name):
+        return name in self.__dict__.get('_loaded_values', {})
+
+    def get_loaded_value(self, name, default=None):
+        return self.__dict__.get('_loaded_values', {}).get(name, default)
+
+    def has_changed(self, name):
+        return not self.has_loaded_value(name) or self.get_loaded_value(name) != getattr(self, name)
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._remember_loaded_values(kwargs.get('fields'))
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._remember_loaded_values(kwargs.get('update_fields'))
+
+
+class StatusAutoMixin(TrackedFieldsMixin):
+    """
+    Автоматичне визначення статусу: статус перераховується, якщо його не змінили вручну
+    відносно збереженого значення.
+    """
+    tracked_fields = ('status',)
+
+    class Meta:
+        abstract = True
+
+    def _derive_status(self):
+        raise NotImplementedError
+
+    def _status_auto(self, stored_status=None):
+        if not self.pk:
+            return True
+        if self.has_loaded_value('status'):
+            return self.get_loaded_value('status') == self.status
+        if stored_status is None:
+            stored_status = type(self).objects.filter(pk=self.pk).values_list('status', flat=True).first()
+        return stored_status is not None and stored_status == self.status
+
+    def _apply_auto_status(self, stored_status=None):
+        if not self.status or self._status_auto(stored_status):
+            self.status = self._derive_status()
+
+    def save(self, *args, **kwargs):
+        self._apply_auto_status()
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def apply_auto_status(cls, objs):
+        """
+        Перераховує статус для набору об'єктів (напр. перед bulk_create/bulk_update).
+        Для об'єктів без запам'ятованого статусу збережені значення читаються одним запитом.
+        """
+        unknown = [obj.pk for obj in objs if obj.pk and not obj.has_loaded_value('status')]
+        stored = dict(cls.objects.filter(pk__in=unknown).values_list('pk', 'status')) if unknown else {}
+        for obj in objs:
+            obj._apply_auto_status(stored.get(obj.pk))
+        return objs
+
+
+class DashboardQuerySet(models.QuerySet):
+    """
+    Масовий update() задач і проєктів оминає сигнали, тому кеш зведення
+    скидається тут (після коміту, як і в сигналах).
+    """
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        # оновлення лише last_modified_at (коментарі/файли) не впливає на зведення
+        if rows and set(kwargs) - {'last_modified_at'}:
+            from .dashboard import schedule_dashboard_invalidation
+            schedule_dashboard_invalidation(self.db)
+        return rows
 
 # === Довідкові таблиці ===
 class Department(models.Model):
     name = models.CharField(max_length=100, unique=True)
     manager = models.ForeignKey('User', null=True, blank=True, on_delete=models.SET_NULL, related_name='managed_departments')
 
+    class Meta:
+        indexes = [
+            GinIndex(fields=['name'], opclasses=['gin_trgm_ops'], name='department_name_trgm'),
+        ]
+
     def __str__(self):
         return self.name
     
@@ -23,6 +133,11 @@ class Position(models.Model):
         related_name='positions'
     )
 
+    class Meta:
+        indexes = [
+            GinIndex(fields=['name'], opclasses=['gin_trgm_ops'], name='position_name_trgm'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -46,10 +161,12 @@ class User(AbstractUser):
             models.Index(fields=['department']),
             models.Index(fields=['position']),
             models.Index(fields=['role']),
+            models.Index(fields=['-date_joined', 'id']),
+            GinIndex(OpClass(employee_name_expression(), name='gin_trgm_ops'), name='user_full_name_trgm'),
         ]
 
 # === Виробничі об'єкти ===
-class Project(models.Model):
+class Project(StatusAutoMixin):
     STATUS_CHOICES = [
         ('Planned', 'Заплановано'),
         ('InProgress', 'В роботі'),
@@ -63,30 +180,30 @@ class Project(models.Model):
     last_modified_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='modified_projects')
     last_modified_at = models.DateTimeField(auto_now=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    
+    comments = GenericRelation('production.Comments', related_query_name='project_comments')
+    attachment_set = GenericRelation('production.Attachment', related_query_name='project_attachments')
 
-    def save(self, *args, **kwargs):
-        if not self.status or self._status_auto():
-            today = date.today()
-            if self.start_date > today:
-                self.status = 'Planned'
-            elif self.end_date and self.end_date < today:
-                self.status = 'Completed'
-            else:
-                self.status = 'InProgress'
-        super().save(*args, **kwargs)
+    objects = DashboardQuerySet.as_manager()
 
-    def _status_auto(self):
-        if not self.pk:
-            return True
-        old = Project.objects.filter(pk=self.pk).first()
-        return old and old.status == self.status
+    tracked_fields = ('status', 'name')
+
+    def _derive_status(self):
+        today = date.today()
+        if self.start_date > today:
+            return 'Planned'
+        elif self.end_date and self.end_date < today:
+            return 'Completed'
+        return 'InProgress'
 
     def __str__(self):
         return self.name
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', 'id']),
+            GinIndex(fields=['name'], opclasses=['gin_trgm_ops'], name='project_name_trgm'),
+        ]
     
     @property
     def formatted_last_modified(self):
@@ -94,7 +211,7 @@ class Project(models.Model):
             return localtime(self.last_modified_at).strftime('%d.%m.%Y %H:%M')
         return ''
 
-class Order(models.Model):
+class Order(StatusAutoMixin):
     STATUS_CHOICES = [
         ('New', 'Нове'),
         ('InProgress', 'В роботі'),
@@ -107,28 +224,19 @@ class Order(models.Model):
     due_date = models.DateField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='New', db_index=True)
 
-    def save(self, *args, **kwargs):
-        if not self.status or self._status_auto():
-            today = date.today()
-            if self.due_date and self.due_date < today:
-                self.status = 'Done'
-            elif self.created_at.date() <= today:
-                self.status = 'InProgress'
-            else:
-                self.status = 'New'
-        super().save(*args, **kwargs)
-
-    def _status_auto(self):
-        if not self.pk:
-            return True
-        old = Order.objects.filter(pk=self.pk).first()
-        return old and old.status == self.status
+    def _derive_status(self):
+        today = date.today()
+        if self.due_date and self.due_date < today:
+            return 'Done'
+        elif self.created_at.date() <= today:
+            return 'InProgress'
+        return 'New'
 
     def __str__(self):
         return self.number
 
 
-class Task(models.Model):
+class Task(StatusAutoMixin):
     PRIORITY_CHOICES = [
         (1, 'Низький'),
         (2, 'Середній'),
@@ -150,11 +258,18 @@ class Task(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Planned', db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     due_date = models.DateField(null=True, blank=True)
+    # момент підтвердження виконання (confirm_complete / confirm_done)
+    completed_at = models.DateTimeField(null=True, blank=True)
     is_done = models.BooleanField(default=False)
     is_confirmed = models.BooleanField(default=False)
     comments = GenericRelation('production.Comments', related_query_name='task_comments')
     attachment_set = GenericRelation('production.Attachment', related_query_name='task_attachments')
 
+    objects = DashboardQuerySet.as_manager()
+
+    # status, project_id — автостатус і проєкти; решта — денна статистика (див. stats)
+    tracked_fields = ('status', 'project_id', 'assignee_id', 'due_date', 'completed_at')
+
     class Meta:
         indexes = [
             models.Index(fields=['creator']),
@@ -162,22 +277,29 @@ class Task(models.Model):
             models.Index(fields=['project']),
             models.Index(fields=['order']),
             models.Index(fields=['status']),
+            models.Index(fields=['-created_at', 'id']),
+            GinIndex(fields=['title'], opclasses=['gin_trgm_ops'], name='task_title_trgm'),
         ]
 
+    def _derive_status(self):
+        today = timezone.now().date()
+        # підтверджена задача лишається завершеною
+        if self.completed_at or (self.due_date and self.due_date < today):
+            return 'Completed'
+        return 'InProgress'
+
+    def _apply_auto_status(self, stored_status=None):
+        super()._apply_auto_status(stored_status)
+        # задачу повернули з Completed: підтвердження скасовується, внесок у EmployeePerformance
+        # віднімає сигнал (див. performance.revoke_completion)
+        if self.status != 'Completed':
+            self.completed_at = None
+
     def save(self, *args, **kwargs):
-        if not self.status or self._status_auto():
-            today = timezone.now().date()
-            if self.due_date and self.due_date < today:
-                self.status = 'Completed'
-            else:
-                self.status = 'InProgress'
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'completed_at'}
         super().save(*args, **kwargs)
-        
-    def _status_auto(self):
-        if not self.pk:
-            return True
-        old = Task.objects.filter(pk=self.pk).first()
-        return old and old.status == self.status
 
     def __str__(self):
         return self.title
@@ -187,24 +309,101 @@ class Comments(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
-    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    # окремий індекс на content_type не потрібен: він є префіксом складених індексів
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, db_index=False)
     object_id = models.PositiveIntegerField()
     content_object = GenericForeignKey('content_type', 'object_id')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['content_type', '-created_at', 'id']),
+            # гілка коментарів одного об'єкта в порядку CreatedAtCursorPagination
+            models.Index(fields=['content_type', 'object_id', '-created_at', 'id'], name='comments_object_thread_idx'),
+        ]
+
     def __str__(self):
         return f'Comment by {self.author} on {self.content_object}'
  
+class Blob(models.Model):
+    """Вміст у сховищі вкладень (ContentAddressedStorage) і кількість вкладень, що на нього посилаються."""
+    PREVIEW_STATUS_CHOICES = [
+        ('pending', 'Очікує'),
+        ('ready', 'Готово'),
+        ('unsupported', 'Не підтримується'),
+        ('failed', 'Помилка'),
+    ]
+    name = models.CharField(max_length=255, unique=True)
+    sha256 = models.CharField(max_length=64, db_index=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # мініатюра і превʼю першої сторінки лежать поруч із блобом (див. previews)
+    thumbnail = models.CharField(max_length=255, blank=True)
+    preview = models.CharField(max_length=255, blank=True)
+    preview_status = models.CharField(max_length=20, choices=PREVIEW_STATUS_CHOICES, default='pending')
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count})"
+
+
 class Attachment(models.Model):
-    file = models.FileField(upload_to='attachments/')
+    file = models.FileField(upload_to='attachments/', storage=get_attachment_storage, max_length=255)
+    filename = models.CharField(max_length=255, blank=True)
+    blob = models.ForeignKey(Blob, null=True, blank=True, editable=False, on_delete=models.SET_NULL, related_name='attachments')
     description = models.CharField(max_length=255, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
 
     # Generic relation
-    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, db_index=False)
     object_id = models.PositiveIntegerField()
     content_object = GenericForeignKey('content_type', 'object_id')
-       
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['content_type', 'object_id', '-uploaded_at', 'id'], name='attachment_object_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # ім'я файлу в БД для лічильника посилань на блоби (див. signals) — без повторного SELECT
+        if 'file' in instance.__dict__:
+            instance._stored_file_name = instance.__dict__['file']
+        return instance
+
+    def save(self, *args, **kwargs):
+        # у сховищі файл зберігається під хешем, тож оригінальну назву запам'ятовуємо окремо
+        if not self.filename and self.file and not self.file._committed:
+            self.filename = os.path.basename(self.file.name)
+        # збереження файлу і збільшення лічильника блоба — під одним блокуванням (див. ContentAddressedStorage)
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+    @property
+    def display_name(self):
+        return self.filename or os.path.basename(self.file.name)
+
+
+class AttachmentUpload(models.Model):
+    """
+    Сесія поблочного завантаження: частини дописуються у тимчасовий файл,
+    після finalize файл переноситься у сховище і створюється Attachment.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    filename = models.CharField(max_length=255)
+    description = models.CharField(max_length=255, blank=True)
+    size = models.PositiveBigIntegerField(null=True, blank=True)
+    offset = models.PositiveBigIntegerField(default=0)
+    uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='attachment_uploads')
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size or '?'})"
+
 # === Матеріали та товари ===
 class Material(models.Model):
     name = models.CharField(max_length=200, unique=True)
@@ -253,10 +452,33 @@ class Report(models.Model):
     report_type = models.CharField(max_length=20, choices=REPORT_TYPE_CHOICES, db_index=True)
     file = models.FileField(upload_to='reports/', null=True, blank=True)
 
+    # Формування у фоновому пулі (див. reports)
+    FORMAT_CHOICES = [
+        ('pdf', 'PDF'),
+        ('xlsx', 'Excel'),
+        ('csv', 'CSV'),
+    ]
+    STATUS_CHOICES = [
+        ('queued', 'У черзі'),
+        ('running', 'Формується'),
+        ('ready', 'Готовий'),
+        ('failed', 'Помилка'),
+    ]
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default='xlsx')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    # фільтри звіту по задачах: project, assignee, status, date_from, date_to
+    params = models.JSONField(default=dict, blank=True)
+    # стан даних, з яких сформовано файл (для проєктного звіту — last_modified_at проєкту)
+    data_version = models.CharField(max_length=64, blank=True)
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         indexes = [
             models.Index(fields=['report_type']),
             models.Index(fields=['created_by']),
+            models.Index(fields=['project', 'format', 'data_version'], condition=models.Q(status='ready'), name='report_ready_idx'),
         ]
 
     def __str__(self):
@@ -280,8 +502,11 @@ class EmployeePerformance(models.Model):
     date = models.DateField()
     completed_tasks = models.PositiveIntegerField(default=0)
     avg_completion_time = models.DurationField(null=True, blank=True)
-    efficiency_score = models.DecimalField(max_digits=5, decimal_places=2)
+    efficiency_score = models.DecimalField(max_digits=5, decimal_places=2, default=0)
     note = models.TextField(blank=True)
+    # накопичувачі для інкрементного оновлення середнього часу і відсотка вчасно виконаних (див. performance)
+    total_completion_time = models.DurationField(default=timedelta(0))
+    on_time_tasks = models.PositiveIntegerField(default=0)
 
     class Meta:
         unique_together = ('employee', 'date')
@@ -290,9 +515,81 @@ class EmployeePerformance(models.Model):
     def __str__(self):
         return f"{self.employee.username} - {self.date} - {self.efficiency_score}%"
     
-class TaskNotification(models.Model):
+class TaskNotification(TrackedFieldsMixin):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='notifications')
     sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_notifications')
     recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='received_notifications')
     is_read = models.BooleanField(default=False)
-    created_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    tracked_fields = ('is_read',)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['recipient', '-created_at'],
+                condition=models.Q(is_read=False),
+                name='notification_unread_idx',
+            ),
+        ]
+
+# === Лічильник непрочитаних сповіщень ===
+class NotificationCounter(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='notification_counter')
+    unread = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread}"
+
+# === Журнал переходів статусів задач ===
+class TaskStatusTransition(models.Model):
+    """Запис лише додається (див. transitions): з якого статусу, в який, коли і хто."""
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='transitions')
+    # виконавець на момент переходу — для вибірок по працівнику без JOIN із задачами;
+    # журнал не заважає видалити працівника
+    assignee = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    # порожній from_status — створення задачі
+    from_status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES, blank=True)
+    to_status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    at = models.DateTimeField(default=timezone.now)
+    reason = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['task', 'at'], name='transition_task_at_idx'),
+            models.Index(fields=['assignee', 'at'], name='transition_assignee_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id}: {self.from_status or '—'} → {self.to_status}"
+
+# === Денна статистика задач ===
+class TaskDailyStats(models.Model):
+    """
+    Лічильники задач за день у розрізі (dimension, key), оновлюються інкрементно (див. stats).
+    created — створені, completed — підтверджені, due — з терміном цього дня,
+    overdue — з них не підтверджені до кінця дня терміну. Для дня, що ще не минув, тут лічаться
+    ще не підтверджені задачі; прострочення з'являється лише при читанні після цього дня (stats.time_series).
+    """
+    DIMENSION_CHOICES = [
+        ('total', 'Усі задачі'),
+        ('project', 'Проєкт'),
+        ('assignee', 'Виконавець'),
+    ]
+    dimension = models.CharField(max_length=10, choices=DIMENSION_CHOICES)
+    # id проєкту або виконавця; 0 — для total і задач без проєкту
+    key = models.BigIntegerField(default=0)
+    date = models.DateField()
+    created = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    due = models.IntegerField(default=0)
+    overdue = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'key', 'date'], name='task_daily_stats_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.dimension}:{self.key} {self.date}"
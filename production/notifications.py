@@ -0,0 +1,153 @@
+import contextvars
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from . import background
+from .models import Department, NotificationCounter, TaskNotification, User
+from .serializers import TaskNotificationSerializer
+from .streams import get_broker
+
+RECIPIENTS_CACHE_KEY = 'notifications:recipients'
+
+# лічильники для сповіщень, видалених у межах блоку, вже змінено пакетно (delete_task_notifications)
+_counters_adjusted = contextvars.ContextVar('unread_counters_adjusted', default=False)
+
+
+def _load_recipients():
+    return {
+        'managers': list(User.objects.filter(role='Manager').values_list('id', flat=True)),
+        'departments': dict(
+            Department.objects.filter(manager__isnull=False).values_list('id', 'manager_id')
+        ),
+    }
+
+
+def get_recipient_ids(department_id=None):
+    """
+    Отримувачі сповіщення: керівник відділу, якщо його призначено,
+    інакше всі керівники. Дані кешуються і скидаються сигналами; з кешем, не спільним
+    для процесів, інші процеси бачать зміни не пізніше ніж за NOTIFICATION_RECIPIENTS_CACHE_TIMEOUT.
+    """
+    recipients = cache.get_or_set(
+        RECIPIENTS_CACHE_KEY, _load_recipients, settings.NOTIFICATION_RECIPIENTS_CACHE_TIMEOUT,
+    )
+    manager_id = recipients['departments'].get(department_id)
+    if manager_id:
+        return [manager_id]
+    return recipients['managers']
+
+
+def invalidate_recipients():
+    cache.delete(RECIPIENTS_CACHE_KEY)
+
+
+def create_task_notifications(task, sender, recipient_ids):
+    with transaction.atomic():
+        notifications = TaskNotification.objects.bulk_create([
+            TaskNotification(task=task, sender=sender, recipient_id=recipient_id)
+            for recipient_id in recipient_ids
+        ])
+        adjust_unread_counters(Counter(recipient_ids))
+    transaction.on_commit(lambda: publish_new_notifications(notifications))
+    return notifications
+
+
+def dispatch_task_notifications(task, sender, recipient_ids):
+    """
+    Створює сповіщення одним bulk_create. Якщо NOTIFICATIONS_ASYNC = True,
+    запис виконується у фоновому пулі після коміту транзакції.
+    """
+    if getattr(settings, 'NOTIFICATIONS_ASYNC', False):
+        transaction.on_commit(
+            lambda: background.submit(create_task_notifications, task, sender, list(recipient_ids))
+        )
+        return []
+    return create_task_notifications(task, sender, recipient_ids)
+
+
+def mark_task_notifications_read(task):
+    with transaction.atomic():
+        unread = list(
+            TaskNotification.objects.select_for_update()
+            .filter(task=task, is_read=False)
+            .values_list('id', 'recipient_id')
+        )
+        TaskNotification.objects.filter(id__in=[pk for pk, _ in unread]).update(is_read=True)
+        deltas = Counter()
+        for _, recipient_id in unread:
+            deltas[recipient_id] -= 1
+        adjust_unread_counters(deltas)
+    transaction.on_commit(lambda: publish_unread_deltas(deltas))
+
+
+def delete_task_notifications(task):
+    """
+    Видаляє сповіщення задачі; лічильники зменшуються пакетно з уже порахованих
+    непрочитаних, а post_delete для кожного рядка їх не чіпає (unread_counters_adjusted).
+    """
+    with transaction.atomic():
+        notifications = TaskNotification.objects.filter(task=task)
+        deltas = Counter()
+        for recipient_id, is_read in notifications.select_for_update().values_list('recipient_id', 'is_read'):
+            if not is_read:
+                deltas[recipient_id] -= 1
+        token = _counters_adjusted.set(True)
+        try:
+            notifications.delete()
+        finally:
+            _counters_adjusted.reset(token)
+        adjust_unread_counters(deltas)
+    transaction.on_commit(lambda: publish_unread_deltas(deltas))
+
+
+# === Лічильник непрочитаних ===
+def unread_counters_adjusted():
+    """True, якщо лічильники для сповіщень, що зараз видаляються, вже змінено пакетно."""
+    return _counters_adjusted.get()
+
+
+def adjust_unread_counters(deltas):
+    """
+    Атомарно змінює лічильники непрочитаних: deltas = {user_id: зміна}.
+    Один UPDATE ... SET unread = unread + delta на кожне різне значення delta.
+    """
+    by_delta = defaultdict(list)
+    for user_id, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(user_id)
+    if not by_delta:
+        return
+
+    # рядок лічильника потрібен лише для збільшення; зменшувати відсутній нема чого
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=user_id) for user_id, delta in deltas.items() if delta > 0],
+        ignore_conflicts=True,
+    )
+    for delta, user_ids in by_delta.items():
+        NotificationCounter.objects.filter(user_id__in=user_ids).update(
+            unread=Greatest(F('unread') + delta, Value(0))
+        )
+
+
+def get_unread_count(user_id):
+    return NotificationCounter.objects.filter(user_id=user_id).values_list('unread', flat=True).first() or 0
+
+
+# === Публікація в потік подій (див. streams.py) ===
+def publish_new_notifications(notifications):
+    broker = get_broker()
+    data = TaskNotificationSerializer(notifications, many=True).data
+    for notification, payload in zip(notifications, data):
+        broker.publish(notification.recipient_id, 'notification', {'notification': payload, 'delta': 1})
+
+
+def publish_unread_deltas(deltas):
+    broker = get_broker()
+    for recipient_id, delta in deltas.items():
+        if delta:
+            broker.publish(recipient_id, 'unread', {'delta': delta})
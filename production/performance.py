@@ -0,0 +1,205 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import (Case, Count, DecimalField, DurationField, ExpressionWrapper, F, IntegerField, Q, Sum,
+                              Value, When)
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import EmployeePerformance, Task
+from .transitions import log_transitions
+
+SCORE_FIELD = DecimalField(max_digits=5, decimal_places=2)
+
+
+def efficiency(on_time, completed):
+    """Відсоток задач, підтверджених не пізніше терміну."""
+    # 100.0, а не 100: інакше SQLite ділить націло
+    return ExpressionWrapper(on_time * Value(100.0) / completed, output_field=SCORE_FIELD)
+
+
+def record_completion(task, completed_at):
+    """
+    Додає підтверджену задачу до денного підсумку виконавця. Лише UPDATE з F()-виразами:
+    паралельні підтвердження не перезаписують одне одного. Якщо рядка за день ще немає —
+    вставка з ignore_conflicts і повторний UPDATE (рядок могла щойно вставити інша транзакція).
+    """
+    duration = completed_at - task.created_at
+    on_time = int(task.due_date is None or task.due_date >= timezone.localdate(completed_at))
+    rows = EmployeePerformance.objects.filter(employee_id=task.assignee_id, date=timezone.localdate(completed_at))
+
+    completed = F('completed_tasks') + 1
+    total = F('total_completion_time') + Value(duration, output_field=DurationField())
+    changes = {
+        'completed_tasks': completed,
+        'on_time_tasks': F('on_time_tasks') + on_time,
+        'total_completion_time': total,
+        'avg_completion_time': ExpressionWrapper(total / completed, output_field=DurationField()),
+        'efficiency_score': efficiency(F('on_time_tasks') + on_time, completed),
+    }
+    with transaction.atomic():
+        if not rows.update(**changes):
+            EmployeePerformance.objects.bulk_create(
+                [EmployeePerformance(employee_id=task.assignee_id, date=timezone.localdate(completed_at))],
+                ignore_conflicts=True,
+            )
+            rows.update(**changes)
+
+
+def revoke_completion(task, previous):
+    """
+    Віднімає задачу з денного підсумку виконавця, коли вона виходить з Completed.
+    previous — стан задачі до зміни (stats.STATE_FIELDS): виконавець і момент підтвердження.
+    """
+    completed_at = previous['completed_at']
+    day = timezone.localdate(completed_at)
+    duration = completed_at - task.created_at
+    on_time = int(previous['due_date'] is None or previous['due_date'] >= day)
+    rows = EmployeePerformance.objects.filter(employee_id=previous['assignee_id'], date=day)
+
+    with transaction.atomic():
+        if not rows.filter(completed_tasks__gt=0).update(
+            completed_tasks=F('completed_tasks') - 1,
+            on_time_tasks=F('on_time_tasks') - on_time,
+            total_completion_time=F('total_completion_time') - Value(duration, output_field=DurationField()),
+        ):
+            return
+        # середнє й ефективність — із уже зменшених лічильників
+        rows.update(
+            avg_completion_time=Case(
+                When(completed_tasks=0, then=Value(None, output_field=DurationField())),
+                default=ExpressionWrapper(
+                    F('total_completion_time') / ExpressionWrapper(F('completed_tasks'), output_field=IntegerField()),
+                    output_field=DurationField(),
+                ),
+            ),
+            efficiency_score=Case(
+                When(completed_tasks=0, then=Value(0, output_field=SCORE_FIELD)),
+                default=efficiency(F('on_time_tasks'), F('completed_tasks')),
+            ),
+        )
+
+
+def sync_completion(task, previous):
+    """
+    Узгоджує денний підсумок зі зміною вже підтвердженої задачі (previous — стан до зміни):
+    повернення з Completed лише віднімає внесок, а зміна виконавця чи терміну в завершеної
+    задачі переносить його — віднімає старий і додає новий.
+    """
+    if not previous or not previous['completed_at']:
+        return
+    if task.completed_at is None:
+        revoke_completion(task, previous)
+    elif any(previous[name] != getattr(task, name) for name in ('assignee_id', 'due_date', 'completed_at')):
+        with transaction.atomic():
+            revoke_completion(task, previous)
+            record_completion(task, task.completed_at)
+
+
+def complete_task(task, actor=None):
+    """
+    Підтверджує виконання задачі: status = Completed, completed_at, денний підсумок виконавця
+    і запис у журналі переходів. Рядок задачі блокується, тож повторне чи паралельне
+    підтвердження не рахується двічі.
+    Повертає False, якщо задача вже була завершена.
+    """
+    with transaction.atomic():
+        stored_status = Task.objects.select_for_update().filter(pk=task.pk).values_list('status', flat=True).first()
+        if stored_status == 'Completed':
+            task.status = stored_status
+            return False
+        task.status = 'Completed'
+        task.completed_at = timezone.now()
+        task.save(update_fields=['status', 'completed_at'])
+        record_completion(task, task.completed_at)
+        log_transitions(actor, [(task, stored_status)])
+    return True
+
+
+def performance_rows(since=None):
+    """
+    Денні підсумки з таблиці задач одним згрупованим запитом (виконавець, день).
+    Задачі без completed_at (підтверджені до появи поля або завершені автоматично) не враховуються.
+    """
+    tasks = Task.objects.filter(status='Completed', completed_at__isnull=False)
+    if since:
+        tasks = tasks.filter(completed_at__date__gte=since)
+    day = TruncDate('completed_at')
+    return (
+        tasks
+        .annotate(day=day)
+        .values('assignee_id', 'day')
+        .annotate(
+            completed=Count('id'),
+            on_time=Count('id', filter=Q(due_date__isnull=True) | Q(due_date__gte=day)),
+            total=Sum(ExpressionWrapper(F('completed_at') - F('created_at'), output_field=DurationField())),
+        )
+        .order_by()
+    )
+
+
+def rebuild_performance(since=None, batch_size=1000):
+    """
+    Перераховує EmployeePerformance з задач: обнуляє лічильники за період, записує
+    згруповані підсумки upsert-ом (note зберігається) і видаляє порожні рядки без приміток.
+    Повертає кількість записаних рядків.
+    """
+    existing = EmployeePerformance.objects.all()
+    if since:
+        existing = existing.filter(date__gte=since)
+
+    written = 0
+    with transaction.atomic():
+        existing.update(
+            completed_tasks=0, on_time_tasks=0, total_completion_time=timedelta(0),
+            avg_completion_time=None, efficiency_score=0,
+        )
+        batch = []
+        for row in performance_rows(since).iterator(chunk_size=batch_size):
+            batch.append(EmployeePerformance(
+                employee_id=row['assignee_id'],
+                date=row['day'],
+                completed_tasks=row['completed'],
+                on_time_tasks=row['on_time'],
+                total_completion_time=row['total'],
+                avg_completion_time=row['total'] / row['completed'],
+                efficiency_score=(Decimal(row['on_time'] * 100) / row['completed']).quantize(Decimal('0.01')),
+            ))
+            if len(batch) >= batch_size:
+                written += upsert(batch)
+                batch = []
+        if batch:
+            written += upsert(batch)
+        existing.filter(completed_tasks=0, note='').delete()
+    return written
+
+
+def upsert(rows):
+    EmployeePerformance.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['employee', 'date'],
+        update_fields=['completed_tasks', 'on_time_tasks', 'total_completion_time',
+                       'avg_completion_time', 'efficiency_score'],
+    )
+    return len(rows)
+
+
+def performance_summary(rows):
+    """Підсумки за період по кожному працівнику з денних рядків (без звернення до задач)."""
+    totals = (
+        rows.values('employee_id', 'employee__last_name', 'employee__first_name')
+        .annotate(completed=Sum('completed_tasks'), on_time=Sum('on_time_tasks'), total=Sum('total_completion_time'))
+        .order_by('employee__last_name', 'employee__first_name')
+    )
+    return [
+        {
+            'employee': row['employee_id'],
+            'employee_name': f"{row['employee__last_name']} {row['employee__first_name']}",
+            'completed_tasks': row['completed'],
+            'avg_completion_time': row['total'] / row['completed'] if row['completed'] else None,
+            'efficiency_score': round(row['on_time'] * 100 / row['completed'], 2) if row['completed'] else 0,
+        }
+        for row in totals
+    ]
@@ -0,0 +1,110 @@
+import logging
+import os
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+
+from . import background
+from .models import Blob
+from .storage import attachment_storage
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tif', '.tiff', '.webp'}
+PDF_EXTENSIONS = {'.pdf'}
+THUMBNAIL_SUFFIX = '.thumb.jpg'
+PREVIEW_SUFFIX = '.preview.jpg'
+
+
+def derived_name(blob_name, suffix):
+    return os.path.splitext(blob_name)[0] + suffix
+
+
+def preview_extension(blob):
+    """Розширення для вибору формату: блоб зберігається без нього, тож береться з назв вкладень."""
+    for filename in blob.attachments.values_list('filename', flat=True):
+        ext = os.path.splitext(filename)[1].lower()
+        if ext in IMAGE_EXTENSIONS or ext in PDF_EXTENSIONS:
+            return ext
+    return ''
+
+
+def open_first_page(path, ext):
+    """
+    Зображення або перша сторінка PDF як PIL.Image; None, якщо формат не підтримується.
+    ext — розширення оригінальної назви (див. preview_extension).
+    """
+    longest = max(settings.ATTACHMENT_PREVIEW_SIZE)
+
+    if ext in IMAGE_EXTENSIONS:
+        from PIL import Image, ImageOps
+        with Image.open(path) as image:
+            # для JPEG декодер одразу зменшує зображення, не розпаковуючи оригінал повністю
+            image.draft('RGB', settings.ATTACHMENT_PREVIEW_SIZE)
+            return ImageOps.exif_transpose(image)
+
+    if ext in PDF_EXTENSIONS:
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(path)
+        try:
+            page = pdf[0]
+            scale = longest / max(page.get_size())
+            return page.render(scale=scale).to_pil()
+        finally:
+            pdf.close()
+
+    return None
+
+
+def save_jpeg(image, name, size):
+    from PIL import Image
+    image = image.copy()
+    image.thumbnail(size)
+    if image.mode != 'RGB':
+        background_image = Image.new('RGB', image.size, 'white')
+        background_image.paste(image, mask=image.convert('RGBA').getchannel('A'))
+        image = background_image
+
+    full_path = attachment_storage.path(name)
+    tmp_path = f'{full_path}.{uuid.uuid4().hex}.tmp'
+    image.save(tmp_path, 'JPEG', quality=settings.ATTACHMENT_PREVIEW_QUALITY, optimize=True)
+    os.replace(tmp_path, full_path)
+
+
+def generate_previews(blob_id):
+    """Створює мініатюру і превʼю для блоба. Виконується у фоновому пулі."""
+    blob = Blob.objects.filter(pk=blob_id).first()
+    if blob is None:
+        return None
+
+    try:
+        image = open_first_page(attachment_storage.path(blob.name), preview_extension(blob))
+        if image is None:
+            status = 'unsupported'
+            thumbnail = preview = ''
+        else:
+            with image:
+                preview = derived_name(blob.name, PREVIEW_SUFFIX)
+                thumbnail = derived_name(blob.name, THUMBNAIL_SUFFIX)
+                save_jpeg(image, preview, settings.ATTACHMENT_PREVIEW_SIZE)
+                save_jpeg(image, thumbnail, settings.ATTACHMENT_THUMBNAIL_SIZE)
+            status = 'ready'
+    except Exception:
+        logger.exception('Не вдалося створити превʼю для %s', blob.name)
+        status = 'failed'
+        thumbnail = preview = ''
+
+    Blob.objects.filter(pk=blob_id).update(thumbnail=thumbnail, preview=preview, preview_status=status)
+    return status
+
+
+def schedule_previews(blob_id):
+    # після коміту: фоновий потік має бачити рядок Blob і файл
+    transaction.on_commit(lambda: background.submit(generate_previews, blob_id))
+
+
+def delete_previews(blob):
+    for name in (blob.thumbnail, blob.preview):
+        if name:
+            attachment_storage.delete(name)
@@ -0,0 +1,344 @@
+import csv
+import io
+import logging
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.text import slugify
+
+from . import background
+from .exports import format_text, spreadsheet_text
+from .models import Attachment, Comments, Order, Project, Report, Task
+
+logger = logging.getLogger(__name__)
+
+TASK_STATUS_DISPLAY = dict(Task.STATUS_CHOICES)
+TASK_PRIORITY_DISPLAY = dict(Task.PRIORITY_CHOICES)
+
+
+class Section:
+    """Таблиця звіту: заголовок розділу, назви колонок і рядки (будь-який ітерабельний)."""
+
+    def __init__(self, heading, columns, rows):
+        self.heading = heading
+        self.columns = columns
+        self.rows = rows
+
+
+def task_counters(tasks, today):
+    """Лічильники задач за статусами одним агрегатним запитом."""
+    return tasks.aggregate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(status='Completed')),
+        in_progress=Count('id', filter=Q(status='InProgress')),
+        pending=Count('id', filter=Q(status='PendingConfirmation')),
+        planned=Count('id', filter=Q(status='Planned')),
+        overdue=Count('id', filter=Q(due_date__lt=today) & ~Q(status='Completed')),
+    )
+
+
+def counter_rows(counters):
+    return [
+        ('Задач усього', counters['total']),
+        ('Завершено', counters['completed']),
+        ('В роботі', counters['in_progress']),
+        ('Очікує підтвердження', counters['pending']),
+        ('Заплановано', counters['planned']),
+        ('Прострочено', counters['overdue']),
+    ]
+
+
+def by_assignee(tasks, today):
+    rows = (
+        tasks.values('assignee__last_name', 'assignee__first_name')
+        .annotate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(status='Completed')),
+            overdue=Count('id', filter=Q(due_date__lt=today) & ~Q(status='Completed')),
+        )
+        .order_by('assignee__last_name', 'assignee__first_name')
+    )
+    return Section(
+        'Задачі за виконавцями',
+        ['Виконавець', 'Усього', 'Завершено', 'Прострочено'],
+        (
+            (f"{row['assignee__last_name']} {row['assignee__first_name']}".strip(),
+             row['total'], row['completed'], row['overdue'])
+            for row in rows
+        ),
+    )
+
+
+def task_list(tasks):
+    rows = tasks.order_by('due_date', 'id').values_list(
+        'title', 'status', 'priority', 'assignee__last_name', 'assignee__first_name', 'due_date',
+    )
+    return Section(
+        'Задачі',
+        ['Назва', 'Статус', 'Пріоритет', 'Виконавець', 'Термін'],
+        (
+            (title, TASK_STATUS_DISPLAY.get(status, status), TASK_PRIORITY_DISPLAY.get(priority, priority),
+             f'{last_name} {first_name}'.strip(), due_date)
+            for title, status, priority, last_name, first_name, due_date in rows.iterator(
+                chunk_size=settings.EXPORT_CHUNK_SIZE)
+        ),
+    )
+
+
+def project_report(report, today):
+    project = report.project
+    tasks = Task.objects.filter(project=project)
+    summary = [
+        ('Проєкт', project.name),
+        ('Статус', project.get_status_display()),
+        ('Початок', project.start_date),
+        ('Завершення', project.end_date),
+        *counter_rows(task_counters(tasks, today)),
+        ('Коментарів', Comments.objects.filter(project_comments=project).count()),
+        ('Файлів', Attachment.objects.filter(project_attachments=project).count()),
+        ('Змінено', project.last_modified_at),
+    ]
+    return [
+        Section('Загальні відомості', ['Показник', 'Значення'], summary),
+        by_assignee(tasks, today),
+        task_list(tasks),
+    ]
+
+
+def order_report(report, today):
+    order = Order.objects.select_related('client', 'project').get(pk=report.order_id)
+    tasks = Task.objects.filter(order=order)
+    summary = [
+        ('Замовлення', order.number),
+        ('Клієнт', f'{order.client.last_name} {order.client.first_name}'.strip()),
+        ('Проєкт', order.project.name if order.project else ''),
+        ('Статус', order.get_status_display()),
+        ('Термін', order.due_date),
+        *counter_rows(task_counters(tasks, today)),
+    ]
+    return [
+        Section('Загальні відомості', ['Показник', 'Значення'], summary),
+        by_assignee(tasks, today),
+        task_list(tasks),
+    ]
+
+
+def filtered_tasks(params):
+    tasks = Task.objects.all()
+    if params.get('project'):
+        tasks = tasks.filter(project_id=params['project'])
+    if params.get('assignee'):
+        tasks = tasks.filter(assignee_id=params['assignee'])
+    if params.get('status'):
+        tasks = tasks.filter(status__in=params['status'])
+    if params.get('date_from'):
+        tasks = tasks.filter(created_at__date__gte=params['date_from'])
+    if params.get('date_to'):
+        tasks = tasks.filter(created_at__date__lte=params['date_to'])
+    return tasks
+
+
+def task_report(report, today):
+    tasks = filtered_tasks(report.params)
+    by_project = (
+        tasks.values('project__name')
+        .annotate(total=Count('id'), completed=Count('id', filter=Q(status='Completed')))
+        .order_by('project__name')
+    )
+    by_priority = tasks.values('priority').annotate(total=Count('id')).order_by('-priority')
+    return [
+        Section('Загальні відомості', ['Показник', 'Значення'], counter_rows(task_counters(tasks, today))),
+        Section(
+            'Задачі за проєктами', ['Проєкт', 'Усього', 'Завершено'],
+            ((row['project__name'] or 'Без проєкту', row['total'], row['completed']) for row in by_project),
+        ),
+        Section(
+            'Задачі за пріоритетом', ['Пріоритет', 'Усього'],
+            ((TASK_PRIORITY_DISPLAY.get(row['priority'], row['priority']), row['total']) for row in by_priority),
+        ),
+        by_assignee(tasks, today),
+        task_list(tasks),
+    ]
+
+
+REPORT_BUILDERS = {
+    'Project': project_report,
+    'Order': order_report,
+    'Task': task_report,
+}
+
+
+# === Формати ===
+def render_csv(title, sections, out):
+    text = io.TextIOWrapper(out, encoding='utf-8-sig', newline='')
+    writer = csv.writer(text)
+    writer.writerow([spreadsheet_text(title)])
+    for section in sections:
+        writer.writerow([])
+        writer.writerow([section.heading])
+        writer.writerow(section.columns)
+        for row in section.rows:
+            writer.writerow([spreadsheet_text(value) for value in row])
+    text.detach()
+
+
+def render_xlsx(title, sections, out):
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    workbook = Workbook(write_only=True)
+    bold = Font(bold=True)
+    for section in sections:
+        # назва аркуша в Excel — до 31 символу
+        sheet = workbook.create_sheet(section.heading[:31])
+        header = []
+        for name in section.columns:
+            cell = WriteOnlyCell(sheet, value=name)
+            cell.font = bold
+            header.append(cell)
+        sheet.append(header)
+        for row in section.rows:
+            # рядок з "=" openpyxl записав би як формулу
+            sheet.append([value if isinstance(value, (int, float)) else spreadsheet_text(value) for value in row])
+    workbook.save(out)
+
+
+def render_pdf(title, sections, out):
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    # стандартні шрифти PDF не містять кирилиці
+    if 'ReportFont' not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont('ReportFont', settings.REPORT_PDF_FONT))
+    styles = getSampleStyleSheet()
+    for style in styles.byName.values():
+        style.fontName = 'ReportFont'
+
+    story = [Paragraph(title, styles['Title'])]
+    for section in sections:
+        story.append(Paragraph(section.heading, styles['Heading2']))
+        data = [section.columns] + [[format_text(value) for value in row] for row in section.rows]
+        table = Table(data, repeatRows=1)
+        table.setStyle(TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), 'ReportFont'),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+            ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+        ]))
+        story.append(table)
+        story.append(Spacer(1, 12))
+    SimpleDocTemplate(out, pagesize=A4, title=title).build(story)
+
+
+RENDERERS = {
+    'csv': render_csv,
+    'xlsx': render_xlsx,
+    'pdf': render_pdf,
+}
+
+
+# === Завдання ===
+def data_version(report):
+    """
+    Версія даних, з яких формується звіт. Проєкт оновлює last_modified_at при будь-якій
+    зміні задач, коментарів і файлів, тож для проєктного звіту цього достатньо.
+    Для інших типів — порожньо (без повторного використання).
+    """
+    if report.report_type == 'Project' and report.project_id:
+        modified = Project.objects.filter(pk=report.project_id).values_list('last_modified_at', flat=True).first()
+        return modified.isoformat() if modified else ''
+    return ''
+
+
+def find_cached_report(report_type, project, file_format):
+    """Готовий файл того ж проєктного звіту, якщо проєкт відтоді не змінювався."""
+    if report_type != 'Project' or project is None:
+        return None
+    return (
+        Report.objects
+        .filter(
+            status='ready', report_type='Project', project=project, format=file_format,
+            data_version=project.last_modified_at.isoformat(),
+        )
+        .exclude(file='')
+        .order_by('-finished_at')
+        .first()
+    )
+
+
+def generate_report(report_id):
+    """Формує файл звіту. Виконується у фоновому пулі."""
+    updated = Report.objects.filter(pk=report_id, status='queued').update(status='running', started_at=timezone.now())
+    if not updated:
+        return None
+    report = Report.objects.select_related('project').get(pk=report_id)
+    try:
+        # версію фіксуємо до читання даних: зміни під час формування дадуть новий звіт
+        version = data_version(report)
+        sections = REPORT_BUILDERS[report.report_type](report, timezone.now().date())
+        with tempfile.TemporaryFile() as out:
+            RENDERERS[report.format](report.title, sections, out)
+            out.seek(0)
+            name = f"{slugify(report.title, allow_unicode=True) or 'report'}-{report.pk}.{report.format}"
+            report.file.save(name, File(out), save=False)
+    except Exception as exc:
+        logger.exception('Не вдалося сформувати звіт %s', report_id)
+        Report.objects.filter(pk=report_id).update(status='failed', error=str(exc), finished_at=timezone.now())
+        return 'failed'
+
+    Report.objects.filter(pk=report_id).update(
+        status='ready', file=report.file.name, data_version=version, error='', finished_at=timezone.now(),
+    )
+    return 'ready'
+
+
+def request_report(**fields):
+    """
+    Створює звіт. Якщо для проєкту вже є готовий файл з незмінених даних — новий запис
+    одразу посилається на нього; інакше формування ставиться в чергу після коміту.
+    """
+    file_format = fields.get('format', 'xlsx')
+    cached = find_cached_report(fields['report_type'], fields.get('project'), file_format)
+    if cached is not None:
+        return Report.objects.create(
+            **fields, file=cached.file.name, status='ready',
+            data_version=cached.data_version, finished_at=timezone.now(),
+        )
+
+    report = Report.objects.create(**fields)
+    transaction.on_commit(lambda: background.submit(generate_report, report.pk))
+    return report
+
+
+def recover_reports(stale_after=None):
+    """
+    Черга звітів живе лише в пулі процесу, тож після перезапуску queued-звіти ставляться
+    в чергу знову (повторний запуск відсікає перевірка статусу в generate_report),
+    а running довше за stale_after (REPORT_STALE_AFTER) позначаються failed.
+    Повертає (поставлено в чергу, позначено failed).
+    """
+    if stale_after is None:
+        stale_after = timedelta(seconds=settings.REPORT_STALE_AFTER)
+    now = timezone.now()
+    failed = Report.objects.filter(status='running', started_at__lt=now - stale_after).update(
+        status='failed', error='Формування перервано (перезапуск сервера)', finished_at=now,
+    )
+    queued = list(Report.objects.filter(status='queued').values_list('pk', flat=True))
+    for report_id in queued:
+        background.submit(generate_report, report_id)
+    return len(queued), failed
+
+
+def schedule_report_recovery():
+    """Перевірка звітів, що лишились від попереднього процесу; викликається при старті сервера."""
+    background.submit(recover_reports)
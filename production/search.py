@@ -0,0 +1,62 @@
+from django.db import connection
+from django.db.models import Case, CharField, F, IntegerField, Q, Value, When
+from django.db.models.functions import Concat, Length
+
+# Мінімальна довжина запиту, з якої працює триграмний пошук (коротші — пошук за префіксом)
+TRIGRAM_MIN_LENGTH = 3
+
+
+def employee_name_expression():
+    """Повне ім'я працівника: прізвище, ім'я та по батькові разом."""
+    return Concat(
+        'last_name', Value(' '), 'first_name', Value(' '), 'middle_name',
+        output_field=CharField(),
+    )
+
+
+def suggestion(pk, label, secondary=None):
+    """Елемент відповіді suggest_*: id, підпис і необов'язковий додатковий підпис."""
+    return {'id': pk, 'label': label, 'secondary': secondary}
+
+
+def employee_suggestion(row):
+    """Підказка працівника з рядка values(): ПІБ і посада."""
+    label = ' '.join(filter(None, (row['last_name'], row['first_name'], row['middle_name'])))
+    return suggestion(row['id'], label, row['position__name'])
+
+
+EMPLOYEE_SUGGESTION_FIELDS = ('id', 'last_name', 'first_name', 'middle_name', 'position__name')
+
+
+def ranked_search(queryset, expression, query, limit=10):
+    """
+    Пошук для автодоповнення, впорядкований за релевантністю.
+    PostgreSQL: pg_trgm (оператор %> і word_similarity) по GIN-індексу — стійкий до
+    одруківок і часткових слів. Інші БД (SQLite у тестах): icontains, префікс вище.
+    """
+    query = query.strip()
+    if not query:
+        return queryset.none()
+    if isinstance(expression, str):
+        expression = F(expression)
+
+    queryset = queryset.annotate(search_text=expression)
+    if connection.vendor == 'postgresql' and len(query) >= TRIGRAM_MIN_LENGTH:
+        from django.contrib.postgres.search import TrigramWordSimilarity
+        return (
+            queryset
+            .filter(search_text__trigram_word_similar=query)
+            .annotate(search_rank=TrigramWordSimilarity(query, 'search_text'))
+            .order_by('-search_rank', Length('search_text'))[:limit]
+        )
+
+    return (
+        queryset
+        .filter(search_text__icontains=query)
+        .annotate(search_rank=Case(
+            When(search_text__istartswith=query, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        ))
+        .order_by('-search_rank', Length('search_text'))[:limit]
+    )
@@ -3,10 +3,14 @@ from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth import get_user_model
+from django.db import models
+from django.db.models import Prefetch
+from django.urls import reverse
+from .loaders import GenericRelationLoader
 from .models import (Position, Department,
                      Project, Attachment,
                      Comments, Task,
-                     TaskNotification)
+                     TaskNotification, Report, TaskStatusTransition)
 
 import random
 import string
@@ -14,6 +18,180 @@ import string
 User = get_user_model()
 
 
+def generate_password():
+    return ''.join(random.choices(string.ascii_letters + string.digits, k=10))
+
+
+def generate_username(email):
+    local = email.split('@')[0]
+    suffix = ''.join(random.choices(string.digits, k=3))
+    return f"{local}#{suffix}"
+
+
+class EagerLoadingMixin:
+    """
+    Формує select_related/Prefetch для queryset-у за полями серіалізатора,
+    щоб кількість запитів не залежала від кількості рядків.
+    """
+    # поле серіалізатора -> шляхи для select_related
+    select_related_fields = {}
+    # поле серіалізатора -> назва classmethod-у, що повертає Prefetch
+    prefetch_related_fields = {}
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None):
+        if fields is None:
+            fields = cls.Meta.fields
+
+        related = []
+        lookups = []
+        for name in fields:
+            for path in cls.select_related_fields.get(name, ()):
+                if path not in related:
+                    related.append(path)
+            method = cls.prefetch_related_fields.get(name)
+            if method:
+                lookups.append(getattr(cls, method)())
+
+        if related:
+            queryset = queryset.select_related(*related)
+        if lookups:
+            queryset = queryset.prefetch_related(*lookups)
+        return queryset
+
+
+def _split_param(value):
+    if not value:
+        return None
+    return [v.strip() for v in value.split(',') if v.strip()]
+
+
+class DynamicFieldsMixin:
+    """
+    ?fields=id,title — залишає лише перелічені поля.
+    ?expand=comments,files — у компактному поданні (compact = True) поля з
+    expandable_fields віддаються лише тоді, коли їх явно запитано.
+    """
+    expandable_fields = ()
+    compact = False
+
+    def __init__(self, *args, **kwargs):
+        self._only_fields = kwargs.pop('fields', None)
+        self._expand_fields = kwargs.pop('expand', None)
+        super().__init__(*args, **kwargs)
+
+    def _is_root(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        only, expand = self._only_fields, self._expand_fields
+
+        # параметри запиту стосуються лише кореневого серіалізатора
+        request = self.context.get('request')
+        if request is not None and request.method == 'GET' and self._is_root():
+            if only is None:
+                only = _split_param(request.query_params.get('fields'))
+            if expand is None:
+                expand = _split_param(request.query_params.get('expand'))
+
+        if only:
+            return {name: field for name, field in fields.items() if name in only}
+
+        if self.compact:
+            expand = set(expand or ())
+            for name in self.expandable_fields:
+                if name not in expand:
+                    fields.pop(name, None)
+        return fields
+
+
+class BatchLoadingListSerializer(serializers.ListSerializer):
+    """Перед серіалізацією списку завантажує generic-зв'язки одразу для всіх елементів."""
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        self.child.load_batch(items)
+        return super().to_representation(items)
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Бере об'єкт із preloaded (id -> об'єкт), якщо список-серіалізатор завантажив їх наперед."""
+    preloaded = None
+
+    def to_internal_value(self, data):
+        if self.preloaded is not None and not self.pk_field:
+            try:
+                return self.preloaded[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+        return super().to_internal_value(data)
+
+
+class BulkListSerializer(BatchLoadingListSerializer):
+    """
+    Перевірка списку: пов'язані об'єкти для PreloadedPrimaryKeyRelatedField читаються
+    одним запитом на поле, а не окремо для кожного елемента.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.preload_related(data)
+        return super().to_internal_value(data)
+
+    def preload_related(self, data):
+        for name, field in self.child.fields.items():
+            if field.read_only or not isinstance(field, PreloadedPrimaryKeyRelatedField):
+                continue
+            ids = {
+                item[name] for item in data
+                if isinstance(item, dict) and str(item.get(name, '')).isdigit()
+            }
+            field.preloaded = field.get_queryset().in_bulk(ids) if ids else {}
+
+
+class BulkUpdateListSerializer(BulkListSerializer):
+    """
+    Перевірка масового оновлення: instance — словник id -> об'єкт, кожен елемент
+    даних містить id і перевіряється дочірнім серіалізатором відносно свого об'єкта.
+    """
+
+    def run_child_validation(self, data):
+        try:
+            instance = self.instance[int(data['id'])]
+        except (KeyError, TypeError, ValueError):
+            raise serializers.ValidationError({'id': 'Об\'єкт не знайдено'})
+        self.child.instance = instance
+        self.child.initial_data = data
+        try:
+            return super().run_child_validation(data)
+        finally:
+            self.child.instance = None
+
+
+class BatchLoadingMixin:
+    """
+    batch_loaders: поле серіалізатора -> GenericRelationLoader. Дані завантажуються лише
+    для полів, що залишилися після ?fields=/?expand=; у Meta потрібен
+    list_serializer_class = BatchLoadingListSerializer.
+    """
+    batch_loaders = {}
+
+    def load_batch(self, instances):
+        fields = self.fields
+        for name, loader in self.batch_loaders.items():
+            if name in fields:
+                loader.load(instances)
+
+    def to_representation(self, instance):
+        # для елементів списку вже завантажено — повторного запиту не буде
+        self.load_batch([instance])
+        return super().to_representation(instance)
+
+
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
@@ -50,7 +228,7 @@ class DepartmentSerializer(serializers.ModelSerializer):
         fields = ['id', 'name']
 
 
-class EmployeeSerializer(serializers.ModelSerializer):
+class EmployeeSerializer(EagerLoadingMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=False)
     username = serializers.CharField(read_only=True)
 
@@ -76,20 +254,20 @@ class EmployeeSerializer(serializers.ModelSerializer):
             'department_name', 'position_name', 'full_name'
         ]
 
+    select_related_fields = {
+        'department_name': ('department',),
+        'position_name': ('position',),
+    }
+
     def get_full_name(self, obj):
         return ' '.join(filter(None, [obj.last_name, obj.first_name, obj.middle_name]))
 
     def create(self, validated_data):
-        pwd = validated_data.pop('password', None)
-        if not pwd:
-            pwd = ''.join(random.choices(string.ascii_letters + string.digits, k=10))
-
-        email = validated_data.get('email', '')
-        local = email.split('@')[0]
-        suffix = ''.join(random.choices(string.digits, k=3))
-        uname = f"{local}#{suffix}"
+        pwd = validated_data.pop('password', None) or generate_password()
+        uname = generate_username(validated_data.get('email', ''))
 
-        user = User.objects.create(username=uname, **validated_data)
+        # пароль хешується до INSERT — один запис замість двох
+        user = User(username=uname, **validated_data)
         user.set_password(pwd)
         user.save()
 
@@ -133,18 +311,25 @@ class AttachmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Attachment
         fields = '__all__'
-        read_only_fields = ['uploaded_at', 'uploaded_by']
+        read_only_fields = ['uploaded_at', 'uploaded_by', 'filename']
 
 from django.contrib.contenttypes.models import ContentType
 from .models import Comments
 from .serializers import CommentSerializer
 
-class TaskSerializer(serializers.ModelSerializer):
+task_comments_loader = GenericRelationLoader(Comments, 'prefetched_comments', select_related=('author',))
+project_comments_loader = GenericRelationLoader(
+    Comments, 'prefetched_comments', select_related=('author',), order_by=('-created_at',),
+)
+files_loader = GenericRelationLoader(Attachment, 'prefetched_files', select_related=('uploaded_by', 'blob'))
+
+
+class TaskSerializer(BatchLoadingMixin, EagerLoadingMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     creator_name = serializers.SerializerMethodField()
     assignee_name = serializers.SerializerMethodField()
     project_name = serializers.CharField(source='project.name', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
-    comments = CommentSerializer(many=True, read_only=True)
+    comments = serializers.SerializerMethodField()
     files = serializers.SerializerMethodField()
     priority_display = serializers.SerializerMethodField()
 
@@ -161,6 +346,32 @@ class TaskSerializer(serializers.ModelSerializer):
             'comments', 'files', 'priority_display',
         ]
         read_only_fields = ['creator', 'creator_name', 'status_display', 'project_name', 'assignee_name', 'created_at']
+        list_serializer_class = BulkListSerializer
+
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+    expandable_fields = ('comments', 'files')
+    select_related_fields = {
+        'creator_name': ('creator',),
+        'assignee_name': ('assignee',),
+        'project_name': ('project',),
+    }
+    prefetch_related_fields = {
+        'comments': 'prefetch_comments',
+        'files': 'prefetch_files',
+    }
+    batch_loaders = {
+        'comments': task_comments_loader,
+        'files': files_loader,
+    }
+
+    @classmethod
+    def prefetch_comments(cls):
+        loader = task_comments_loader
+        return Prefetch('comments', queryset=loader.get_queryset(), to_attr=loader.to_attr)
+
+    @classmethod
+    def prefetch_files(cls):
+        return Prefetch('attachment_set', queryset=files_loader.get_queryset(), to_attr=files_loader.to_attr)
 
     def get_creator_name(self, obj):
         return f"{obj.creator.last_name} {obj.creator.first_name}"
@@ -173,28 +384,51 @@ class TaskSerializer(serializers.ModelSerializer):
     
     def perform_create(self, serializer):
         serializer.save(creator=self.request.user)
-        
+
+    def get_comments(self, obj):
+        return CommentSerializer(obj.prefetched_comments, many=True, context=self.context).data
+
     def get_files(self, obj):
-        ct = ContentType.objects.get_for_model(Task)
-        attachments = Attachment.objects.filter(content_type=ct, object_id=obj.id)
-        return AttachmentSimpleSerializer(attachments, many=True, context=self.context).data
+        return AttachmentSimpleSerializer(obj.prefetched_files, many=True, context=self.context).data
 
 class AttachmentSimpleSerializer(serializers.ModelSerializer):
     uploaded_by = serializers.StringRelatedField()
     uploaded_by_id = serializers.IntegerField(source='uploaded_by.id')
     file = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
+    thumbnail = serializers.SerializerMethodField()
+    preview = serializers.SerializerMethodField()
 
     class Meta:
         model = Attachment
-        fields = ['id', 'file', 'description', 'uploaded_by', 'uploaded_by_id']
+        fields = ['id', 'file', 'filename', 'download_url', 'thumbnail', 'preview',
+                  'description', 'uploaded_by', 'uploaded_by_id']
 
-    def get_file(self, obj):
+    def _absolute(self, url):
         request = self.context.get('request')
         if request is not None:
-            return request.build_absolute_uri(obj.file.url)
-        return obj.file.url
+            return request.build_absolute_uri(url)
+        return url
+
+    def get_file(self, obj):
+        return self._absolute(obj.file.url)
+
+    def get_download_url(self, obj):
+        # потокова віддача з Range/ETag, працює і без DEBUG
+        return self._absolute(reverse('attachment-download', args=[obj.pk]))
+
+    def _blob_file_url(self, obj, field):
+        # blob має бути у select_related; файл віддається так само, як download (MEDIA_URL лише з DEBUG)
+        name = getattr(obj.blob, field, '') if obj.blob_id else ''
+        return self._absolute(reverse(f'attachment-{field}', args=[obj.pk])) if name else None
+
+    def get_thumbnail(self, obj):
+        return self._blob_file_url(obj, 'thumbnail')
+
+    def get_preview(self, obj):
+        return self._blob_file_url(obj, 'preview')
         
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(BatchLoadingMixin, EagerLoadingMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     last_modified_by_name = serializers.SerializerMethodField()
     last_modified_at = serializers.DateTimeField(format="%d.%m.%Y %H:%M", read_only=True)
@@ -216,6 +450,34 @@ class ProjectSerializer(serializers.ModelSerializer):
             'id', 'status_display', 'last_modified_by_name',
             'last_modified_at', 'tasks', 'comments', 'files'
         ]
+        list_serializer_class = BatchLoadingListSerializer
+
+    expandable_fields = ('tasks', 'comments', 'files')
+    select_related_fields = {
+        'last_modified_by_name': ('last_modified_by',),
+    }
+    prefetch_related_fields = {
+        'tasks': 'prefetch_tasks',
+        'comments': 'prefetch_comments',
+        'files': 'prefetch_files',
+    }
+    batch_loaders = {
+        'comments': project_comments_loader,
+        'files': files_loader,
+    }
+
+    @classmethod
+    def prefetch_tasks(cls):
+        return Prefetch('tasks', queryset=TaskSerializer.setup_eager_loading(Task.objects.all()))
+
+    @classmethod
+    def prefetch_comments(cls):
+        loader = project_comments_loader
+        return Prefetch('comments', queryset=loader.get_queryset(), to_attr=loader.to_attr)
+
+    @classmethod
+    def prefetch_files(cls):
+        return Prefetch('attachment_set', queryset=files_loader.get_queryset(), to_attr=files_loader.to_attr)
 
     def get_last_modified_by_name(self, obj):
         if obj.last_modified_by:
@@ -223,14 +485,21 @@ class ProjectSerializer(serializers.ModelSerializer):
         return None
 
     def get_comments(self, obj):
-        content_type = ContentType.objects.get_for_model(obj.__class__)
-        comments = Comments.objects.filter(content_type=content_type, object_id=obj.id).order_by('-created_at')
-        return CommentSerializer(comments, many=True, context=self.context).data
-    
+        return CommentSerializer(obj.prefetched_comments, many=True, context=self.context).data
+
     def get_files(self, obj):
-        ct = ContentType.objects.get_for_model(Project)
-        attachments = Attachment.objects.filter(content_type=ct, object_id=obj.id)
-        return AttachmentSimpleSerializer(attachments, many=True, context=self.context).data
+        return AttachmentSimpleSerializer(obj.prefetched_files, many=True, context=self.context).data
+
+
+
+class TaskListSerializer(TaskSerializer):
+    """Компактне подання задачі для списків: без comments і files, якщо їх не запитано через ?expand=."""
+    compact = True
+
+
+class ProjectListSerializer(ProjectSerializer):
+    """Компактне подання проєкту для списків: без tasks, comments і files, якщо їх не запитано через ?expand=."""
+    compact = True
 
     
 class TaskNotificationSerializer(serializers.ModelSerializer):
@@ -244,4 +513,65 @@ class TaskNotificationSerializer(serializers.ModelSerializer):
 
     def get_sender_name(self, obj):
         return f"{obj.sender.last_name} {obj.sender.first_name}"
-        
+
+
+class ReportSerializer(serializers.ModelSerializer):
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Report
+        fields = ['id', 'title', 'description', 'report_type', 'format', 'project', 'order', 'params',
+                  'status', 'status_display', 'error', 'created_at', 'finished_at', 'download_url']
+        read_only_fields = ['status', 'error', 'created_at', 'finished_at']
+
+    def get_download_url(self, obj):
+        if obj.status != 'ready' or not obj.file:
+            return None
+        url = reverse('report-download', args=[obj.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
+
+    def validate_params(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError('Очікується об\'єкт')
+        allowed = {'project', 'assignee', 'status', 'date_from', 'date_to'}
+        unknown = set(value) - allowed
+        if unknown:
+            raise serializers.ValidationError(f"Невідомі параметри: {', '.join(sorted(unknown))}")
+        for name in ('date_from', 'date_to'):
+            if value.get(name):
+                try:
+                    serializers.DateField().to_internal_value(value[name])
+                except serializers.ValidationError:
+                    raise serializers.ValidationError({name: 'Невірна дата'})
+        statuses = value.get('status')
+        if statuses:
+            if isinstance(statuses, str):
+                statuses = value['status'] = [statuses]
+            valid = dict(Task.STATUS_CHOICES)
+            if not isinstance(statuses, list) or any(status not in valid for status in statuses):
+                raise serializers.ValidationError({'status': 'Невідомий статус'})
+        return value
+
+    def validate(self, attrs):
+        report_type = attrs.get('report_type')
+        if report_type == 'Project' and not attrs.get('project'):
+            raise serializers.ValidationError({'project': 'Для проєктного звіту потрібен проєкт'})
+        if report_type == 'Order' and not attrs.get('order'):
+            raise serializers.ValidationError({'order': 'Для звіту по замовленню потрібне замовлення'})
+        return attrs
+
+
+class TaskStatusTransitionSerializer(serializers.ModelSerializer):
+    actor_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TaskStatusTransition
+        fields = ['id', 'from_status', 'to_status', 'at', 'actor', 'actor_name', 'reason']
+
+    def get_actor_name(self, obj):
+        # actor має бути у select_related
+        if obj.actor:
+            return f"{obj.actor.last_name} {obj.actor.first_name}"
+        return None
@@ -1,35 +1,173 @@
-from django.db.models.signals import post_save, post_delete
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from .models import Project, Task, Comments, Attachment
+from django.utils import timezone
+from .models import Project, Task, Comments, Attachment, Department, Position, User, TaskNotification
+from .dashboard import schedule_dashboard_invalidation
+from .notifications import invalidate_recipients, adjust_unread_counters, unread_counters_adjusted
+from .suggest_index import invalidate_suggest_indexes
+from .attachments import retain_blob, release_blob
+from .background import CommitBatch, commit_batch
+from .performance import sync_completion
+from . import stats
 
-def update_project_timestamp(project):
-    project.save(update_fields=['last_modified_at'])
+
+class ProjectTouchBatch(CommitBatch):
+    """
+    Проєкти, змінені в межах поточної транзакції. Після коміту
+    last_modified_at оновлюється одним UPDATE для всіх.
+    """
+    def __init__(self):
+        self.project_ids = set()
+
+    def run(self):
+        if self.project_ids:
+            Project.objects.filter(pk__in=self.project_ids).update(last_modified_at=timezone.now())
+
+
+def touch_projects(*project_ids):
+    project_ids = {pk for pk in project_ids if pk is not None}
+    if not project_ids:
+        return
+
+    batch = commit_batch(ProjectTouchBatch)
+    if batch is None:
+        # поза транзакцією — одразу
+        batch = ProjectTouchBatch()
+        batch.project_ids.update(project_ids)
+        batch()
+    else:
+        batch.project_ids.update(project_ids)
+
+
+def _project_id_for(instance):
+    # content_type_id порівнюємо з кешованим ContentType, не завантажуючи content_type
+    if instance.content_type_id == ContentType.objects.get_for_model(Project).id:
+        return instance.object_id
+    return None
 
 # 🟠 Оновлення проєкту при зміні коментаря
 @receiver(post_save, sender=Comments)
 @receiver(post_delete, sender=Comments)
 def update_project_on_comment_change(sender, instance, **kwargs):
-    if instance.content_type.model == 'project':
-        try:
-            project = Project.objects.get(id=instance.object_id)
-            update_project_timestamp(project)
-        except Project.DoesNotExist:
-            pass
+    touch_projects(_project_id_for(instance))
 
 # 🟡 Оновлення проєкту при додаванні/видаленні файлу
 @receiver(post_save, sender=Attachment)
 @receiver(post_delete, sender=Attachment)
 def update_project_on_file_change(sender, instance, **kwargs):
-    if instance.content_type.model == 'project':
-        try:
-            project = Project.objects.get(id=instance.object_id)
-            update_project_timestamp(project)
-        except Project.DoesNotExist:
-            pass
-
-# 🔵 Оновлення проєкту при зміні задачі
+    touch_projects(_project_id_for(instance))
+
+# 🔵 Оновлення проєкту при зміні задачі (і попереднього проєкту, якщо задачу перенесли)
 @receiver(post_save, sender=Task)
 @receiver(post_delete, sender=Task)
 def update_project_on_task_change(sender, instance, **kwargs):
-    if instance.project:
-        update_project_timestamp(instance.project)
+    touch_projects(instance.project_id, instance.get_loaded_value('project_id'))
+
+# 📊 Денна статистика задач: стан до збереження запам'ятовується в pre_save
+@receiver(pre_save, sender=Task)
+def remember_task_stats_state(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance._stats_previous = None if instance._state.adding else stats.loaded_state(instance)
+
+@receiver(post_save, sender=Task)
+def update_task_stats_on_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        previous = instance.__dict__.pop('_stats_previous', None)
+        stats.task_saved(instance, created, previous, update_fields)
+        # підтверджену задачу повернули з Completed чи передали іншому — правимо денні підсумки
+        sync_completion(instance, previous)
+
+@receiver(post_delete, sender=Task)
+def update_task_stats_on_delete(sender, instance, **kwargs):
+    stats.task_deleted(instance)
+
+# 🟢 Скидання кешу зведення при зміні задач і проєктів
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def invalidate_dashboard_on_change(sender, instance, update_fields=None, **kwargs):
+    # оновлення лише last_modified_at (коментарі/файли) не впливає на зведення
+    if update_fields and set(update_fields) <= {'last_modified_at'}:
+        return
+    schedule_dashboard_invalidation()
+
+# 🟣 Скидання кешу отримувачів сповіщень при зміні керівників
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def invalidate_notification_recipients(sender, instance, update_fields=None, **kwargs):
+    # вхід користувача оновлює лише last_login
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    # після коміту: інакше паралельний запит закешував би старий склад керівників
+    transaction.on_commit(invalidate_recipients)
+
+# 🔴 Лічильник непрочитаних для поодиноких змін (bulk-операції оновлюють його самі)
+@receiver(post_save, sender=TaskNotification)
+def update_unread_counter_on_save(sender, instance, created, **kwargs):
+    if created:
+        delta = 0 if instance.is_read else 1
+    elif instance.has_loaded_value('is_read') and instance.has_changed('is_read'):
+        delta = -1 if instance.is_read else 1
+    else:
+        delta = 0
+    adjust_unread_counters({instance.recipient_id: delta})
+
+@receiver(post_delete, sender=TaskNotification)
+def update_unread_counter_on_delete(sender, instance, **kwargs):
+    if not instance.is_read and not unread_counters_adjusted():
+        adjust_unread_counters({instance.recipient_id: -1})
+
+# ⚪ Індекси підказок: перебудова після коміту зміни довідників
+def _invalidate_suggest_on_commit(*names):
+    transaction.on_commit(lambda: invalidate_suggest_indexes(*names))
+
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def invalidate_department_suggestions(sender, instance, **kwargs):
+    # назва відділу входить і в підказки посад
+    _invalidate_suggest_on_commit('departments', 'positions')
+
+@receiver(post_save, sender=Position)
+@receiver(post_delete, sender=Position)
+def invalidate_position_suggestions(sender, instance, **kwargs):
+    _invalidate_suggest_on_commit('positions')
+
+@receiver(post_save, sender=Project)
+def invalidate_project_suggestions_on_save(sender, instance, created, **kwargs):
+    # автоматична зміна статусу не змінює назву
+    if created or instance.has_changed('name'):
+        _invalidate_suggest_on_commit('projects')
+
+@receiver(post_delete, sender=Project)
+def invalidate_project_suggestions_on_delete(sender, instance, **kwargs):
+    _invalidate_suggest_on_commit('projects')
+
+# 🟤 Лічильник посилань на блоби сховища вкладень
+@receiver(pre_save, sender=Attachment)
+def remember_attachment_blob(sender, instance, **kwargs):
+    # ім'я з БД запам'ятовують from_db і попередній save; SELECT лише для екземплярів, створених з pk вручну
+    if instance.pk and not hasattr(instance, '_stored_file_name'):
+        instance._stored_file_name = (
+            Attachment.objects.filter(pk=instance.pk).values_list('file', flat=True).first()
+        )
+
+@receiver(post_save, sender=Attachment)
+def retain_attachment_blob(sender, instance, created, **kwargs):
+    stored = getattr(instance, '_stored_file_name', None)
+    if created or stored != instance.file.name:
+        blob_id = retain_blob(instance.file.name)
+        if blob_id != instance.blob_id:
+            Attachment.objects.filter(pk=instance.pk).update(blob=blob_id)
+            instance.blob_id = blob_id
+        if stored:
+            release_blob(stored)
+    instance._stored_file_name = instance.file.name
+
+@receiver(post_delete, sender=Attachment)
+def release_attachment_blob(sender, instance, **kwargs):
+    release_blob(instance.file.name)
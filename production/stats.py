@@ -0,0 +1,258 @@
+import contextvars
+import operator
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+from functools import reduce
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Trunc, TruncDate
+from django.utils import timezone
+
+from .models import Task, TaskDailyStats, User
+
+COUNTERS = ('created', 'completed', 'due', 'overdue')
+GRANULARITIES = ('day', 'week', 'month', 'year')
+# Найбільше періодів в одному часовому ряді (запит на роки по днях відхиляється)
+MAX_SERIES_PERIODS = 1000
+# поля задачі, від яких залежить її внесок у статистику
+STATE_FIELDS = ('assignee_id', 'project_id', 'due_date', 'completed_at')
+
+_active_batch = contextvars.ContextVar('task_stats_batch', default=None)
+
+
+class StatsDelta:
+    """Зміни лічильників: (dimension, key, date) -> Counter(поле -> приріст)."""
+
+    def __init__(self):
+        self.rows = defaultdict(Counter)
+
+    def add_task(self, created_at, state, sign=1):
+        """Внесок задачі зі станом state (значення STATE_FIELDS) зі знаком sign."""
+        keys = [('total', 0), ('assignee', state['assignee_id']), ('project', state['project_id'] or 0)]
+        completed_day = timezone.localdate(state['completed_at']) if state['completed_at'] else None
+        for dimension, key in keys:
+            if created_at is not None:
+                self.rows[dimension, key, timezone.localdate(created_at)]['created'] += sign
+            if completed_day:
+                self.rows[dimension, key, completed_day]['completed'] += sign
+            if state['due_date']:
+                row = self.rows[dimension, key, state['due_date']]
+                row['due'] += sign
+                # незавершена задача з терміном у майбутньому ще не прострочена — день терміну
+                # відкидається при читанні, доки не мине (див. time_series)
+                if completed_day is None or completed_day > state['due_date']:
+                    row['overdue'] += sign
+
+    def apply(self):
+        """
+        Записує зміни: відсутні рядки вставляються (ignore_conflicts), потім рядки з однаковим
+        набором приростів оновлюються одним UPDATE з F()-виразами.
+        """
+        changes = {key: {name: n for name, n in counter.items() if n} for key, counter in self.rows.items()}
+        changes = {key: fields for key, fields in changes.items() if fields}
+        self.rows.clear()
+        if not changes:
+            return
+
+        batch_size = settings.TASK_BULK_BATCH_SIZE
+        TaskDailyStats.objects.bulk_create(
+            [TaskDailyStats(dimension=dimension, key=key, date=day) for dimension, key, day in changes],
+            ignore_conflicts=True, batch_size=batch_size,
+        )
+        groups = defaultdict(list)
+        for key, fields in changes.items():
+            groups[tuple(sorted(fields.items()))].append(key)
+        for fields, keys in groups.items():
+            keys = iter(keys)
+            while chunk := list(islice(keys, batch_size)):
+                condition = reduce(operator.or_, (Q(dimension=d, key=k, date=day) for d, k, day in chunk))
+                TaskDailyStats.objects.filter(condition).update(**{name: F(name) + n for name, n in fields})
+
+
+@contextmanager
+def stats_batch():
+    """
+    Зміни статистики від усіх задач, збережених чи видалених у межах блоку,
+    записуються разом наприкінці (для масових операцій).
+    """
+    if _active_batch.get() is not None:
+        yield _active_batch.get()
+        return
+    delta = StatsDelta()
+    token = _active_batch.set(delta)
+    try:
+        yield delta
+    finally:
+        _active_batch.reset(token)
+    delta.apply()
+
+
+def _record(fill):
+    batch = _active_batch.get()
+    delta = batch if batch is not None else StatsDelta()
+    fill(delta)
+    if batch is None:
+        delta.apply()
+
+
+def current_state(task):
+    return {name: getattr(task, name) for name in STATE_FIELDS}
+
+
+def loaded_state(task):
+    """
+    Стан задачі на момент завантаження з БД (або останнього save). Якщо якесь поле
+    не запам'ятоване (напр. задачу завантажено через only()), стан читається з БД.
+    """
+    if all(task.has_loaded_value(name) for name in STATE_FIELDS):
+        return {name: task.get_loaded_value(name) for name in STATE_FIELDS}
+    return Task.objects.filter(pk=task.pk).values(*STATE_FIELDS).first()
+
+
+def task_saved(task, created, previous, update_fields=None):
+    """previous — стан до збереження (None для нової задачі)."""
+    state = current_state(task)
+    if previous is not None and update_fields:
+        # незбережені зміни інших полів у БД не потрапили
+        saved = {task._meta.get_field(name).attname for name in update_fields}
+        state.update({name: value for name, value in previous.items() if name not in saved})
+
+    def fill(delta):
+        if previous is not None:
+            delta.add_task(task.created_at, previous, -1)
+        delta.add_task(task.created_at, state)
+    if created or previous != state:
+        _record(fill)
+
+
+def task_deleted(task):
+    if all(task.has_loaded_value(name) for name in STATE_FIELDS):
+        previous = {name: task.get_loaded_value(name) for name in STATE_FIELDS}
+    else:
+        previous = current_state(task)
+    _record(lambda delta: delta.add_task(task.created_at, previous, -1))
+
+
+# === Перерахунок ===
+def grouped_counts(since=None):
+    """
+    Усі лічильники з таблиці задач згрупованими запитами: по одному на кожен
+    вимір і лічильник (created за датою створення, completed — підтвердження, due/overdue — терміну).
+    """
+    tasks = Task.objects.order_by()
+    completed_day = TruncDate('completed_at')
+    metrics = [
+        (TruncDate('created_at'), Q(), {'created': Count('id')}),
+        (completed_day, Q(completed_at__isnull=False), {'completed': Count('id')}),
+        (F('due_date'), Q(due_date__isnull=False), {
+            'due': Count('id'),
+            'overdue': Count('id', filter=Q(completed_at__isnull=True) | Q(due_date__lt=completed_day)),
+        }),
+    ]
+    dimensions = [('total', None), ('assignee', 'assignee_id'), ('project', 'project_id')]
+
+    rows = defaultdict(Counter)
+    for day, condition, counters in metrics:
+        queryset = tasks.filter(condition).annotate(day=day)
+        if since:
+            queryset = queryset.filter(day__gte=since)
+        for dimension, field in dimensions:
+            group = ['day'] + ([field] if field else [])
+            for row in queryset.values(*group).annotate(**counters).iterator():
+                key = (row[field] or 0) if field else 0
+                for name in counters:
+                    rows[dimension, key, row['day']][name] += row[name]
+    return rows
+
+
+def rebuild_task_stats(since=None):
+    """Перераховує TaskDailyStats (з дати since або повністю). Повертає кількість рядків."""
+    existing = TaskDailyStats.objects.all()
+    if since:
+        existing = existing.filter(date__gte=since)
+    with transaction.atomic():
+        rows = grouped_counts(since)
+        existing.delete()
+        TaskDailyStats.objects.bulk_create(
+            [
+                TaskDailyStats(dimension=dimension, key=key, date=day, **counters)
+                for (dimension, key, day), counters in rows.items()
+            ],
+            batch_size=settings.TASK_BULK_BATCH_SIZE,
+        )
+    return len(rows)
+
+
+# === Часові ряди ===
+def period_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    if granularity == 'year':
+        return day.replace(month=1, day=1)
+    return day
+
+
+def next_period(day, granularity):
+    if granularity == 'week':
+        return day + timedelta(weeks=1)
+    if granularity == 'month':
+        return (day + timedelta(days=32)).replace(day=1)
+    if granularity == 'year':
+        return day.replace(year=day.year + 1)
+    return day + timedelta(days=1)
+
+
+def series_rows(dimension='total', key=None, department=None):
+    """Рядки статистики для ряду: усі задачі, проєкт, виконавець або відділ (сума виконавців)."""
+    if department is not None:
+        employees = User.objects.filter(department_id=department).values('id')
+        return TaskDailyStats.objects.filter(dimension='assignee', key__in=employees)
+    rows = TaskDailyStats.objects.filter(dimension=dimension)
+    if dimension != 'total':
+        rows = rows.filter(key=key or 0)
+    return rows
+
+
+def period_count(date_from, date_to, granularity='day'):
+    """Кількість періодів granularity, які зачіпає проміжок date_from..date_to."""
+    if granularity == 'week':
+        return (period_start(date_to, 'week') - period_start(date_from, 'week')).days // 7 + 1
+    if granularity == 'month':
+        return (date_to.year - date_from.year) * 12 + date_to.month - date_from.month + 1
+    if granularity == 'year':
+        return date_to.year - date_from.year + 1
+    return (date_to - date_from).days + 1
+
+
+def time_series(rows, date_from, date_to, granularity='day', today=None):
+    """
+    Суми лічильників за періоди granularity між date_from і date_to включно.
+    Періоди без даних повертаються з нулями; перший і останній можуть бути неповними.
+    Прострочені рахуються лише за дні терміну до today: задача стає простроченою, коли день минув.
+    """
+    today = today or timezone.localdate()
+    sums = {name: Sum(name) for name in COUNTERS}
+    sums['overdue'] = Sum('overdue', filter=Q(date__lt=today))
+    totals = {
+        row['period']: row
+        for row in (
+            rows.filter(date__range=(date_from, date_to))
+            .annotate(period=Trunc('date', granularity))
+            .values('period')
+            .annotate(**sums)
+            .order_by()
+        )
+    }
+    series = []
+    period = period_start(date_from, granularity)
+    while period <= date_to:
+        row = totals.get(period, {})
+        series.append({'period': period, **{name: row.get(name) or 0 for name in COUNTERS}})
+        period = next_period(period, granularity)
+    return series
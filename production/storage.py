@@ -0,0 +1,114 @@
+import hashlib
+import os
+import uuid
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+from django.db import transaction
+from django.utils.deconstruct import deconstructible
+
+BLOB_PREFIX = 'blobs/'
+
+
+def blob_name(sha256):
+    """
+    Шлях блоба: blobs/ab/cd/<sha256>. Лише хеш, без розширення: той самий вміст під
+    різними назвами (photo.JPG, photo.jpeg) — один блоб. MIME-тип береться з назви вкладення.
+    """
+    return f'{BLOB_PREFIX}{sha256[:2]}/{sha256[2:4]}/{sha256}'
+
+
+def is_blob_name(name):
+    return bool(name) and name.startswith(BLOB_PREFIX)
+
+
+def blob_sha256(name):
+    return os.path.splitext(os.path.basename(name))[0]
+
+
+def content_sha256(content):
+    """Хеш, підрахований під час завантаження (атрибут sha256), або окремий потоковий прохід."""
+    digest = getattr(content, 'sha256', None)
+    if digest:
+        return digest
+    hasher = hashlib.sha256()
+    for chunk in content.chunks():
+        hasher.update(chunk)
+    content.seek(0)
+    return hasher.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Сховище вкладень за вмістом: файл зберігається під своїм SHA-256 один раз.
+    Повторне збереження того ж вмісту нічого не пише і повертає наявне ім'я.
+    Видалення блобів — через лічильник посилань Blob (див. signals).
+    Зберігати слід у транзакції (Attachment.save): рядок Blob лишається заблокованим,
+    доки retain_blob не збільшить лічильник, і delete_unreferenced_blob не видалить файл.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # ім'я визначає вміст, суфікси не потрібні
+        return name
+
+    def _save(self, name, content):
+        from .models import Blob
+
+        name = blob_name(content_sha256(content))
+        full_path = self.path(name)
+        with transaction.atomic():
+            # блокування чекає на видалення блоба, що вже почалося; без рядка Blob файл пишеться заново
+            if Blob.objects.select_for_update().filter(name=name).exists() and os.path.exists(full_path):
+                return name
+
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        if hasattr(content, 'temporary_file_path'):
+            file_move_safe(content.temporary_file_path(), full_path, allow_overwrite=True)
+        else:
+            # запис у тимчасовий файл і атомарна заміна: паралельне збереження того ж вмісту безпечне
+            tmp_path = f'{full_path}.{uuid.uuid4().hex}.tmp'
+            with open(tmp_path, 'wb') as f:
+                for chunk in content.chunks():
+                    f.write(chunk)
+            os.replace(tmp_path, full_path)
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+        return name
+
+
+attachment_storage = ContentAddressedStorage()
+
+
+def get_attachment_storage():
+    return attachment_storage
+
+
+class HashingUploadMixin:
+    """Рахує SHA-256 файлу з multipart-запиту під час отримання частин."""
+
+    def new_file(self, *args, **kwargs):
+        self.hasher = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        result = super().receive_data_chunk(raw_data, start)
+        # None означає, що частину забрав цей обробник
+        if result is None:
+            self.hasher.update(raw_data)
+        return result
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.sha256 = self.hasher.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(HashingUploadMixin, MemoryFileUploadHandler):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(HashingUploadMixin, TemporaryFileUploadHandler):
+    pass
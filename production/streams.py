@@ -0,0 +1,123 @@
+import asyncio
+import json
+import threading
+import uuid
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+TICKET_SALT = 'production.streams.ticket'
+
+
+class InProcessBroker:
+    """
+    Pub/sub у межах одного процесу: на кожне підключення — власна черга asyncio.
+    publish() можна викликати з будь-якого потоку (синхронні view, фонові задачі).
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        queue = asyncio.Queue()
+        with self._lock:
+            self._subscribers[user_id].add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers is None:
+                return
+            subscribers.difference_update({s for s in subscribers if s[1] is queue})
+            if not subscribers:
+                del self._subscribers[user_id]
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(s) for s in self._subscribers.values())
+
+    def publish(self, user_id, event, data):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        message = (event, data)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, message)
+            except RuntimeError:
+                # цикл подій уже закрито — підписник зникне під час unsubscribe
+                pass
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Брокер задається NOTIFICATIONS_BROKER, тож його можна замінити на зовнішній."""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            path = getattr(settings, 'NOTIFICATIONS_BROKER', 'production.streams.InProcessBroker')
+            _broker = import_string(path)()
+    return _broker
+
+
+def issue_stream_ticket(user_id):
+    """
+    Одноразовий квиток на підключення до потоку: EventSource не вміє передавати заголовки,
+    а JWT у рядку запиту потрапив би в журнали доступу.
+    """
+    return signing.dumps({'user': user_id, 'nonce': uuid.uuid4().hex}, salt=TICKET_SALT)
+
+
+def redeem_stream_ticket(ticket):
+    """
+    id користувача за квитком або None, якщо підпис невірний, квиток старший
+    за NOTIFICATIONS_STREAM_TICKET_TTL секунд або вже використаний.
+    """
+    ttl = settings.NOTIFICATIONS_STREAM_TICKET_TTL
+    try:
+        data = signing.loads(ticket, salt=TICKET_SALT, max_age=ttl)
+    except signing.BadSignature:
+        return None
+    # позначка використання живе довше за квиток, тож повторно його не прийняти
+    if not cache.add(f"notifications:ticket:{data['nonce']}", True, ttl * 2):
+        return None
+    return data['user']
+
+
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)}\n\n"
+
+
+async def stream_events(user_id, count_unread, keepalive):
+    """
+    Потік подій SSE для користувача:
+      unread        {"count": N}                 — знімок кількості непрочитаних при підключенні
+      unread        {"delta": d}                 — зміна кількості (прочитано/видалено)
+      notification  {"notification": {...}, "delta": 1} — нове сповіщення
+
+    count_unread(user_id) — синхронна функція знімка. Її викликаємо вже після підписки:
+    подія між знімком і підпискою загубилася б, а так вона лише чекає в черзі.
+    """
+    broker = get_broker()
+    queue = broker.subscribe(user_id)
+    try:
+        count = await sync_to_async(count_unread)(user_id)
+        yield format_sse('unread', {'count': count})
+        while True:
+            try:
+                event, data = await asyncio.wait_for(queue.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield format_sse(event, data)
+    finally:
+        broker.unsubscribe(user_id, queue)
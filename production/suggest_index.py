@@ -0,0 +1,140 @@
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+from .models import Department, Position, Project
+from .search import ranked_search, suggestion
+
+
+def normalize(text):
+    return ' '.join((text or '').casefold().split())
+
+
+class PrefixIndex:
+    """
+    Індекс автодоповнення в пам'яті процесу: відсортований масив ключів, де для кожного
+    запису є ключ з кожного слова назви («нова лінія», «лінія»). Пошук за префіксом — bisect.
+    Завантажується ліниво; застаріває після invalidate() або через SUGGEST_INDEX_TTL секунд.
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._state = None
+
+    def invalidate(self):
+        self._generation += 1
+
+    def _is_fresh(self, state):
+        if state is None or state['generation'] != self._generation:
+            return False
+        return time.monotonic() - state['loaded_at'] < settings.SUGGEST_INDEX_TTL
+
+    def _build(self):
+        generation = self._generation
+        rows = {}
+        entries = []
+        for label, payload in self.loader():
+            rows[payload['id']] = payload
+            words = normalize(label).split(' ')
+            for position in range(len(words)):
+                entries.append((' '.join(words[position:]), position, len(label), payload['id']))
+        entries.sort()
+        return {
+            'generation': generation,
+            'loaded_at': time.monotonic(),
+            'keys': [entry[0] for entry in entries],
+            'entries': entries,
+            'rows': rows,
+        }
+
+    def _get_state(self):
+        state = self._state
+        if self._is_fresh(state):
+            return state
+        with self._lock:
+            if not self._is_fresh(self._state):
+                self._state = self._build()
+            return self._state
+
+    def search(self, query, limit=10):
+        query = normalize(query)
+        if not query:
+            return []
+        state = self._get_state()
+        keys, entries = state['keys'], state['entries']
+
+        best = {}
+        i = bisect_left(keys, query)
+        while i < len(keys) and keys[i].startswith(query):
+            key, position, length, pk = entries[i]
+            # збіг з початку назви вище за збіг з середини, далі коротші назви
+            rank = (position > 0, length)
+            if pk not in best or rank < best[pk]:
+                best[pk] = rank
+            i += 1
+
+        ordered = sorted(best, key=lambda pk: (best[pk], pk))[:limit]
+        return [state['rows'][pk] for pk in ordered]
+
+
+def department_rows():
+    return Department.objects.values('id', 'name')
+
+
+def department_suggestion(row):
+    return suggestion(row['id'], row['name'])
+
+
+def position_rows():
+    return Position.objects.values('id', 'name', 'department__name')
+
+
+def position_suggestion(row):
+    return suggestion(row['id'], row['name'], row['department__name'])
+
+
+def project_rows():
+    return Project.objects.values('id', 'name')
+
+
+def project_suggestion(row):
+    return suggestion(row['id'], row['name'])
+
+
+# назва -> (рядки з БД, перетворення рядка на підказку)
+SUGGEST_SOURCES = {
+    'departments': (department_rows, department_suggestion),
+    'positions': (position_rows, position_suggestion),
+    'projects': (project_rows, project_suggestion),
+}
+
+
+def _loader(rows, to_suggestion):
+    def load():
+        for row in rows():
+            yield row['name'], to_suggestion(row)
+    return load
+
+
+SUGGEST_INDEXES = {name: PrefixIndex(_loader(*source)) for name, source in SUGGEST_SOURCES.items()}
+
+
+def search_suggestions(name, query, limit=10):
+    """
+    Пошук за префіксом слова в індексі пам'яті. Якщо збігів немає (одруківка, частина слова) —
+    ranked_search у БД: у PostgreSQL триграмний по GIN-індексах *_name_trgm.
+    """
+    found = SUGGEST_INDEXES[name].search(query, limit)
+    if found or not normalize(query):
+        return found
+    rows, to_suggestion = SUGGEST_SOURCES[name]
+    return [to_suggestion(row) for row in ranked_search(rows(), 'name', query, limit)]
+
+
+def invalidate_suggest_indexes(*names):
+    for name in names:
+        SUGGEST_INDEXES[name].invalidate()
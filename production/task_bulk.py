@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.db import transaction
+
+from .dashboard import schedule_dashboard_invalidation
+from .models import Task
+from .performance import sync_completion
+from .signals import touch_projects
+from .stats import current_state, loaded_state, stats_batch
+from .transitions import log_transitions
+
+
+def bulk_save_tasks(creator, create=(), update=(), delete=()):
+    """
+    Масові зміни задач однією транзакцією.
+    create — список validated_data нових задач; update — пари (task, validated_data)
+    для задач, завантажених з БД; delete — id задач.
+    Статуси визначаються в пам'яті (Task.apply_auto_status), запис — bulk_create/bulk_update.
+    bulk-операції не надсилають post_save, тож проєкти й зведення оновлюються тут один раз.
+    Зміни статусів записуються в журнал переходів від імені creator, денна статистика — одним пакетом.
+    """
+    batch_size = settings.TASK_BULK_BATCH_SIZE
+    project_ids = set()
+
+    with transaction.atomic(), stats_batch() as stats_delta:
+        created = [Task(creator=creator, **data) for data in create]
+        Task.apply_auto_status(created)
+        Task.objects.bulk_create(created, batch_size=batch_size)
+        project_ids.update(task.project_id for task in created)
+        changes = [(task, None) for task in created]
+        for task in created:
+            stats_delta.add_task(task.created_at, current_state(task))
+
+        updated = []
+        previous = {}
+        # completed_at скидається, якщо задачу повернули з Completed
+        fields = {'status', 'completed_at'}
+        for task, data in update:
+            changes.append((task, task.status))
+            previous[task.pk] = loaded_state(task)
+            stats_delta.add_task(task.created_at, previous[task.pk], -1)
+            project_ids.add(task.project_id)
+            for name, value in data.items():
+                setattr(task, name, value)
+            fields.update(data)
+            project_ids.add(task.project_id)
+            updated.append(task)
+        if updated:
+            Task.apply_auto_status(updated)
+            Task.objects.bulk_update(updated, sorted(fields), batch_size=batch_size)
+            for task in updated:
+                task._remember_loaded_values()
+                stats_delta.add_task(task.created_at, current_state(task))
+                sync_completion(task, previous[task.pk])
+
+        deleted = []
+        if delete:
+            doomed = Task.objects.filter(pk__in=delete)
+            for pk, project_id in doomed.values_list('pk', 'project_id'):
+                deleted.append(pk)
+                project_ids.add(project_id)
+            # коментарі й вкладення видаляються разом із задачами (GenericRelation)
+            doomed.delete()
+
+        log_transitions(creator, changes)
+        touch_projects(*project_ids)
+        if created or updated or deleted:
+            schedule_dashboard_invalidation()
+
+    return created, updated, deleted
@@ -0,0 +1,432 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.contrib.contenttypes.models import ContentType
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from .base import BaseTestCase
+from ..models import Attachment, AttachmentUpload, Blob, Project
+
+
+class AttachmentTestCase(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            ATTACHMENT_UPLOAD_TEMP_DIR=f'{self.media_root}/tmp',
+        )
+        self.settings_override.enable()
+        self.project = Project.objects.create(name="Проєкт з файлами", start_date=date.today())
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+        super().tearDown()
+
+    def start_upload(self, filename="drawing.dwg", size=None):
+        data = {
+            'content_type_app': 'production',
+            'content_type_model': 'project',
+            'object_id': self.project.id,
+            'filename': filename,
+        }
+        if size is not None:
+            data['size'] = size
+        return self.client_manager.post(reverse('attachment-upload'), data, format='json')
+
+    def put_chunk(self, upload_id, offset, chunk):
+        return self.client_manager.generic(
+            'PUT', reverse('attachment-upload-detail', args=[upload_id]), chunk,
+            content_type='application/octet-stream', HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def upload(self, content, filename="drawing.dwg", chunk_size=4):
+        upload_id = self.start_upload(filename, len(content)).data['id']
+        for offset in range(0, len(content), chunk_size):
+            self.put_chunk(upload_id, offset, content[offset:offset + chunk_size])
+        response = self.client_manager.post(reverse('attachment-upload-finalize', args=[upload_id]))
+        return Attachment.objects.get(pk=response.data['id'])
+
+
+class ChunkedUploadTests(AttachmentTestCase):
+
+    def test_chunked_upload_creates_attachment(self):
+        response = self.start_upload(size=10)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        upload_id = response.data['id']
+
+        self.assertEqual(self.put_chunk(upload_id, 0, b'01234').data['offset'], 5)
+        self.assertEqual(self.put_chunk(upload_id, 5, b'56789').data['offset'], 10)
+
+        response = self.client_manager.post(reverse('attachment-upload-finalize', args=[upload_id]))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        attachment = Attachment.objects.get(pk=response.data['id'])
+        self.assertEqual(attachment.content_object, self.project)
+        self.assertEqual(attachment.uploaded_by, self.manager)
+        with attachment.file.open('rb') as f:
+            self.assertEqual(f.read(), b'0123456789')
+        self.assertFalse(AttachmentUpload.objects.exists())
+        print("\nТест 'Поблочне завантаження вкладення' пройдено успішно")
+
+    def test_wrong_offset_returns_current_offset(self):
+        upload_id = self.start_upload(size=10).data['id']
+        self.put_chunk(upload_id, 0, b'01234')
+
+        response = self.put_chunk(upload_id, 2, b'23456')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['offset'], 5)
+
+        response = self.client_manager.get(reverse('attachment-upload-detail', args=[upload_id]))
+        self.assertEqual(response.data['offset'], 5)
+        print("\nТест 'Продовження завантаження з правильного зсуву' пройдено успішно")
+
+    def test_incomplete_upload_cannot_be_finalized(self):
+        upload_id = self.start_upload(size=10).data['id']
+        self.put_chunk(upload_id, 0, b'01234')
+
+        response = self.client_manager.post(reverse('attachment-upload-finalize', args=[upload_id]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.put_chunk(upload_id, 5, b'56789-extra')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Attachment.objects.exists())
+        print("\nТест 'Незавершене завантаження не створює вкладення' пройдено успішно")
+
+    def test_finalize_drops_bytes_past_offset(self):
+        upload_id = self.start_upload().data['id']
+        self.put_chunk(upload_id, 0, b'01234')
+        # шматок, що обірвався після запису на диск, але до оновлення offset
+        with open(os.path.join(self.media_root, 'tmp', f'{upload_id}.part'), 'ab') as part:
+            part.write(b'junk')
+
+        response = self.client_manager.post(reverse('attachment-upload-finalize', args=[upload_id]))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        attachment = Attachment.objects.get(pk=response.data['id'])
+        with attachment.file.open('rb') as f:
+            self.assertEqual(f.read(), b'01234')
+        self.assertEqual(attachment.blob.sha256, hashlib.sha256(b'01234').hexdigest())
+        print("\nТест 'Зайві байти за зсувом не потрапляють у вкладення' пройдено успішно")
+
+    def test_expire_abandoned_uploads(self):
+        stale_id = self.start_upload(size=10).data['id']
+        self.put_chunk(stale_id, 0, b'0123')
+        fresh_id = self.start_upload(size=10).data['id']
+        self.put_chunk(fresh_id, 0, b'0123')
+        AttachmentUpload.objects.filter(pk=stale_id).update(updated_at=timezone.now() - timedelta(days=2))
+        # тимчасовий файл без сесії
+        orphan = os.path.join(self.media_root, 'tmp', 'orphan.part')
+        open(orphan, 'wb').close()
+        os.utime(orphan, (0, 0))
+
+        out = io.StringIO()
+        call_command('expire_attachment_uploads', stdout=out)
+        self.assertIn('expired=1', out.getvalue())
+        self.assertEqual(list(AttachmentUpload.objects.values_list('pk', flat=True)), [fresh_id])
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'tmp')), [f'{fresh_id}.part'])
+        print("\nТест 'Видалення покинутих сесій завантаження' пройдено успішно")
+
+    def test_upload_session_is_private(self):
+        upload_id = self.start_upload(size=5).data['id']
+        response = self.client_worker.put(
+            reverse('attachment-upload-detail', args=[upload_id]), b'01234',
+            content_type='application/octet-stream', HTTP_UPLOAD_OFFSET='0',
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        print("\nТест 'Чужа сесія завантаження недоступна' пройдено успішно")
+
+
+class AttachmentDownloadTests(AttachmentTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.attachment = self.upload(b'0123456789', filename="scan.pdf")
+        self.url = reverse('attachment-download', args=[self.attachment.id])
+
+    def test_full_download_with_etag(self):
+        response = self.client_manager.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+        etag = response['ETag']
+        response = self.client_manager.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        print("\nТест 'Завантаження файлу з ETag' пройдено успішно")
+
+    def test_if_none_match_compares_whole_tags(self):
+        etag = self.client_manager.get(self.url)['ETag']
+        for header in [f'"other", W/{etag}', '*', f'"x",{etag}']:
+            response = self.client_manager.get(self.url, HTTP_IF_NONE_MATCH=header)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, header)
+
+        # частина тегу — не збіг
+        response = self.client_manager.get(self.url, HTTP_IF_NONE_MATCH=f'"{etag[1:3]}", "{etag}"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response.close()
+        print("\nТест 'If-None-Match порівнює теги повністю' пройдено успішно")
+
+    def test_project_files_link_to_download(self):
+        response = self.client_manager.get(reverse('project-detail', args=[self.project.id]))
+        self.assertEqual(
+            response.data['files'][0]['download_url'],
+            'http://testserver' + self.url,
+        )
+        print("\nТест 'Посилання на потокове завантаження у файлах проєкту' пройдено успішно")
+
+    def test_range_requests(self):
+        response = self.client_manager.get(self.url, HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/10')
+        self.assertEqual(response['Content-Length'], '4')
+
+        response = self.client_manager.get(self.url, HTTP_RANGE='bytes=-3')
+        self.assertEqual(b''.join(response.streaming_content), b'789')
+
+        response = self.client_manager.get(self.url, HTTP_RANGE='bytes=20-')
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(response['Content-Range'], 'bytes */10')
+
+        response = self.client_manager.get(self.url, HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response.close()
+        print("\nТест 'Часткове завантаження (Range)' пройдено успішно")
+
+    def test_range_on_empty_file(self):
+        url = reverse('attachment-download', args=[self.upload(b'', filename="empty.txt").id])
+        for header in ['bytes=-5', 'bytes=0-']:
+            response = self.client_manager.get(url, HTTP_RANGE=header)
+            self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, header)
+            self.assertEqual(response['Content-Range'], 'bytes */0')
+        print("\nТест 'Діапазон для порожнього файлу' пройдено успішно")
+
+    def test_offload_to_web_server(self):
+        with override_settings(ATTACHMENT_DOWNLOAD_OFFLOAD='x-accel-redirect'):
+            response = self.client_manager.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/' + self.attachment.file.name)
+        self.assertEqual(response.content, b'')
+
+        with override_settings(ATTACHMENT_DOWNLOAD_OFFLOAD='x-sendfile'):
+            response = self.client_manager.get(self.url)
+        self.assertEqual(response['X-Sendfile'], self.attachment.file.path)
+        print("\nТест 'Віддача файлу веб-сервером' пройдено успішно")
+
+
+class ContentAddressedStorageTests(AttachmentTestCase):
+
+    def test_same_content_stored_once(self):
+        first = self.upload(b'same drawing', filename="a.dwg")
+        second = self.upload(b'same drawing', filename="b.dwg")
+
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertTrue(first.file.name.startswith('blobs/'))
+        self.assertEqual((first.filename, second.filename), ("a.dwg", "b.dwg"))
+        self.assertEqual(Blob.objects.get(name=first.file.name).ref_count, 2)
+        self.assertEqual(os.listdir(f'{self.media_root}/tmp'), [])
+        print("\nТест 'Однаковий вміст зберігається один раз' пройдено успішно")
+
+    def test_extension_does_not_split_blobs(self):
+        upper = self.upload(b'same photo', filename="photo.JPG")
+        lower = self.upload(b'same photo', filename="photo.jpg")
+        other = self.upload(b'same photo', filename="photo.jpeg")
+
+        self.assertEqual({upper.file.name, lower.file.name, other.file.name}, {upper.file.name})
+        self.assertEqual(Blob.objects.get().ref_count, 3)
+        # MIME-тип і назва при віддачі — з назви вкладення, а не блоба
+        response = self.client_manager.get(reverse('attachment-download', args=[upper.id]))
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertIn('photo.JPG', response['Content-Disposition'])
+        print("\nТест 'Розширення назви не створює окремих блобів' пройдено успішно")
+
+    def test_blob_deleted_with_last_attachment(self):
+        first = self.upload(b'scan', filename="scan.pdf")
+        second = self.upload(b'scan', filename="scan.pdf")
+        path = first.file.path
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(Blob.objects.get(name=second.file.name).ref_count, 1)
+        self.assertTrue(os.path.exists(path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(Blob.objects.exists())
+        self.assertFalse(os.path.exists(path))
+        print("\nТест 'Блоб видаляється разом з останнім вкладенням' пройдено успішно")
+
+    def test_file_rewritten_when_blob_row_is_gone(self):
+        # видалення блоба встигло прибрати рядок, але файл ще лежить (або навпаки)
+        name = self.upload(b'race', filename="race.txt").file.name
+        path = f'{self.media_root}/{name}'
+        Attachment.objects.all().delete()
+        Blob.objects.all().delete()
+        os.utime(path, (0, 0))
+
+        attachment = self.upload(b'race', filename="race.txt")
+        self.assertEqual(attachment.file.name, name)
+        self.assertGreater(os.stat(path).st_mtime, 0)
+        self.assertEqual(Blob.objects.get(name=name).size, 4)
+        print("\nТест 'Файл блоба записується заново без рядка Blob' пройдено успішно")
+
+    def test_loaded_attachment_save_skips_file_lookup(self):
+        attachment = Attachment.objects.get(pk=self.upload(b'doc').pk)
+        attachment.description = "Оновлено"
+        with CaptureQueriesContext(connection) as queries:
+            attachment.save(update_fields=['description'])
+        self.assertFalse([q for q in queries if q['sql'].startswith('SELECT')])
+        self.assertEqual(Blob.objects.get(name=attachment.file.name).ref_count, 1)
+        print("\nТест 'Збереження завантаженого вкладення без повторного SELECT файлу' пройдено успішно")
+
+    def test_known_blob_short_circuits_upload(self):
+        content = b'already uploaded'
+        existing = self.upload(content, filename="photo.jpg")
+
+        response = self.client_manager.post(reverse('attachment-upload'), {
+            'content_type_app': 'production',
+            'content_type_model': 'project',
+            'object_id': self.project.id,
+            'filename': "copy.JPEG",
+            'size': len(content),
+            'sha256': hashlib.sha256(content).hexdigest(),
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        attachment = Attachment.objects.get(pk=response.data['attachment']['id'])
+        self.assertEqual(attachment.file.name, existing.file.name)
+        self.assertEqual(attachment.filename, "copy.JPEG")
+        self.assertFalse(AttachmentUpload.objects.exists())
+        self.assertEqual(Blob.objects.get(name=existing.file.name).ref_count, 2)
+
+        response = self.start_upload("other.jpg", size=3)
+        self.assertIn('offset', response.data)
+        print("\nТест 'Повторне завантаження відомого файлу без передачі байтів' пройдено успішно")
+
+    def test_multipart_upload_uses_same_blob(self):
+        chunked = self.upload(b'report body', filename="report.txt")
+        response = self.client_manager.post(reverse('attachment-list'), {
+            'file': SimpleUploadedFile("report.txt", b'report body'),
+            'content_type_app': 'production',
+            'content_type_model': 'project',
+            'object_id': self.project.id,
+        }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        attachment = Attachment.objects.get(pk=response.data['id'])
+        self.assertEqual(attachment.file.name, chunked.file.name)
+        self.assertEqual(attachment.filename, "report.txt")
+        print("\nТест 'Multipart-завантаження використовує наявний блоб' пройдено успішно")
+
+    def test_dedupe_legacy_attachments(self):
+        os.makedirs(f'{self.media_root}/attachments')
+        ct = ContentType.objects.get_for_model(Project)
+        legacy = []
+        for name in ("photo.jpg", "photo_BFYAbtz.jpg"):
+            with open(f'{self.media_root}/attachments/{name}', 'wb') as f:
+                f.write(b'jpeg bytes')
+            legacy.append(Attachment.objects.create(
+                file=f'attachments/{name}', content_type=ct, object_id=self.project.id,
+            ))
+
+        call_command('dedupe_attachments', stdout=open(os.devnull, 'w'))
+
+        first, second = (Attachment.objects.get(pk=a.pk) for a in legacy)
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertEqual(second.filename, "photo_BFYAbtz.jpg")
+        self.assertEqual(Blob.objects.get(name=first.file.name).ref_count, 2)
+        self.assertEqual(os.listdir(f'{self.media_root}/attachments'), [])
+        print("\nТест 'Перенесення старих вкладень у сховище за вмістом' пройдено успішно")
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class AttachmentPreviewTests(AttachmentTestCase):
+
+    def upload_with_previews(self, content, filename):
+        with self.captureOnCommitCallbacks(execute=True):
+            attachment = self.upload(content, filename=filename)
+        attachment.refresh_from_db()
+        return attachment
+
+    def image_bytes(self, size, fmt='PNG', mode='RGBA'):
+        from PIL import Image
+        buffer = io.BytesIO()
+        Image.new(mode, size, (200, 30, 30, 128)[:len(mode)]).save(buffer, fmt)
+        return buffer.getvalue()
+
+    def test_image_thumbnail_and_preview(self):
+        from PIL import Image
+        attachment = self.upload_with_previews(self.image_bytes((2000, 1000)), "photo.png")
+        blob = attachment.blob
+        self.assertEqual(blob.preview_status, 'ready')
+        self.assertTrue(blob.thumbnail.startswith(blob.name.rsplit('.', 1)[0]))
+
+        with Image.open(attachment.file.storage.path(blob.thumbnail)) as thumbnail:
+            self.assertEqual(thumbnail.size, (320, 160))
+        with Image.open(attachment.file.storage.path(blob.preview)) as preview:
+            self.assertEqual(preview.size, (1280, 640))
+
+        response = self.client_manager.get(reverse('project-detail', args=[self.project.id]))
+        files = response.data['files']
+        self.assertEqual(files[0]['thumbnail'], 'http://testserver' + reverse('attachment-thumbnail', args=[attachment.id]))
+        self.assertEqual(files[0]['preview'], 'http://testserver' + reverse('attachment-preview', args=[attachment.id]))
+
+        # віддаються через API з авторизацією, а не через MEDIA_URL
+        response = self.client_manager.get(files[0]['thumbnail'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertIn('photo.thumb.jpg', response['Content-Disposition'])
+        with Image.open(io.BytesIO(b''.join(response.streaming_content))) as thumbnail:
+            self.assertEqual(thumbnail.size, (320, 160))
+        self.assertEqual(self.client.get(files[0]['preview']).status_code, status.HTTP_401_UNAUTHORIZED)
+        print("\nТест 'Мініатюра і превʼю зображення' пройдено успішно")
+
+    def test_pdf_first_page_preview(self):
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument.new()
+        pdf.new_page(300, 600)
+        pdf.new_page(600, 300)
+        buffer = io.BytesIO()
+        pdf.save(buffer)
+        pdf.close()
+
+        attachment = self.upload_with_previews(buffer.getvalue(), "scan.pdf")
+        self.assertEqual(attachment.blob.preview_status, 'ready')
+        from PIL import Image
+        with Image.open(attachment.file.storage.path(attachment.blob.preview)) as preview:
+            self.assertEqual(preview.size, (640, 1280))
+        print("\nТест 'Превʼю першої сторінки PDF' пройдено успішно")
+
+    def test_unsupported_and_broken_files(self):
+        attachment = self.upload_with_previews(b'not a drawing', "drawing.dwg")
+        self.assertEqual(attachment.blob.preview_status, 'unsupported')
+        response = self.client_manager.get(reverse('attachment-thumbnail', args=[attachment.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        attachment = self.upload_with_previews(b'not an image', "broken.jpg")
+        self.assertEqual(attachment.blob.preview_status, 'failed')
+
+        response = self.client_manager.get(reverse('project-detail', args=[self.project.id]))
+        self.assertEqual({f['thumbnail'] for f in response.data['files']}, {None})
+        print("\nТест 'Файли без превʼю' пройдено успішно")
+
+    def test_previews_deleted_with_blob(self):
+        attachment = self.upload_with_previews(self.image_bytes((50, 50), 'JPEG', 'RGB'), "small.jpg")
+        thumbnail_path = attachment.file.storage.path(attachment.blob.thumbnail)
+        self.assertTrue(os.path.exists(thumbnail_path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            attachment.delete()
+        self.assertFalse(os.path.exists(thumbnail_path))
+        print("\nТест 'Превʼю видаляються разом із блобом' пройдено успішно")
@@ -0,0 +1,93 @@
+from datetime import date, timedelta
+from django.core.cache import cache
+from rest_framework import status
+from .base import BaseTestCase
+from ..models import Project, Task
+
+
+class DashboardSummaryTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def _seed(self, count):
+        # кеш скидається після коміту — виконуємо callbacks одразу
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(count):
+                project = Project.objects.create(name=f"Проєкт {i}", start_date=date.today())
+                Task.objects.create(
+                    title=f"Задача {i}",
+                    creator=self.manager,
+                    assignee=self.worker,
+                    project=project,
+                    due_date=date.today() + timedelta(days=3),
+                )
+
+    def test_dashboard_summary_query_count_is_constant(self):
+        self._seed(2)
+        with self.assertNumQueries(5):
+            response = self.client_manager.get('/api/dashboard/summary/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['projects_progress']), 2)
+
+        self._seed(20)
+        with self.assertNumQueries(5):
+            response = self.client_manager.get('/api/dashboard/summary/')
+        self.assertEqual(len(response.data['projects_progress']), 22)
+        self.assertEqual(len(response.data['upcoming_tasks']), 22)
+        self.assertEqual(len(response.data['weekly_tasks']), 4)
+        print("\nТест 'Стала кількість запитів для зведення' пройдено успішно")
+
+    def test_dashboard_summary_counters(self):
+        self._seed(3)
+        response = self.client_manager.get('/api/dashboard/summary/')
+        self.assertEqual(response.data['tasks_in_progress'], 3)
+        self.assertEqual(response.data['uncompleted_tasks_count'], 3)
+        self.assertEqual(response.data['tasks_done'], 0)
+        self.assertEqual(response.data['projects_progress'][0]['percent'], 0)
+        self.assertIn('assignee_name', response.data['upcoming_tasks'][0])
+        print("\nТест 'Лічильники зведення' пройдено успішно")
+
+    def test_dashboard_summary_cache_hit_skips_database(self):
+        self._seed(2)
+        self.client_manager.get('/api/dashboard/summary/')
+        with self.assertNumQueries(0):
+            response = self.client_manager.get('/api/dashboard/summary/')
+        self.assertEqual(response.data['tasks_in_progress'], 2)
+
+        stats = self.client_manager.get('/api/dashboard/summary/stats/').data
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        print("\nТест 'Кешоване зведення без запитів до БД' пройдено успішно")
+
+    def test_dashboard_summary_invalidated_on_task_change(self):
+        self._seed(1)
+        self.client_manager.get('/api/dashboard/summary/')
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            Task.objects.create(title="Нова", creator=self.manager, assignee=self.worker)
+            # до коміту кеш не скидається
+            with self.assertNumQueries(0):
+                response = self.client_manager.get('/api/dashboard/summary/')
+            self.assertEqual(response.data['tasks_in_progress'], 1)
+        self.assertTrue(callbacks)
+        response = self.client_manager.get('/api/dashboard/summary/')
+        self.assertEqual(response.data['tasks_in_progress'], 2)
+        print("\nТест 'Скидання кешу зведення при зміні задачі' пройдено успішно")
+
+    def test_dashboard_summary_invalidated_on_queryset_update(self):
+        self._seed(2)
+        self.client_manager.get('/api/dashboard/summary/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.update(status='Completed')
+        response = self.client_manager.get('/api/dashboard/summary/')
+        self.assertEqual(response.data['tasks_done'], 2)
+        print("\nТест 'Скидання кешу зведення при масовому update()' пройдено успішно")
+
+    def test_dashboard_summary_shared_between_roles(self):
+        self._seed(1)
+        self.client_manager.get('/api/dashboard/summary/')
+        # зміст зведення не залежить від ролі
+        with self.assertNumQueries(0):
+            self.client_worker.get('/api/dashboard/summary/')
+        print("\nТест 'Спільний кеш зведення для всіх ролей' пройдено успішно")
@@ -1,7 +1,20 @@
-from django.test import TestCase
+import asyncio
+import json
+from datetime import timedelta
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 from .base import BaseTestCase  # Припускаємо, що BaseTestCase містить спільні налаштування і створення користувачів
 from rest_framework import status
+from ..models import Task, TaskNotification
+from ..notifications import publish_new_notifications, publish_unread_deltas
+from ..streams import get_broker, issue_stream_ticket, redeem_stream_ticket, stream_events
 
 class UserTests(BaseTestCase):
 
@@ -28,4 +41,219 @@ class UserTests(BaseTestCase):
         client = APIClient()
         response = client.get(url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
-        print("Тест 'Доступ без авторизації до профілю заборонено' пройдено успішно")
\ No newline at end of file
+        print("Тест 'Доступ без авторизації до профілю заборонено' пройдено успішно")
+
+class NotificationDispatchTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.task = Task.objects.create(
+            title="Задача на підтвердження",
+            creator=self.manager,
+            assignee=self.worker,
+            due_date=timezone.now().date() + timedelta(days=10),
+        )
+        self.url = f'/api/tasks/{self.task.id}/submit-complete/'
+
+    def test_submit_complete_notifies_all_managers_in_bulk(self):
+        for i in range(10):
+            self.create_user(f"manager_{i}", f"manager_{i}@example.com", role="Manager")
+
+        self.client_worker.post(self.url)
+        self.assertEqual(TaskNotification.objects.filter(task=self.task).count(), 11)
+
+        self.task.status = "InProgress"
+        self.task.save()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client_worker.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "production_tasknotification"')]
+        self.assertEqual(len(inserts), 1)
+        print("\nТест 'Пакетне створення сповіщень керівникам' пройдено успішно")
+
+    def test_submit_complete_notifies_department_manager(self):
+        self.create_user("manager2", "manager2@example.com", role="Manager")
+        self.department.manager = self.manager
+        self.department.save()
+
+        response = self.client_worker.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        recipients = list(TaskNotification.objects.values_list('recipient_id', flat=True))
+        self.assertEqual(recipients, [self.manager.id])
+        print("\nТест 'Сповіщення керівнику відділу' пройдено успішно")
+
+    def test_recipients_cache_reset_after_commit(self):
+        from ..notifications import get_recipient_ids
+        self.assertEqual(get_recipient_ids(self.department.id), [self.manager.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            manager2 = self.create_user("manager2", "manager2@example.com", role="Manager")
+            self.department.manager = manager2
+            self.department.save()
+            # до коміту закешовані отримувачі не скидаються
+            self.assertEqual(get_recipient_ids(self.department.id), [self.manager.id])
+        self.assertEqual(get_recipient_ids(self.department.id), [manager2.id])
+        print("\nТест 'Скидання кешу отримувачів після коміту' пройдено успішно")
+
+    def test_submit_complete_async_dispatch(self):
+        with override_settings(NOTIFICATIONS_ASYNC=True, BACKGROUND_TASKS_EAGER=True):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client_worker.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(TaskNotification.objects.filter(task=self.task).count(), 1)
+        print("\nТест 'Фонове створення сповіщень' пройдено успішно")
+
+
+class NotificationStreamTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.task = Task.objects.create(
+            title="Задача для потоку",
+            creator=self.manager,
+            assignee=self.worker,
+            due_date=timezone.now().date() + timedelta(days=10),
+        )
+
+    async def test_stream_requires_ticket(self):
+        response = await self.async_client.get('/api/notifications/stream/')
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get('/api/notifications/stream/', {'ticket': 'підроблений'})
+        self.assertEqual(response.status_code, 401)
+        print("\nТест 'Потік сповіщень без квитка заборонено' пройдено успішно")
+
+    def test_stream_unavailable_under_wsgi(self):
+        # під WSGI нескінченна відповідь зайняла б робочий потік — клієнт переходить на опитування
+        response = self.client.get('/api/notifications/stream/')
+        self.assertEqual(response.status_code, 503)
+        response = self.client_manager.post('/api/notifications/stream/ticket/')
+        self.assertEqual(response.status_code, 503)
+        print("\nТест 'Потік сповіщень вимкнений під WSGI' пройдено успішно")
+
+    async def test_stream_ticket_is_single_use(self):
+        token = AccessToken.for_user(self.manager)
+        response = await self.async_client.post(
+            '/api/notifications/stream/ticket/', headers={'Authorization': f'Bearer {token}'},
+        )
+        self.assertEqual(response.status_code, 200)
+        ticket = response.json()['ticket']
+        self.assertNotIn(str(token), ticket)
+        self.assertEqual(await sync_to_async(redeem_stream_ticket)(ticket), self.manager.id)
+        self.assertIsNone(await sync_to_async(redeem_stream_ticket)(ticket))
+        print("\nТест 'Одноразовий квиток потоку сповіщень' пройдено успішно")
+
+    def test_stream_ticket_expires(self):
+        ticket = issue_stream_ticket(self.manager.id)
+        with override_settings(NOTIFICATIONS_STREAM_TICKET_TTL=-1):
+            self.assertIsNone(redeem_stream_ticket(ticket))
+        print("\nТест 'Прострочений квиток потоку сповіщень' пройдено успішно")
+
+    def test_stream_pushes_new_notification(self):
+        notification = TaskNotification(id=1, task=self.task, sender=self.worker, recipient=self.manager,
+                                        created_at=timezone.now())
+        broker = get_broker()
+
+        async def scenario():
+            events = stream_events(self.manager.id, lambda user_id: 3, keepalive=5)
+            first = await events.__anext__()
+            publish_new_notifications([notification])
+            publish_unread_deltas({self.manager.id: -2})
+            second = await events.__anext__()
+            third = await events.__anext__()
+            await events.aclose()
+            return first, second, third
+
+        first, second, third = asyncio.run(scenario())
+        self.assertEqual(first, 'event: unread\ndata: {"count": 3}\n\n')
+        self.assertTrue(second.startswith('event: notification\n'))
+        payload = json.loads(second.split('data: ', 1)[1])
+        self.assertEqual(payload['delta'], 1)
+        self.assertEqual(payload['notification']['task_title'], "Задача для потоку")
+        self.assertEqual(third, 'event: unread\ndata: {"delta": -2}\n\n')
+        self.assertEqual(broker.subscriber_count(), 0)
+        print("\nТест 'Потік сповіщень доставляє нові сповіщення' пройдено успішно")
+
+    def test_stream_keeps_events_published_during_snapshot(self):
+        broker = get_broker()
+
+        def count_unread(user_id):
+            # сповіщення прочитали саме тоді, коли потік рахує знімок
+            publish_unread_deltas({user_id: -1})
+            return 2
+
+        async def scenario():
+            events = stream_events(self.manager.id, count_unread, keepalive=5)
+            first = await events.__anext__()
+            second = await asyncio.wait_for(events.__anext__(), timeout=1)
+            await events.aclose()
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        self.assertEqual(first, 'event: unread\ndata: {"count": 2}\n\n')
+        self.assertEqual(second, 'event: unread\ndata: {"delta": -1}\n\n')
+        self.assertEqual(broker.subscriber_count(), 0)
+        print("\nТест 'Потік не губить подій під час знімка лічильника' пройдено успішно")
+
+    def test_confirm_complete_publishes_unread_delta(self):
+        TaskNotification.objects.create(task=self.task, sender=self.worker, recipient=self.manager)
+        with mock.patch('production.notifications.publish_unread_deltas') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client_manager.post(f'/api/tasks/{self.task.id}/confirm-complete/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        publish.assert_called_once_with({self.manager.id: -1})
+        print("\nТест 'Зменшення лічильника непрочитаних у потоці' пройдено успішно")
+
+
+class NotificationCounterTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.task = Task.objects.create(
+            title="Задача з лічильником",
+            creator=self.manager,
+            assignee=self.worker,
+            due_date=timezone.now().date() + timedelta(days=10),
+        )
+
+    def unread(self):
+        return self.client_manager.get('/api/notifications/count/').data['unread']
+
+    def test_counter_follows_submit_confirm_and_delete(self):
+        self.assertEqual(self.unread(), 0)
+        self.client_worker.post(f'/api/tasks/{self.task.id}/submit-complete/')
+        self.assertEqual(self.unread(), 1)
+
+        self.client_manager.post(f'/api/tasks/{self.task.id}/confirm-complete/')
+        self.assertEqual(self.unread(), 0)
+        self.assertEqual(self.unread(), TaskNotification.objects.filter(recipient=self.manager, is_read=False).count())
+        print("\nТест 'Лічильник непрочитаних сповіщень' пройдено успішно")
+
+    def test_counter_follows_single_saves_and_cascades(self):
+        notification = TaskNotification.objects.create(task=self.task, sender=self.worker, recipient=self.manager)
+        TaskNotification.objects.create(task=self.task, sender=self.worker, recipient=self.manager)
+        self.assertEqual(self.unread(), 2)
+
+        notification = TaskNotification.objects.get(pk=notification.pk)
+        notification.is_read = True
+        notification.save()
+        self.assertEqual(self.unread(), 1)
+
+        self.task.delete()
+        self.assertEqual(self.unread(), 0)
+        print("\nТест 'Лічильник при поодиноких змінах і каскадному видаленні' пройдено успішно")
+
+    def test_delete_task_notifications_updates_counters_in_batch(self):
+        for i in range(5):
+            self.create_user(f"manager_{i}", f"manager_{i}@example.com", role="Manager")
+        self.client_worker.post(f'/api/tasks/{self.task.id}/submit-complete/')
+        self.assertEqual(self.unread(), 1)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client_manager.post(f'/api/tasks/{self.task.id}/reject-complete/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        counter_updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "production_notificationcounter"')]
+        self.assertEqual(len(counter_updates), 1)
+        self.assertFalse(TaskNotification.objects.filter(task=self.task).exists())
+        self.assertEqual(self.unread(), 0)
+        print("\nТест 'Пакетне зменшення лічильників при видаленні сповіщень' пройдено успішно")
@@ -0,0 +1,81 @@
+from base64 import b64decode
+from urllib.parse import parse_qs, urlparse
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from .base import BaseTestCase
+from ..models import Task
+
+
+class CursorPaginationTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for i in range(5):
+            Task.objects.create(
+                title=f"Задача {i}",
+                creator=self.manager,
+                assignee=self.worker,
+                priority=3 if i % 2 else 1,
+            )
+
+    def test_list_without_page_size_is_not_paginated(self):
+        response = self.client_manager.get(reverse('tasks-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 5)
+        print("\nТест 'Список без page_size повертається повністю' пройдено успішно")
+
+    def test_cursor_pages_cover_all_tasks(self):
+        url = reverse('tasks-list') + '?page_size=2'
+        seen = []
+        while url:
+            response = self.client_manager.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen.extend(t['id'] for t in response.data['results'])
+            url = response.data['next']
+        expected = list(Task.objects.order_by('-created_at', 'id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+        print("\nТест 'Курсорна пагінація задач' пройдено успішно")
+
+    def test_cursor_pagination_keeps_filters(self):
+        url = reverse('tasks-list') + '?page_size=1&priority=3'
+        ids = []
+        while url:
+            response = self.client_manager.get(url)
+            ids.extend(t['id'] for t in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(len(ids), Task.objects.filter(priority=3).count())
+        print("\nТест 'Курсорна пагінація з фільтрами' пройдено успішно")
+
+    def test_employees_cursor_pagination(self):
+        response = self.client_manager.get(reverse('user-list'), {'page_size': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNotNone(response.data['next'])
+        print("\nТест 'Курсорна пагінація працівників' пройдено успішно")
+
+    def test_cursor_is_composite_keyset_on_equal_timestamps(self):
+        # однаковий created_at у всіх задач: сторінки розрізняються лише за id
+        Task.objects.update(created_at=timezone.now())
+        expected = list(Task.objects.order_by('-created_at', 'id').values_list('id', flat=True))
+
+        url = reverse('tasks-list') + '?page_size=2'
+        pages = []
+        while url:
+            response = self.client_manager.get(url)
+            pages.append([t['id'] for t in response.data['results']])
+            cursor = parse_qs(urlparse(url).query).get('cursor')
+            if cursor:
+                # у курсорі лише позиція (created_at, id), без зсуву
+                tokens = parse_qs(b64decode(cursor[0]).decode())
+                self.assertNotIn('o', tokens)
+            url = response.data['next']
+        self.assertEqual([i for page in pages for i in page], expected)
+
+        # назад з останньої сторінки
+        response = self.client_manager.get(response.data['previous'])
+        self.assertEqual([t['id'] for t in response.data['results']], pages[-2])
+        print("\nТест 'Складений keyset-курсор при однаковому часі створення' пройдено успішно")
@@ -0,0 +1,166 @@
+import io
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from .base import BaseTestCase
+from ..models import EmployeePerformance, Task
+
+
+class EmployeePerformanceTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.other = self.create_user("worker2", "worker2@example.com")
+        self.tasks = [
+            self.create_task(self.worker, due_date=date.today() + timedelta(days=3), hours=2),
+            self.create_task(self.worker, due_date=date.today() - timedelta(days=1), hours=4),
+            self.create_task(self.other, due_date=None, hours=1),
+        ]
+
+    def create_task(self, assignee, due_date, hours):
+        task = Task.objects.create(
+            title="Задача", creator=self.manager, assignee=assignee, status='PendingConfirmation', due_date=due_date,
+        )
+        # задача створена hours годин тому; статус ставимо напряму, бо прострочена завершилася б автоматично
+        Task.objects.filter(pk=task.pk).update(
+            created_at=timezone.now() - timedelta(hours=hours), status='PendingConfirmation',
+        )
+        return task
+
+    def confirm(self, task, action='tasks-confirm-complete'):
+        return self.client_manager.post(reverse(action, args=[task.id]))
+
+    def test_confirm_updates_daily_rollup(self):
+        self.confirm(self.tasks[0])
+        self.confirm(self.tasks[1])
+        # повторне підтвердження не рахується
+        self.confirm(self.tasks[1])
+
+        row = EmployeePerformance.objects.get(employee=self.worker, date=timezone.localdate())
+        self.assertEqual(row.completed_tasks, 2)
+        self.assertEqual(row.on_time_tasks, 1)
+        self.assertEqual(row.efficiency_score, Decimal('50.00'))
+        self.assertAlmostEqual(row.avg_completion_time.total_seconds(), 3 * 3600, delta=60)
+
+        task = Task.objects.get(pk=self.tasks[1].pk)
+        self.assertEqual(task.status, 'Completed')
+        self.assertIsNotNone(task.completed_at)
+        print("\nТест 'Інкрементне оновлення ефективності при підтвердженні' пройдено успішно")
+
+    def test_reopened_task_leaves_rollup(self):
+        first, late = self.tasks[0], self.tasks[1]
+        self.confirm(first)
+        self.confirm(late)
+
+        # підтверджену задачу не можна відхилити
+        response = self.client_manager.post(reverse('tasks-reject-complete', args=[late.id]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # повернення в роботу через PATCH і масову зміну знімає підтвердження
+        response = self.client_manager.patch(reverse('tasks-detail', args=[late.id]), {'status': 'InProgress'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(Task.objects.get(pk=late.pk).completed_at)
+        row = EmployeePerformance.objects.get(employee=self.worker, date=timezone.localdate())
+        self.assertEqual((row.completed_tasks, row.on_time_tasks, row.efficiency_score), (1, 1, Decimal('100.00')))
+        self.assertAlmostEqual(row.avg_completion_time.total_seconds(), 2 * 3600, delta=60)
+
+        response = self.client_manager.post(reverse('tasks-bulk'), {
+            'update': [{'id': first.id, 'status': 'InProgress'}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        row.refresh_from_db()
+        self.assertEqual((row.completed_tasks, row.efficiency_score, row.avg_completion_time), (0, 0, None))
+
+        # повторне підтвердження рахується один раз
+        Task.objects.filter(pk=late.pk).update(status='PendingConfirmation')
+        self.confirm(late)
+        row.refresh_from_db()
+        self.assertEqual((row.completed_tasks, row.on_time_tasks), (1, 0))
+        print("\nТест 'Повернена з Completed задача віднімається з ефективності' пройдено успішно")
+
+    def test_confirmed_task_keeps_status_on_edit(self):
+        self.confirm(self.tasks[0])
+        task = Task.objects.get(pk=self.tasks[0].pk)
+        task.title = "Перейменована"
+        task.save()
+        task.refresh_from_db()
+        self.assertEqual(task.status, 'Completed')
+        self.assertIsNotNone(task.completed_at)
+        print("\nТест 'Підтверджена задача лишається завершеною після редагування' пройдено успішно")
+
+    def test_rebuild_matches_incremental_rollup(self):
+        for task in self.tasks:
+            self.confirm(task)
+        incremental = list(EmployeePerformance.objects.order_by('employee_id').values(
+            'employee_id', 'date', 'completed_tasks', 'on_time_tasks', 'efficiency_score',
+        ))
+        EmployeePerformance.objects.filter(employee=self.worker).update(note="Перевірено")
+        stale = EmployeePerformance.objects.create(employee=self.other, date=date(2024, 1, 1), completed_tasks=5)
+
+        # обнулення, групування, upsert, чистка і лічильник пропущених задач (+ savepoint)
+        with self.assertNumQueries(7):
+            call_command('rebuild_employee_performance', stdout=io.StringIO())
+
+        rebuilt = list(EmployeePerformance.objects.order_by('employee_id').values(
+            'employee_id', 'date', 'completed_tasks', 'on_time_tasks', 'efficiency_score',
+        ))
+        self.assertEqual(rebuilt, incremental)
+        self.assertFalse(EmployeePerformance.objects.filter(pk=stale.pk).exists())
+        self.assertEqual(EmployeePerformance.objects.get(employee=self.worker).note, "Перевірено")
+        print("\nТест 'Перерахунок ефективності одним згрупованим запитом' пройдено успішно")
+
+    def test_reassigned_completed_task_moves_rollup(self):
+        for task in self.tasks:
+            self.confirm(task)
+
+        # передача підтвердженої задачі іншому та зміна терміну — через PATCH і масову зміну
+        response = self.client_manager.patch(
+            reverse('tasks-detail', args=[self.tasks[0].id]), {'assignee': self.other.id}, format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client_manager.post(reverse('tasks-bulk'), {
+            'update': [
+                {'id': self.tasks[1].id, 'due_date': '2099-01-01'},
+                {'id': self.tasks[2].id, 'assignee': self.worker.id},
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Task.objects.filter(status='Completed').count(), 3)
+
+        fields = ('employee_id', 'date', 'completed_tasks', 'on_time_tasks', 'efficiency_score')
+        incremental = list(EmployeePerformance.objects.filter(completed_tasks__gt=0)
+                           .order_by('employee_id').values(*fields))
+        self.assertEqual(
+            [(row['employee_id'], row['completed_tasks'], row['on_time_tasks']) for row in incremental],
+            [(self.worker.id, 2, 2), (self.other.id, 1, 1)],
+        )
+        call_command('rebuild_employee_performance', stdout=io.StringIO())
+        rebuilt = list(EmployeePerformance.objects.order_by('employee_id').values(*fields))
+        self.assertEqual(rebuilt, incremental)
+        print("\nТест 'Зміна виконавця підтвердженої задачі переносить ефективність' пройдено успішно")
+
+    def test_performance_api_reads_rollups(self):
+        for task in self.tasks:
+            self.confirm(task)
+
+        response = self.client_manager.get(reverse('employee-performance'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        summary = {row['employee']: row for row in response.data['employees']}
+        self.assertEqual(summary[self.worker.id]['completed_tasks'], 2)
+        self.assertEqual(summary[self.worker.id]['efficiency_score'], 50)
+        self.assertEqual(summary[self.other.id]['efficiency_score'], 100)
+        self.assertEqual(len(response.data['days']), 2)
+
+        response = self.client_worker.get(reverse('employee-performance'), {'employee': self.other.id})
+        self.assertEqual([row['employee'] for row in response.data['employees']], [self.worker.id])
+
+        response = self.client_manager.get(reverse('employee-performance'), {'date_from': 'вчора'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        for name in ('employee', 'department'):
+            response = self.client_manager.get(reverse('employee-performance'), {name: 'abc'})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        print("\nТест 'API ефективності працівників' пройдено успішно")
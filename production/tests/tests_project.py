@@ -135,3 +135,108 @@ class ProjectTests(BaseTestCase):
         self.project.refresh_from_db()
         self.assertNotEqual(self.project.status, "Completed")
         print("\nТест 'Заборона завершення проєкту з незавершеними задачами' пройдено успішно")
+
+    def test_project_list_query_count_is_constant(self):
+        from django.contrib.contenttypes.models import ContentType
+        from ..models import Comments, Attachment
+
+        def seed(count):
+            for i in range(count):
+                project = Project.objects.create(name=f"Проєкт {i}", start_date=self.start_date)
+                task = Task.objects.create(
+                    title=f"Задача {i}",
+                    creator=self.manager,
+                    assignee=self.worker,
+                    project=project,
+                )
+                for obj in (project, task):
+                    ct = ContentType.objects.get_for_model(obj)
+                    Comments.objects.create(author=self.manager, content="Коментар", content_type=ct, object_id=obj.id)
+                    Attachment.objects.create(
+                        file=SimpleUploadedFile("plan.txt", b"plan"),
+                        uploaded_by=self.manager,
+                        content_type=ct,
+                        object_id=obj.id,
+                    )
+
+        url = reverse('project-list') + '?expand=tasks,comments,files'
+        seed(2)
+        self.client_manager.get(url)
+        with self.assertNumQueries(6):
+            response = self.client_manager.get(url)
+        self.assertEqual(len(response.data), 3)
+
+        seed(10)
+        with self.assertNumQueries(6):
+            response = self.client_manager.get(url)
+        self.assertEqual(len(response.data), 13)
+        self.assertEqual(len(response.data[0]['tasks'][0]['comments']), 1)
+        self.assertEqual(len(response.data[0]['files']), 1)
+        print("\nТест 'Стала кількість запитів для списку проєктів' пройдено успішно")
+
+    def test_generic_relations_batch_loaded(self):
+        from django.contrib.contenttypes.models import ContentType
+        from ..models import Comments
+        from ..serializers import TaskSerializer
+
+        task_ct = ContentType.objects.get_for_model(Task)
+        tasks = [
+            Task.objects.create(title=f"Задача {i}", creator=self.manager, assignee=self.worker, project=self.project)
+            for i in range(5)
+        ]
+        for i, task in enumerate(tasks):
+            for _ in range(i):
+                Comments.objects.create(author=self.manager, content="Коментар", content_type=task_ct, object_id=task.id)
+
+        queryset = Task.objects.filter(project=self.project).select_related('creator', 'assignee', 'project')
+        ContentType.objects.get_for_model(Task)
+        # задачі + коментарі + вкладення, незалежно від кількості задач
+        with self.assertNumQueries(3):
+            data = TaskSerializer(queryset.order_by('id'), many=True, context={'request': None}).data
+        self.assertEqual([len(item['comments']) for item in data], [0, 1, 2, 3, 4])
+        self.assertEqual(data[4]['comments'][0]['author_name'], f"{self.manager.last_name} {self.manager.first_name}")
+        print("\nТест 'Пакетне завантаження коментарів і вкладень' пройдено успішно")
+
+    def test_project_list_is_compact_by_default(self):
+        response = self.client_manager.get(reverse('project-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for name in ('tasks', 'comments', 'files'):
+            self.assertNotIn(name, response.data[0])
+        self.assertIn('status_display', response.data[0])
+
+        response = self.client_manager.get(reverse('project-detail', args=[self.project.id]))
+        self.assertIn('tasks', response.data)
+        print("\nТест 'Компактний список проєктів' пройдено успішно")
+
+    def test_project_touches_coalesced_per_transaction(self):
+        from django.contrib.contenttypes.models import ContentType
+        from ..models import Comments
+        from ..signals import ProjectTouchBatch
+        before = Project.objects.get(pk=self.project.pk).last_modified_at
+        other = Project.objects.create(name="Інший", start_date=self.start_date)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            task = Task.objects.create(title="Задача", creator=self.manager, assignee=self.worker, project=self.project)
+            for i in range(5):
+                Task.objects.create(title=f"Задача {i}", creator=self.manager, assignee=self.worker, project=self.project)
+            Comments.objects.create(
+                author=self.manager, content="Коментар",
+                content_type=ContentType.objects.get_for_model(Project), object_id=self.project.id,
+            )
+            task.project = other
+            task.save()
+
+        touches = [func for func in callbacks if isinstance(func, ProjectTouchBatch)]
+        self.assertEqual(len(touches), 1)
+        self.assertGreater(Project.objects.get(pk=self.project.pk).last_modified_at, before)
+        self.assertEqual(touches[0].project_ids, {self.project.id, other.id})
+        print("\nТест 'Одне оновлення проєктів на транзакцію' пройдено успішно")
+
+    def test_export_projects_csv(self):
+        other = Project.objects.create(name="Інший проєкт", start_date=self.start_date)
+        response = self.client_manager.get(reverse('project-export'), {'ids': other.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith(f'{other.id},Інший проєкт,{other.get_status_display()}'))
+        print("\nТест 'Експорт проєктів у CSV' пройдено успішно")
@@ -0,0 +1,180 @@
+import csv
+import io
+import shutil
+import tempfile
+from datetime import date, timedelta
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework import status
+from .base import BaseTestCase
+from ..models import Order, Project, Report, Task
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class ReportTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+        self.manager.last_name, self.manager.first_name = 'Петренко', 'Олена'
+        self.manager.save()
+        self.project = Project.objects.create(name="Цех №1", start_date=date.today() - timedelta(days=10))
+        # created_at потрібен для автоматичного статусу ще до першого збереження
+        self.order = Order.objects.create(
+            number="З-001", client=self.manager, project=self.project, created_at=timezone.now(),
+        )
+        yesterday = date.today() - timedelta(days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            for title, task_status, due_date in [
+                ("Розкрій", 'Completed', yesterday),
+                ("Зварювання", 'InProgress', yesterday),
+                ("Фарбування", 'InProgress', date.today() + timedelta(days=5)),
+            ]:
+                task = Task.objects.create(
+                    title=title, creator=self.manager, assignee=self.worker, project=self.project,
+                    order=self.order, due_date=due_date,
+                )
+                # статус задається автоматично при збереженні — ставимо потрібний напряму
+                Task.objects.filter(pk=task.pk).update(status=task_status)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+        super().tearDown()
+
+    def request_report(self, **data):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client_manager.post(reverse('report-list'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED, response.data)
+        return Report.objects.get(pk=response.data['id'])
+
+    def download(self, report):
+        response = self.client_manager.get(reverse('report-download', args=[report.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content)
+
+    def test_project_report_xlsx(self):
+        from openpyxl import load_workbook
+        report = self.request_report(
+            title="Звіт по цеху", report_type='Project', project=self.project.id, format='xlsx',
+        )
+        self.assertEqual(report.status, 'ready', report.error)
+        self.assertTrue(report.file.name.startswith('reports/'))
+
+        workbook = load_workbook(io.BytesIO(self.download(report)), read_only=True)
+        self.assertEqual(workbook.sheetnames, ['Загальні відомості', 'Задачі за виконавцями', 'Задачі'])
+        summary = dict(workbook['Загальні відомості'].iter_rows(min_row=2, values_only=True))
+        self.assertEqual(summary['Задач усього'], 3)
+        self.assertEqual(summary['Завершено'], 1)
+        self.assertEqual(summary['В роботі'], 2)
+        self.assertEqual(summary['Прострочено'], 1)
+        tasks = list(workbook['Задачі'].iter_rows(min_row=2, values_only=True))
+        self.assertEqual([row[0] for row in tasks], ["Розкрій", "Зварювання", "Фарбування"])
+
+        # текст, схожий на формулу, записується рядком
+        task = Task.objects.get(title="Розкрій")
+        task.title = "=1+1"
+        with self.captureOnCommitCallbacks(execute=True):
+            task.save()
+        report = self.request_report(
+            title="Звіт по цеху", report_type='Project', project=self.project.id, format='xlsx',
+        )
+        workbook = load_workbook(io.BytesIO(self.download(report)))
+        cell = workbook['Задачі']['A2']
+        self.assertEqual((cell.value, cell.data_type), ("'=1+1", 's'))
+
+        response = self.client_manager.get(reverse('report-detail', args=[report.pk]))
+        self.assertEqual(response.data['status'], 'ready')
+        self.assertTrue(response.data['download_url'].endswith(reverse('report-download', args=[report.pk])))
+        print("\nТест 'Проєктний звіт у XLSX' пройдено успішно")
+
+    def test_order_report_pdf_and_task_report_csv(self):
+        report = self.request_report(title="Замовлення З-001", report_type='Order', order=self.order.id, format='pdf')
+        self.assertEqual(report.status, 'ready', report.error)
+        self.assertTrue(self.download(report).startswith(b'%PDF'))
+
+        report = self.request_report(
+            title="Задачі в роботі", report_type='Task', format='csv',
+            params={'project': self.project.id, 'status': ['InProgress']},
+        )
+        self.assertEqual(report.status, 'ready', report.error)
+        rows = list(csv.reader(io.StringIO(self.download(report).decode('utf-8-sig'))))
+        self.assertEqual(rows[0], ["Задачі в роботі"])
+        self.assertIn(['Задач усього', '2'], rows)
+        self.assertIn(['Цех №1', '2', '0'], rows)
+        self.assertNotIn("Розкрій", [row[0] for row in rows if row])
+        print("\nТест 'Звіт по замовленню у PDF і по задачах у CSV' пройдено успішно")
+
+    def test_recover_reports_after_restart(self):
+        fields = {'title': "Цех", 'created_by': self.manager, 'report_type': 'Project', 'project': self.project, 'format': 'csv'}
+        # черга пулу загинула разом з процесом
+        lost = Report.objects.create(**fields)
+        stale = Report.objects.create(**fields, status='running', started_at=timezone.now() - timedelta(hours=1))
+        fresh = Report.objects.create(**fields, status='running', started_at=timezone.now())
+
+        out = io.StringIO()
+        call_command('recover_reports', stdout=out)
+        self.assertIn('requeued=1 failed=1', out.getvalue())
+        statuses = dict(Report.objects.values_list('pk', 'status'))
+        self.assertEqual(
+            [statuses[lost.pk], statuses[stale.pk], statuses[fresh.pk]], ['ready', 'failed', 'running'],
+        )
+        print("\nТест 'Відновлення черги звітів після перезапуску' пройдено успішно")
+
+    def test_project_report_reused_until_project_changes(self):
+        first = self.request_report(title="Цех", report_type='Project', project=self.project.id, format='csv')
+        # файл не формується вдруге: новий запис одразу готовий
+        second = self.request_report(title="Цех", report_type='Project', project=self.project.id, format='csv')
+        self.assertEqual(second.status, 'ready')
+        self.assertEqual(second.file.name, first.file.name)
+
+        other_format = self.request_report(title="Цех", report_type='Project', project=self.project.id, format='xlsx')
+        self.assertNotEqual(other_format.file.name, first.file.name)
+
+        Task.objects.create(title="Пакування", creator=self.manager, assignee=self.worker, project=self.project)
+        # TestCase не комітить транзакцію, тож оновлюємо last_modified_at так, як це зробив би коміт
+        Project.objects.filter(pk=self.project.pk).update(last_modified_at=timezone.now() + timedelta(seconds=1))
+        third = self.request_report(title="Цех", report_type='Project', project=self.project.id, format='csv')
+        self.assertEqual(third.status, 'ready')
+        self.assertNotEqual(third.file.name, first.file.name)
+        self.assertIn('Пакування', self.download(third).decode('utf-8-sig'))
+        print("\nТест 'Повторне використання проєктного звіту до зміни проєкту' пройдено успішно")
+
+    def test_failed_report_keeps_error(self):
+        with override_settings(REPORT_PDF_FONT=f'{self.media_root}/missing.ttf'), \
+                self.assertLogs('production.reports', 'ERROR'):
+            report = self.request_report(title="Без шрифту", report_type='Task', format='pdf')
+        self.assertEqual(report.status, 'failed')
+        self.assertTrue(report.error)
+        response = self.client_manager.get(reverse('report-download', args=[report.pk]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        print("\nТест 'Помилка формування звіту' пройдено успішно")
+
+    def test_report_validation_and_access(self):
+        response = self.client_manager.post(
+            reverse('report-list'), {'title': "Без проєкту", 'report_type': 'Project'}, format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('project', response.data)
+
+        response = self.client_manager.post(
+            reverse('report-list'),
+            {'title': "Фільтр", 'report_type': 'Task', 'params': {'status': ['Unknown']}}, format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client_worker.post(
+            reverse('report-list'), {'title': "Задачі", 'report_type': 'Task'}, format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        report = self.request_report(title="Задачі", report_type='Task', format='csv')
+        response = self.client_worker.get(reverse('report-detail', args=[report.pk]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        print("\nТест 'Перевірка параметрів і доступу до звітів' пройдено успішно")
@@ -0,0 +1,133 @@
+from datetime import date
+from django.urls import reverse
+from rest_framework import status
+from .base import BaseTestCase
+from ..models import Task, Project, User
+from ..suggest_index import SUGGEST_INDEXES, invalidate_suggest_indexes
+
+
+class SuggestSearchTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # індекси живуть у процесі довше за тестову транзакцію
+        invalidate_suggest_indexes(*SUGGEST_INDEXES)
+        for title in ("Перевірка Зварювання", "Зварювання рами", "Зварювання"):
+            Task.objects.create(title=title, creator=self.manager, assignee=self.worker)
+        Project.objects.create(name="Нова лінія", start_date=date.today())
+        User.objects.create_user(
+            username="petrenko",
+            password="pass1234",
+            first_name="Іван",
+            last_name="Петренко",
+            middle_name="Олегович",
+            department=self.department,
+            position=self.position,
+        )
+
+    def test_suggest_tasks_ranks_prefix_matches_first(self):
+        response = self.client_manager.get(reverse('tasks-suggest'), {'title': 'Зварювання'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        titles = [t['label'] for t in response.data]
+        self.assertEqual(titles, ["Зварювання", "Зварювання рами", "Перевірка Зварювання"])
+        print("\nТест 'Підказки задач впорядковані за релевантністю' пройдено успішно")
+
+    def test_suggest_tasks_single_projection_query(self):
+        project = Project.objects.create(name="Нова лінія", start_date=date.today())
+        Task.objects.filter(title="Зварювання").update(project=project)
+        with self.assertNumQueries(1):
+            response = self.client_manager.get(reverse('tasks-suggest'), {'title': 'Зварювання'})
+        task = Task.objects.get(title="Зварювання")
+        self.assertEqual(response.data[0], {'id': task.id, 'label': "Зварювання", 'secondary': "Нова лінія"})
+        self.assertEqual(response.data[1]['secondary'], None)
+        print("\nТест 'Підказки задач одним запитом-проєкцією' пройдено успішно")
+
+    def test_suggest_employees_matches_first_name(self):
+        response = self.client_manager.get(reverse('employees-suggest'), {'name': 'Іван'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [{
+            'id': User.objects.get(username="petrenko").id,
+            'label': "Петренко Іван Олегович",
+            'secondary': "Тестувальник",
+        }])
+
+        response = self.client_manager.get(reverse('employees-suggest'), {'name': 'Петренко Іван'})
+        self.assertEqual(len(response.data), 1)
+        print("\nТест 'Пошук працівника за ім'ям і повним ПІБ' пройдено успішно")
+
+    def test_suggest_project_and_empty_query(self):
+        response = self.client_manager.get(reverse('projects-suggest'), {'name': 'лін'})
+        self.assertEqual([p['label'] for p in response.data], ["Нова лінія"])
+
+        response = self.client_manager.get(reverse('projects-suggest'), {'name': '  '})
+        self.assertEqual(response.data, [])
+        print("\nТест 'Підказки проєктів' пройдено успішно")
+
+
+class SuggestIndexTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        invalidate_suggest_indexes(*SUGGEST_INDEXES)
+        self.project = Project.objects.create(name="Нова лінія", start_date=date.today())
+
+    def test_repeated_suggestions_do_not_hit_database(self):
+        url = reverse('projects-suggest')
+        self.client_manager.get(url, {'name': 'нова'})
+        with self.assertNumQueries(0):
+            response = self.client_manager.get(url, {'name': 'ЛІН'})
+        self.assertEqual(response.data, [{'id': self.project.id, 'label': "Нова лінія", 'secondary': None}])
+        print("\nТест 'Підказки з індексу в пам'яті без запитів до БД' пройдено успішно")
+
+    def test_database_fallback_when_prefix_finds_nothing(self):
+        url = reverse('projects-suggest')
+        self.client_manager.get(url, {'name': 'нова'})
+        # не префікс жодного слова: в індексі збігів немає, пошук у БД (триграми в PostgreSQL)
+        with self.assertNumQueries(1):
+            response = self.client_manager.get(url, {'name': 'інія'})
+        self.assertEqual(response.data, [{'id': self.project.id, 'label': "Нова лінія", 'secondary': None}])
+
+        response = self.client_manager.get(reverse('suggest-positions'), {'name': 'увальн'})
+        self.assertEqual(response.data[0]['secondary'], "Відділ тестування")
+        print("\nТест 'Пошук у БД, якщо за префіксом нічого не знайдено' пройдено успішно")
+
+    def test_index_refreshed_after_commit(self):
+        url = reverse('projects-suggest')
+        self.client_manager.get(url, {'name': 'нова'})
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.create(name="Нова дільниця", start_date=date.today())
+
+        response = self.client_manager.get(url, {'name': 'нова'})
+        self.assertEqual([p['label'] for p in response.data], ["Нова лінія", "Нова дільниця"])
+        print("\nТест 'Оновлення індексу підказок після коміту' пройдено успішно")
+
+    def test_status_only_save_keeps_project_index(self):
+        index = SUGGEST_INDEXES['projects']
+        generation = index._generation
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.status = 'Completed'
+            self.project.save()
+        self.assertEqual(index._generation, generation)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.name = "Стара лінія"
+            self.project.save()
+        self.assertEqual(index._generation, generation + 1)
+        print("\nТест 'Збереження без зміни назви не скидає індекс' пройдено успішно")
+
+    def test_department_rename_refreshes_positions(self):
+        url = reverse('suggest-positions')
+        response = self.client_manager.get(url, {'name': 'тест'})
+        self.assertEqual(response.data[0]['secondary'], "Відділ тестування")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.department.name = "Відділ якості"
+            self.department.save()
+
+        response = self.client_manager.get(url, {'name': 'тест'})
+        self.assertEqual(response.data, [{
+            'id': self.position.id,
+            'label': "Тестувальник",
+            'secondary': "Відділ якості",
+        }])
+        print("\nТест 'Перейменування відділу оновлює підказки посад' пройдено успішно")
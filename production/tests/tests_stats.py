@@ -0,0 +1,143 @@
+import io
+from datetime import date, timedelta
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from .base import BaseTestCase
+from ..models import Department, Position, Project, Task, TaskDailyStats
+
+
+class TaskStatsTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.project = Project.objects.create(name="Складання", start_date=date.today())
+        self.other_department = Department.objects.create(name="Логістика")
+        self.driver = self.create_user("driver", "driver@example.com")
+        self.driver.department = self.other_department
+        self.driver.position = Position.objects.create(name="Водій", department=self.other_department)
+        self.driver.save()
+
+    def snapshot(self):
+        return sorted(
+            (row.dimension, row.key, row.date, row.created, row.completed, row.due, row.overdue)
+            for row in TaskDailyStats.objects.all()
+            if row.created or row.completed or row.due or row.overdue
+        )
+
+    def test_incremental_stats_match_rebuild(self):
+        today = date.today()
+        response = self.client_manager.post(reverse('tasks-list'), {
+            'title': "Збірка рами", 'assignee': self.worker.id, 'project': self.project.id,
+            'due_date': (today + timedelta(days=2)).isoformat(),
+        }, format='json')
+        first = Task.objects.get(pk=response.data['id'])
+        second = Task.objects.create(
+            title="Доставка", creator=self.manager, assignee=self.driver, due_date=today + timedelta(days=5),
+        )
+        doomed = Task.objects.create(title="Зайва", creator=self.manager, assignee=self.worker, project=self.project)
+
+        self.client_manager.patch(
+            reverse('tasks-detail', args=[second.id]),
+            {'project': self.project.id, 'due_date': (today + timedelta(days=1)).isoformat()}, format='json',
+        )
+        self.client_manager.post(reverse('tasks-confirm-complete', args=[first.id]))
+        doomed.delete()
+        self.client_manager.post(reverse('tasks-bulk'), {
+            'create': [{'title': f"Операція {i}", 'assignee': self.driver.id, 'due_date': '2099-01-01'} for i in range(3)],
+            'update': [{'id': second.id, 'assignee': self.worker.id}],
+        }, format='json')
+
+        incremental = self.snapshot()
+        total = TaskDailyStats.objects.get(dimension='total', date=timezone.localdate())
+        self.assertEqual((total.created, total.completed), (5, 1))
+
+        call_command('rebuild_task_stats', stdout=io.StringIO())
+        self.assertEqual(self.snapshot(), incremental)
+        print("\nТест 'Інкрементна денна статистика збігається з перерахунком' пройдено успішно")
+
+    def test_stats_time_series_api(self):
+        start = date(2025, 3, 3)
+        TaskDailyStats.objects.bulk_create([
+            TaskDailyStats(dimension='total', date=start, created=2, completed=1),
+            TaskDailyStats(dimension='total', date=start + timedelta(days=1), created=3),
+            TaskDailyStats(dimension='total', date=start + timedelta(days=15), created=4, due=2, overdue=1),
+            TaskDailyStats(dimension='assignee', key=self.worker.id, date=start, created=1),
+            TaskDailyStats(dimension='assignee', key=self.manager.id, date=start, created=2),
+            TaskDailyStats(dimension='assignee', key=self.driver.id, date=start, created=7),
+        ])
+        url = reverse('tasks-stats')
+        response = self.client_manager.get(url, {
+            'date_from': '2025-03-01', 'date_to': '2025-03-31', 'granularity': 'week',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        series = response.data['series']
+        self.assertEqual(series[0]['period'], date(2025, 2, 24))
+        self.assertEqual(len(series), 6)
+        self.assertEqual([row['created'] for row in series], [0, 5, 0, 4, 0, 0])
+        self.assertEqual(series[3]['overdue'], 1)
+
+        response = self.client_manager.get(url, {
+            'date_from': '2025-01-01', 'date_to': '2025-12-31', 'granularity': 'month',
+            'department': self.department.id,
+        })
+        self.assertEqual(len(response.data['series']), 12)
+        self.assertEqual(response.data['series'][2]['created'], 3)
+
+        # працівник бачить лише власний ряд, хоч би що передав у параметрах
+        for params in [{}, {'assignee': self.driver.id}, {'department': self.other_department.id}]:
+            response = self.client_worker.get(url, {
+                'date_from': '2025-03-01', 'date_to': '2025-03-31', 'granularity': 'month', **params,
+            })
+            self.assertEqual(response.data['series'][0]['created'], 1, params)
+
+        response = self.client_worker.get(url, {'granularity': 'hour'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        print("\nТест 'Часовий ряд статистики задач' пройдено успішно")
+
+    def test_stats_api_rejects_bad_params(self):
+        url = reverse('tasks-stats')
+        for params in [
+            {'date_from': '0001-01-01', 'granularity': 'day'},
+            {'date_from': '0001-01-01', 'granularity': 'year'},
+            {'date_to': '0001-01-01'},
+            {'assignee': 'abc'},
+            {'project': '1.5'},
+            {'department': 'x'},
+        ]:
+            response = self.client_manager.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+        response = self.client_manager.get(url, {'date_from': '1990-01-01', 'granularity': 'month'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        print("\nТест 'Часовий ряд: невірні параметри і завеликий проміжок' пройдено успішно")
+
+    def test_open_task_overdue_only_after_due_date(self):
+        today = timezone.localdate()
+        for due_date in [today - timedelta(days=1), today, today + timedelta(days=3)]:
+            Task.objects.create(title="Відкрита", creator=self.manager, assignee=self.worker, due_date=due_date)
+
+        response = self.client_manager.get(reverse('tasks-stats'), {
+            'date_from': (today - timedelta(days=1)).isoformat(),
+            'date_to': (today + timedelta(days=3)).isoformat(),
+        })
+        series = {row['period']: row for row in response.data['series']}
+        self.assertEqual(series[today - timedelta(days=1)]['overdue'], 1)
+        self.assertEqual(series[today]['overdue'], 0)
+        self.assertEqual(series[today + timedelta(days=3)]['overdue'], 0)
+        self.assertEqual(series[today + timedelta(days=3)]['due'], 1)
+
+        # минув термін — задача прострочена без перерахунку
+        from ..stats import series_rows, time_series
+        later = time_series(series_rows(), today, today + timedelta(days=3), today=today + timedelta(days=4))
+        self.assertEqual([row['overdue'] for row in later], [1, 0, 0, 1])
+        print("\nТест 'Відкрита задача прострочується лише після дня терміну' пройдено успішно")
+
+    def test_dashboard_weekly_tasks_read_stats(self):
+        today = timezone.localdate()
+        TaskDailyStats.objects.create(dimension='total', date=today.replace(day=1), created=6)
+        response = self.client_manager.get(reverse('dashboard-summary'))
+        self.assertEqual(response.data['weekly_tasks'][0]['tasks'], 6)
+        print("\nТест 'Тижні в зведенні читаються з денної статистики' пройдено успішно")
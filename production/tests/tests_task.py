@@ -105,3 +105,294 @@ class TaskTests(BaseTestCase):
         response = client.get(url)
         self.assertIn(response.status_code, [403, 404])
         print("\nТест 'Захист від доступу до чужої задачі для працівника' пройдено успішно")
+
+    def test_task_list_query_count_is_constant(self):
+        url = reverse('tasks-list') + '?expand=comments,files'
+        self.client_manager.get(url)
+        with self.assertNumQueries(3):
+            self.client_manager.get(url)
+
+        for i in range(10):
+            Task.objects.create(title=f"Задача {i}", creator=self.manager, assignee=self.worker)
+        with self.assertNumQueries(3):
+            response = self.client_manager.get(url)
+        self.assertEqual(len(response.data), 11)
+        print("\nТест 'Стала кількість запитів для списку задач' пройдено успішно")
+
+    def test_task_sparse_fieldsets(self):
+        url = reverse('tasks-list')
+        with self.assertNumQueries(1):
+            response = self.client_manager.get(url, {'fields': 'id,title,status'})
+        self.assertEqual(set(response.data[0]), {'id', 'title', 'status'})
+
+        response = self.client_manager.get(url)
+        self.assertNotIn('comments', response.data[0])
+        self.assertNotIn('files', response.data[0])
+        self.assertIn('assignee_name', response.data[0])
+
+        response = self.client_manager.get(url, {'expand': 'comments'})
+        self.assertIn('comments', response.data[0])
+        self.assertNotIn('files', response.data[0])
+        print("\nТест 'Вибіркові поля задач' пройдено успішно")
+
+    def test_save_loaded_task_without_extra_select(self):
+        task = Task.objects.get(pk=self.task.pk)
+        task.title = "Перейменована задача"
+        with self.assertNumQueries(1):
+            task.save()
+
+        task.status = "PendingConfirmation"
+        with self.assertNumQueries(1):
+            task.save(update_fields=['status'])
+        task.refresh_from_db()
+        self.assertEqual(task.status, "PendingConfirmation")
+        print("\nТест 'Збереження задачі без додаткового SELECT' пройдено успішно")
+
+    def test_apply_auto_status_in_bulk(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        future = Task(title="Майбутня", creator=self.manager, assignee=self.worker,
+                      due_date=timezone.now().date() + timedelta(days=5))
+        loaded = Task.objects.get(pk=self.task.pk)
+        manual = Task.objects.get(pk=self.task.pk)
+        manual.status = "PendingConfirmation"
+        with self.assertNumQueries(0):
+            Task.apply_auto_status([future, loaded, manual])
+        self.assertEqual(future.status, "InProgress")
+        self.assertEqual(loaded.status, "Completed")
+        self.assertEqual(manual.status, "PendingConfirmation")
+        print("\nТест 'Пакетне визначення статусу задач' пройдено успішно")
+
+    def test_comment_thread_uses_composite_index(self):
+        from django.contrib.contenttypes.models import ContentType
+        from django.db import connection
+        from ..models import Comments
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            self.skipTest('План запиту перевіряється для SQLite і PostgreSQL')
+
+        thread = Comments.objects.filter(
+            content_type=ContentType.objects.get_for_model(Task), object_id=self.task.id,
+        ).order_by('-created_at', 'id')
+        if connection.vendor == 'postgresql':
+            # на кількох рядках планувальник обрав би seq scan; SET LOCAL діє до відкату тесту
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute('SET LOCAL enable_bitmapscan = off')
+        plan = thread.explain()
+        self.assertIn('comments_object_thread_idx', plan)
+        # порядок дає індекс, без окремого сортування
+        self.assertNotIn('TEMP B-TREE' if connection.vendor == 'sqlite' else 'Sort', plan)
+        print("\nТест 'Гілка коментарів читається за складеним індексом' пройдено успішно")
+
+    def test_bulk_create_update_delete(self):
+        from ..models import Project
+        project = Project.objects.create(name="Проєкт MES", start_date=date.today())
+        doomed = Task.objects.create(title="Зайва", creator=self.manager, assignee=self.worker, project=project)
+        url = reverse('tasks-bulk')
+        data = {
+            'create': [
+                {'title': f"Операція {i}", 'assignee': self.worker.id, 'project': project.id, 'due_date': '2099-01-01'}
+                for i in range(20)
+            ],
+            'update': [{'id': self.task.id, 'assignee': self.manager.id, 'status': 'PendingConfirmation'}],
+            'delete': [doomed.id],
+        }
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.client_manager.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['created']), 20)
+        self.assertEqual(response.data['deleted'], [doomed.id])
+
+        created = Task.objects.filter(pk__in=response.data['created'])
+        self.assertEqual(set(created.values_list('status', flat=True)), {'InProgress'})
+        self.assertEqual(set(created.values_list('creator', flat=True)), {self.manager.id})
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.assignee, self.manager)
+        self.assertEqual(self.task.status, 'PendingConfirmation')
+        self.assertFalse(Task.objects.filter(pk=doomed.id).exists())
+        # зведення скидається один раз, проєкти додаються до єдиного пакета touch_projects
+        from django.db import connection
+        from ..dashboard import DashboardInvalidation
+        from ..signals import ProjectTouchBatch
+        # пакети могли бути зареєстровані ще в setUp (та сама транзакція тесту)
+        pending = set(callbacks) | set(connection.commit_batches.values())
+        self.assertEqual(sum(isinstance(func, DashboardInvalidation) for func in pending), 1)
+        batches = [func for func in pending if isinstance(func, ProjectTouchBatch)]
+        self.assertEqual(len(batches), 1)
+        self.assertIn(project.id, batches[0].project_ids)
+        print("\nТест 'Масові зміни задач' пройдено успішно")
+
+    def test_bulk_is_atomic_and_manager_only(self):
+        url = reverse('tasks-bulk')
+        data = {
+            'create': [{'title': "Добра", 'assignee': self.worker.id}, {'title': "", 'assignee': self.worker.id}],
+            'update': [{'id': 999999, 'title': "Немає"}],
+            'delete': [999998],
+        }
+        response = self.client_manager.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['create'][0], {})
+        self.assertIn('title', response.data['create'][1])
+        self.assertIn('id', response.data['update'][0])
+        self.assertIn('delete', response.data)
+        self.assertFalse(Task.objects.filter(title="Добра").exists())
+
+        response = self.client_worker.post(url, {'create': [{'title': "Робітник", 'assignee': self.worker.id}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        print("\nТест 'Масові зміни задач атомарні і лише для керівника' пройдено успішно")
+
+    def test_bulk_rejects_repeated_update_ids(self):
+        from ..models import TaskDailyStats, TaskStatusTransition
+        url = reverse('tasks-bulk')
+        stats_before = list(TaskDailyStats.objects.values_list('dimension', 'key', 'date', 'due', 'overdue'))
+        response = self.client_manager.post(url, {
+            'update': [{'id': self.task.id, 'due_date': '2099-01-01'}, {'id': self.task.id, 'title': "B"}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('update', response.data)
+        self.task.refresh_from_db()
+        self.assertNotEqual(self.task.title, "B")
+        self.assertFalse(TaskStatusTransition.objects.filter(task=self.task).exists())
+        self.assertEqual(
+            list(TaskDailyStats.objects.values_list('dimension', 'key', 'date', 'due', 'overdue')), stats_before,
+        )
+        print("\nТест 'Масові зміни: повторний id в update відхиляється' пройдено успішно")
+
+    def test_bulk_rejects_update_and_delete_of_same_task(self):
+        response = self.client_manager.post(reverse('tasks-bulk'), {
+            'update': [{'id': self.task.id, 'title': "Оновлена"}],
+            'delete': [self.task.id],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('delete', response.data)
+        self.task.refresh_from_db()
+        self.assertNotEqual(self.task.title, "Оновлена")
+        print("\nТест 'Масові зміни: одна задача в update і delete відхиляється' пройдено успішно")
+
+    def test_export_csv_uses_filters(self):
+        import csv
+        import io
+        other = Task.objects.create(title="Інша", creator=self.manager, assignee=self.manager, priority=3)
+        url = reverse('tasks-export')
+        response = self.client_manager.get(url, {'type': 'csv', 'assignee': self.worker.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertIn('tasks.csv', response['Content-Disposition'])
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0][:3], ['ID', 'Назва', 'Статус'])
+        self.assertEqual([row[0] for row in rows[1:]], [str(self.task.id)])
+        self.assertEqual(rows[1][5], f"{self.worker.last_name} {self.worker.first_name}".strip())
+        self.assertEqual(rows[1][7], '01.06.2025')
+
+        # працівник бачить лише свої задачі
+        response = self.client_worker.get(url)
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        self.assertNotIn(other.title, content)
+        print("\nТест 'Експорт задач у CSV' пройдено успішно")
+
+    def test_export_escapes_formulas(self):
+        import csv
+        import io
+        from openpyxl import load_workbook
+        Task.objects.filter(pk=self.task.pk).update(title='=HYPERLINK("http://evil","x")')
+        Task.objects.create(title="@SUM(A1)", creator=self.manager, assignee=self.worker)
+        Task.objects.create(title="Звичайна - назва", creator=self.manager, assignee=self.worker)
+
+        response = self.client_manager.get(reverse('tasks-export'), {'type': 'csv'})
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        titles = {row[1] for row in list(csv.reader(io.StringIO(content)))[1:]}
+        self.assertEqual(titles, {'\'=HYPERLINK("http://evil","x")', "'@SUM(A1)", "Звичайна - назва"})
+
+        response = self.client_manager.get(reverse('tasks-export'), {'type': 'xlsx'})
+        workbook = load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+        cells = [row[1] for row in workbook['Задачі'].iter_rows(min_row=2)]
+        self.assertIn("'@SUM(A1)", [cell.value for cell in cells])
+        self.assertEqual({cell.data_type for cell in cells}, {'s'})
+        print("\nТест 'Експорт екранує формули' пройдено успішно")
+
+    def test_export_xlsx(self):
+        import io
+        from openpyxl import load_workbook
+        for i in range(30):
+            Task.objects.create(title=f"Рядок <{i}> & \x01", creator=self.manager, assignee=self.worker)
+        response = self.client_manager.get(reverse('tasks-export'), {'type': 'xlsx'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        workbook = load_workbook(io.BytesIO(b''.join(response.streaming_content)), read_only=True)
+        rows = list(workbook['Задачі'].iter_rows(values_only=True))
+        self.assertEqual(len(rows), 32)
+        self.assertEqual(rows[0][1], 'Назва')
+        self.assertIn("Рядок <29> & ", [row[1] for row in rows])
+        self.assertIsInstance(rows[1][0], int)
+
+        response = self.client_manager.get(reverse('tasks-export'), {'type': 'pdf'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        print("\nТест 'Експорт задач у XLSX' пройдено успішно")
+
+    def test_xlsx_export_splits_sheets(self):
+        import io
+        from unittest import mock
+        from openpyxl import load_workbook
+        from ..exports import Column, xlsx_stream
+        rows = ([i, f"рядок {i}"] for i in range(7))
+        with mock.patch('production.exports.XLSX_MAX_ROWS', 3):
+            content = b''.join(xlsx_stream([Column('N', 'n'), Column('Текст', 't')], rows, 'Аркуш'))
+        workbook = load_workbook(io.BytesIO(content))
+        self.assertEqual(workbook.sheetnames, ['Аркуш', 'Аркуш (2)', 'Аркуш (3)'])
+        self.assertEqual([row[0] for row in workbook['Аркуш (3)'].iter_rows(min_row=2, values_only=True)], [6])
+        print("\nТест 'Експорт XLSX ділиться на аркуші' пройдено успішно")
+
+    def test_status_transitions_are_logged(self):
+        from datetime import timedelta
+        from ..models import TaskStatusTransition
+        response = self.client_manager.post(reverse('tasks-list'), {
+            'title': "Фрезерування", 'assignee': self.worker.id,
+            'due_date': (date.today() + timedelta(days=7)).isoformat(),
+        }, format='json')
+        task_id = response.data['id']
+
+        self.client_worker.post(reverse('tasks-submit-complete', args=[task_id]))
+        self.client_manager.post(reverse('tasks-reject-complete', args=[task_id]), {'reason': "Немає фото"}, format='json')
+        self.client_worker.post(reverse('tasks-submit-complete', args=[task_id]))
+        self.client_manager.post(reverse('tasks-confirm-complete', args=[task_id]))
+
+        response = self.client_worker.get(reverse('tasks-history', args=[task_id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row['from_status'], row['to_status']) for row in response.data],
+            [('', 'InProgress'), ('InProgress', 'PendingConfirmation'), ('PendingConfirmation', 'InProgress'),
+             ('InProgress', 'PendingConfirmation'), ('PendingConfirmation', 'Completed')],
+        )
+        self.assertEqual(response.data[2]['reason'], "Немає фото")
+        self.assertEqual(response.data[2]['actor'], self.manager.id)
+        self.assertEqual(set(TaskStatusTransition.objects.values_list('assignee', flat=True)), {self.worker.id})
+
+        response = self.client_manager.get(reverse('tasks-metrics'), {'assignee': self.worker.id})
+        self.assertEqual(response.data['completed'], 1)
+        self.assertEqual(response.data['submitted'], 2)
+        self.assertEqual(response.data['rejection_rate'], 0.5)
+        self.assertIsNotNone(response.data['lead_time'])
+        self.assertIsNotNone(response.data['cycle_time'])
+        for name in ('assignee', 'project'):
+            response = self.client_manager.get(reverse('tasks-metrics'), {name: 'abc'})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        print("\nТест 'Журнал переходів статусів і показники потоку' пройдено успішно")
+
+    def test_bulk_update_logs_transitions_in_one_insert(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from ..models import TaskStatusTransition
+        tasks = Task.objects.bulk_create([
+            Task(title=f"Задача {i}", creator=self.manager, assignee=self.worker, status='InProgress')
+            for i in range(5)
+        ])
+        data = {'update': [{'id': task.id, 'status': 'PendingConfirmation'} for task in tasks]}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client_manager.post(reverse('tasks-bulk'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        inserts = [q['sql'] for q in queries if q['sql'].startswith('INSERT INTO "production_taskstatustransition"')]
+        self.assertEqual(len(inserts), 1)
+        logged = TaskStatusTransition.objects.filter(task__in=tasks)
+        self.assertEqual(logged.count(), 5)
+        self.assertEqual(set(logged.values_list('from_status', 'to_status')), {('InProgress', 'PendingConfirmation')})
+        print("\nТест 'Масове оновлення записує переходи одним запитом' пройдено успішно")
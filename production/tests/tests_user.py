@@ -1,6 +1,10 @@
+from unittest import mock
+
 from rest_framework import status
 from rest_framework.test import APIClient
 from django.urls import reverse
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
 from .base import BaseTestCase
 from django.contrib.auth import get_user_model
 
@@ -67,3 +71,92 @@ class UserTests(BaseTestCase):
         self.worker.refresh_from_db()
         self.assertEqual(self.worker.first_name, "Оновлено")
         print("\nТест 'Менеджер може оновити користувача' пройдено успішно")
+
+
+    def test_delete_employee_with_transition_history(self):
+        """Тест Журнал переходів не заважає видалити працівника"""
+        from ..models import Task, TaskStatusTransition
+        from ..transitions import log_transitions
+        former = self.create_user("former", "former@example.com")
+        task = Task.objects.create(title="Передана", creator=self.manager, assignee=former)
+        log_transitions(self.manager, [(task, None)])
+        # задачу передали іншому, у журналі лишився попередній виконавець
+        Task.objects.filter(pk=task.pk).update(assignee=self.worker)
+
+        response = self.client_manager.delete(reverse('user-detail', args=[former.id]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertTrue(TaskStatusTransition.objects.filter(task=task, assignee__isnull=True).exists())
+
+        # працівника із задачами видалити не можна — 400 замість 500
+        response = self.client_manager.delete(reverse('user-detail', args=[self.worker.id]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        print("\nТест 'Видалення працівника з історією переходів' пройдено успішно")
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class EmployeeImportTests(BaseTestCase):
+
+    def csv_file(self, rows, name='employees.csv'):
+        header = "Прізвище;Ім'я;Email;Відділ;Посада;Роль;Пароль\n"
+        content = header + ''.join(';'.join(row) + '\n' for row in rows)
+        return SimpleUploadedFile(name, content.encode('utf-8-sig'), content_type='text/csv')
+
+    def test_import_csv_reports_row_errors(self):
+        rows = [
+            ["Коваль", "Олена", "olena@plant.ua", "Відділ тестування", "тестувальник", "Керівник", "secret123"],
+            ["Шевчук", "Петро", "petro@plant.ua", "Відділ тестування", "Тестувальник", "", ""],
+            ["Дубль", "Email", "manager@example.com", "Відділ тестування", "Тестувальник", "", ""],
+            ["Без", "Відділу", "nodept@plant.ua", "Склад", "Тестувальник", "", ""],
+            ["Повтор", "Рядка", "petro@plant.ua", "Відділ тестування", "Тестувальник", "", ""],
+        ]
+        # відділи, посади, email, логіни, один INSERT (+ SAVEPOINT/RELEASE) — незалежно від кількості рядків;
+        # пул процесів у веб-воркері не створюється
+        with self.assertNumQueries(7), mock.patch('production.employee_import.ProcessPoolExecutor') as pool:
+            response = self.client_manager.post(
+                reverse('user-import'), {'file': self.csv_file(rows)}, format='multipart',
+            )
+        pool.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([row['row'] for row in response.data['created']], [2, 3])
+        self.assertEqual(
+            {error['row']: set(error['errors']) for error in response.data['errors']},
+            {4: {'email'}, 5: {'department'}, 6: {'email'}},
+        )
+
+        olena = User.objects.get(email="olena@plant.ua")
+        self.assertEqual(olena.role, "Manager")
+        self.assertEqual(olena.position, self.position)
+        self.assertTrue(olena.check_password("secret123"))
+        petro = response.data['created'][1]
+        self.assertTrue(User.objects.get(pk=petro['id']).check_password(petro['password']))
+        print("\nТест 'Імпорт працівників з CSV' пройдено успішно")
+
+    def test_import_xlsx_with_process_pool(self):
+        import io
+        from openpyxl import Workbook
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(["last_name", "first_name", "email", "department", "position", "phone_number"])
+        for i in range(5):
+            sheet.append([f"Працівник {i}", "Тест", f"xlsx{i}@plant.ua", "Відділ тестування", "Тестувальник", 380501234567])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        buffer.seek(0)
+
+        from ..employee_import import import_employees
+        result = import_employees(buffer, 'employees.xlsx', workers=2, batch_size=2)
+        self.assertEqual(len(result.created), 5)
+        self.assertEqual(result.errors, [])
+        user = User.objects.get(email="xlsx4@plant.ua")
+        self.assertEqual(user.phone_number, "380501234567")
+        self.assertTrue(user.check_password(result.created[4]['password']))
+        print("\nТест 'Імпорт працівників з XLSX у пулі процесів' пройдено успішно")
+
+    def test_import_rejects_bad_file(self):
+        url = reverse('user-import')
+        response = self.client_manager.post(url, {'file': SimpleUploadedFile('a.txt', b'x')}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client_manager.post(url, {'file': SimpleUploadedFile('a.csv', b'name;email\n')}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client_worker.post(url, {'file': self.csv_file([])}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        print("\nТест 'Імпорт працівників: невірний файл' пройдено успішно")
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import TaskStatusTransition
+
+
+def log_transitions(actor, changes, reason=''):
+    """
+    Записує переходи статусів одним bulk_create. changes — пари (task, попередній статус)
+    після збереження задач; None як попередній статус — задачу щойно створено.
+    Пари без зміни статусу пропускаються. Викликати в тій самій транзакції, що й збереження задач.
+    """
+    now = timezone.now()
+    rows = [
+        TaskStatusTransition(
+            task_id=task.pk, assignee_id=task.assignee_id, actor=actor,
+            from_status=from_status or '', to_status=task.status, at=now, reason=reason,
+        )
+        for task, from_status in changes
+        if from_status != task.status
+    ]
+    return TaskStatusTransition.objects.bulk_create(rows, batch_size=settings.TASK_BULK_BATCH_SIZE)
+
+
+def flow_metrics(transitions):
+    """
+    Показники потоку задач за вибіркою переходів одним агрегатним запитом:
+    lead time — від створення задачі до підтвердження, cycle time — від першого переходу
+    в роботу до підтвердження, частка відхилених подань на підтвердження.
+    """
+    started = (
+        TaskStatusTransition.objects
+        .filter(task=OuterRef('task'), to_status='InProgress')
+        .order_by('at')
+        .values('at')[:1]
+    )
+    completed = Q(to_status='Completed')
+    metrics = transitions.aggregate(
+        completed=Count('id', filter=completed),
+        submitted=Count('id', filter=Q(to_status='PendingConfirmation')),
+        rejected=Count('id', filter=Q(from_status='PendingConfirmation', to_status='InProgress')),
+        lead_time=Avg(
+            ExpressionWrapper(F('at') - F('task__created_at'), output_field=DurationField()), filter=completed,
+        ),
+        cycle_time=Avg(
+            ExpressionWrapper(F('at') - Subquery(started), output_field=DurationField()), filter=completed,
+        ),
+    )
+    metrics['rejection_rate'] = (
+        round(metrics['rejected'] / metrics['submitted'], 3) if metrics['submitted'] else 0
+    )
+    return metrics
@@ -4,12 +4,15 @@ from .views import (CustomTokenView, ProfileView,
                     PositionViewSet, DepartmentViewSet,
                     EmployeeViewSet, ProjectViewSet,
                     ProjectCommentViewSet, AttachmentViewSet,
-                    TaskViewSet, TaskCommentViewSet,
+                    TaskViewSet, TaskCommentViewSet, ReportViewSet,
                     suggest_positions, suggest_departments,
                     suggest_employees, suggest_project,
                     suggest_employees_filtered, my_tasks,
                     unread_notifications, dashboard_summary,
-                    suggest_tasks)
+                    dashboard_summary_stats, employee_performance, task_metrics, task_stats, suggest_tasks,
+                    notification_stream, notification_stream_ticket, notification_count,
+                    AttachmentUploadView, AttachmentUploadDetailView,
+                    finalize_attachment_upload)
 
 router = DefaultRouter()
 router.register(r'positions',       PositionViewSet,            basename='position')
@@ -20,6 +23,7 @@ router.register(r'project-comments',ProjectCommentViewSet,      basename='projec
 router.register(r'task-comments',   TaskCommentViewSet,         basename='task-comments')
 router.register(r'attachments',     AttachmentViewSet)
 router.register(r'tasks',           TaskViewSet,                basename='tasks')
+router.register(r'reports',         ReportViewSet,              basename='report')
 
 urlpatterns = [
     path('api/token/',              CustomTokenView.as_view(),  name='token_obtain_pair'),
@@ -32,8 +36,18 @@ urlpatterns = [
     path('employees/filtered/',     suggest_employees_filtered, name='suggest-employees-filtered'),
     path('tasks/my/',               my_tasks,                   name='my-tasks'),
     path('notifications/unread/',   unread_notifications,       name='unread-notifications'),
+    path('notifications/stream/',   notification_stream,        name='notification-stream'),
+    path('notifications/stream/ticket/', notification_stream_ticket, name='notification-stream-ticket'),
+    path('notifications/count/',    notification_count,         name='notification-count'),
     path('dashboard/summary/',      dashboard_summary,          name='dashboard-summary'),
+    path('dashboard/summary/stats/',dashboard_summary_stats,    name='dashboard-summary-stats'),
+    path('performance/',            employee_performance,       name='employee-performance'),
     path('tasks/suggest/',          suggest_tasks,              name='tasks-suggest'),
+    path('tasks/metrics/',          task_metrics,               name='tasks-metrics'),
+    path('tasks/stats/',            task_stats,                 name='tasks-stats'),
+    path('attachments/uploads/',    AttachmentUploadView.as_view(), name='attachment-upload'),
+    path('attachments/uploads/<uuid:pk>/', AttachmentUploadDetailView.as_view(), name='attachment-upload-detail'),
+    path('attachments/uploads/<uuid:pk>/finalize/', finalize_attachment_upload, name='attachment-upload-finalize'),
     
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,5 +1,15 @@
-from django.shortcuts import render
-from rest_framework import viewsets, status
+import io
+import os
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import ProtectedError
+from django.http import FileResponse, Http404
+from django.utils import timezone
+from django.shortcuts import render, get_object_or_404
+from rest_framework import viewsets, status, mixins
 from rest_framework.views import APIView
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
@@ -10,6 +20,23 @@ from .serializers import CustomTokenObtainPairSerializer
 from django.contrib.contenttypes.models import ContentType
 from rest_framework.exceptions import ValidationError
 from .permissions import IsManagerOrReadOnly
+from .pagination import CreatedAtCursorPagination, DateJoinedCursorPagination
+from .notifications import (get_recipient_ids, dispatch_task_notifications,
+                            mark_task_notifications_read, delete_task_notifications,
+                            get_unread_count)
+from .streams import stream_events, issue_stream_ticket, redeem_stream_ticket
+from .search import (ranked_search, employee_name_expression, suggestion,
+                     employee_suggestion, EMPLOYEE_SUGGESTION_FIELDS)
+from .suggest_index import search_suggestions
+from .attachments import (append_chunk, finalize_upload, discard_upload, download_response, preview_response,
+                          attach_existing_blob, UploadError, UploadOffsetMismatch)
+from .task_bulk import bulk_save_tasks
+from .employee_import import import_employees, EmployeeImportError
+from .exports import export_response, TASK_EXPORT_COLUMNS, PROJECT_EXPORT_COLUMNS
+from .reports import request_report
+from .performance import complete_task, performance_summary
+from .transitions import log_transitions, flow_metrics
+from .stats import GRANULARITIES, MAX_SERIES_PERIODS, period_count, series_rows, time_series
 
 
 from .serializers import (
@@ -17,10 +44,13 @@ from .serializers import (
     PositionSerializer, DepartmentSerializer,
     EmployeeSerializer, ProjectSerializer,
     TaskSerializer, CommentSerializer,
-    AttachmentSerializer, TaskNotificationSerializer
+    AttachmentSerializer, TaskNotificationSerializer,
+    TaskListSerializer, ProjectListSerializer, BulkUpdateListSerializer,
+    ReportSerializer, TaskStatusTransitionSerializer
 )
 
-from .models import Position, Department, Project, Task, Comments, Attachment, TaskNotification
+from .models import (Position, Department, Project, Task, Comments, Attachment, AttachmentUpload,
+                     TaskNotification, Report, EmployeePerformance, TaskStatusTransition)
 from .permissions import IsManagerOrReadOnly
 from django.contrib.auth import get_user_model
 
@@ -68,9 +98,37 @@ class DepartmentViewSet(viewsets.ModelViewSet):
         return queryset
 
 
+class ExportMixin:
+    """
+    GET <список>/export/?type=csv|xlsx — ті самі фільтри, що й get_queryset,
+    лише колонки export_columns, потокова відповідь.
+    """
+    export_columns = ()
+    export_filename = 'export'
+    export_title = 'Експорт'
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        file_format = request.query_params.get('type', 'csv')
+        try:
+            return export_response(
+                self.get_queryset(), self.export_columns,
+                self.export_filename, file_format, self.export_title,
+            )
+        except ValueError:
+            raise ValidationError({'type': 'Підтримуються csv і xlsx'})
+
+
 class EmployeeViewSet(viewsets.ModelViewSet):
     serializer_class = EmployeeSerializer
     permission_classes = [IsManagerOrReadOnly]
+    pagination_class = DateJoinedCursorPagination
+
+    def destroy(self, request, *args, **kwargs):
+        try:
+            return super().destroy(request, *args, **kwargs)
+        except ProtectedError:
+            return Response({'detail': 'Неможливо видалити працівника: за ним є задачі'}, status=400)
 
     def get_queryset(self):
         qs = User.objects.all().order_by('-date_joined')
@@ -99,13 +157,37 @@ class EmployeeViewSet(viewsets.ModelViewSet):
         if joined_to:
             qs = qs.filter(date_joined__date__lte=joined_to)
 
-        return qs
+        serializer = self.get_serializer()
+        return serializer.setup_eager_loading(qs, serializer.fields)
+
+    @action(detail=False, methods=['post'], url_path='import', url_name='import')
+    def import_file(self, request):
+        """
+        Імпорт працівників з CSV/XLSX (поле file). Рядки з помилками пропускаються
+        і повертаються в errors; для створених — логін і пароль.
+        Паролі хешуються в процесі запиту (без пулу процесів); великі файли — командою import_employees.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': 'Файл не передано'})
+        try:
+            result = import_employees(upload, upload.name)
+        except EmployeeImportError as exc:
+            raise ValidationError({'file': str(exc)})
+        return Response({
+            'created': result.created,
+            'errors': result.errors,
+        }, status=status.HTTP_201_CREATED if result.created else status.HTTP_200_OK)
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(ExportMixin, viewsets.ModelViewSet):
     queryset = Project.objects.all()
     serializer_class = ProjectSerializer
     permission_classes = [IsManagerOrReadOnly]
+    pagination_class = CreatedAtCursorPagination
+    export_columns = PROJECT_EXPORT_COLUMNS
+    export_filename = 'projects'
+    export_title = 'Проєкти'
 
     def get_queryset(self):
         qs = super().get_queryset().order_by('-created_at')
@@ -133,7 +215,13 @@ class ProjectViewSet(viewsets.ModelViewSet):
         if start_to:
             qs = qs.filter(start_date__lte=start_to)
 
-        return qs
+        serializer = self.get_serializer()
+        return serializer.setup_eager_loading(qs, serializer.fields)
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ProjectListSerializer
+        return super().get_serializer_class()
 
     def perform_create(self, serializer):
         serializer.save(last_modified_by=self.request.user)
@@ -159,10 +247,14 @@ class ProjectViewSet(viewsets.ModelViewSet):
         return Response({'status': 'completed'})
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(ExportMixin, viewsets.ModelViewSet):
     queryset = Task.objects.all().order_by('-created_at')
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated, IsManagerOrReadOnly]
+    pagination_class = CreatedAtCursorPagination
+    export_columns = TASK_EXPORT_COLUMNS
+    export_filename = 'tasks'
+    export_title = 'Задачі'
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -215,10 +307,98 @@ class TaskViewSet(viewsets.ModelViewSet):
         if user.role == "Worker":
             qs = qs.filter(assignee=user)  # тільки задачі, призначені цьому працівнику
 
-        return qs
+        serializer = self.get_serializer()
+        return serializer.setup_eager_loading(qs, serializer.fields)
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return TaskListSerializer
+        return super().get_serializer_class()
 
     def perform_create(self, serializer):
-        serializer.save(creator=self.request.user)
+        with transaction.atomic():
+            task = serializer.save(creator=self.request.user)
+            log_transitions(self.request.user, [(task, None)])
+
+    def perform_update(self, serializer):
+        from_status = serializer.instance.status
+        with transaction.atomic():
+            task = serializer.save()
+            log_transitions(self.request.user, [(task, from_status)])
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Масове створення, часткове оновлення і видалення задач однією транзакцією:
+        {"create": [{...}], "update": [{"id": 1, ...}], "delete": [2, 3]}.
+        Якщо хоч один елемент не пройшов перевірку, нічого не змінюється.
+        """
+        if not isinstance(request.data, dict):
+            raise ValidationError('Очікується об\'єкт з полями create, update, delete')
+        create = request.data.get('create') or []
+        update = request.data.get('update') or []
+        delete = request.data.get('delete') or []
+        if not all(isinstance(items, list) for items in (create, update, delete)):
+            raise ValidationError('create, update і delete мають бути списками')
+        if len(create) + len(update) + len(delete) > settings.TASK_BULK_MAX_ITEMS:
+            raise ValidationError(f'Не більше {settings.TASK_BULK_MAX_ITEMS} задач за запит')
+
+        try:
+            delete_ids = [int(pk) for pk in delete]
+        except (TypeError, ValueError):
+            raise ValidationError({'delete': 'Очікуються id задач'})
+
+        update_ids = [item.get('id') for item in update if isinstance(item, dict)]
+        known_ids = [int(pk) for pk in update_ids if str(pk).isdigit()]
+        # одна задача двічі — подвійні переходи й прирости статистики
+        repeated = sorted(pk for pk, count in Counter(known_ids).items() if count > 1)
+        if repeated:
+            raise ValidationError({'update': [f'Задача {pk} вказана кілька разів' for pk in repeated]})
+        conflicting = sorted(set(known_ids) & set(delete_ids))
+        if conflicting:
+            raise ValidationError({'delete': [f'Задача {pk} є і в update' for pk in conflicting]})
+
+        context = self.get_serializer_context()
+        errors = {}
+        create_serializer = TaskSerializer(data=create, many=True, context=context)
+        if not create_serializer.is_valid():
+            errors['create'] = create_serializer.errors
+
+        instances = Task.objects.in_bulk(known_ids)
+        update_serializer = BulkUpdateListSerializer(
+            instances, data=update, partial=True, context=context,
+            child=TaskSerializer(partial=True, context=context),
+        )
+        if not update_serializer.is_valid():
+            errors['update'] = update_serializer.errors
+
+        missing = set(delete_ids) - set(Task.objects.filter(pk__in=delete_ids).values_list('pk', flat=True))
+        if missing:
+            errors['delete'] = [f'Задачу {pk} не знайдено' for pk in sorted(missing)]
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        created, updated, deleted = bulk_save_tasks(
+            request.user,
+            create=create_serializer.validated_data,
+            update=[
+                (instances[int(item['id'])], data)
+                for item, data in zip(update, update_serializer.validated_data)
+            ],
+            delete=delete_ids,
+        )
+        return Response({
+            'created': [task.pk for task in created],
+            'updated': [task.pk for task in updated],
+            'deleted': deleted,
+        })
+
+    @action(detail=True, methods=['get'])
+    def history(self, request, pk=None):
+        """Переходи статусів задачі в хронологічному порядку."""
+        task = self.get_object()
+        transitions = task.transitions.select_related('actor').order_by('at', 'id')
+        return Response(TaskStatusTransitionSerializer(transitions, many=True).data)
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def mark_done(self, request, pk=None):
@@ -239,19 +419,17 @@ class TaskViewSet(viewsets.ModelViewSet):
         if task.status == 'Completed':
             return Response({'detail': 'Задача вже підтверджена'}, status=400)
         
-        managers = User.objects.filter(role='Manager')
-        if not managers.exists():
+        recipient_ids = get_recipient_ids(task.assignee.department_id)
+        if not recipient_ids:
             return Response({'detail': 'Керівників не знайдено'}, status=400)
 
-        for manager in managers:
-            TaskNotification.objects.create(
-                task=task,
-                sender=request.user,
-                recipient=manager,
-            )
+        dispatch_task_notifications(task, request.user, recipient_ids)
 
-        task.status = 'PendingConfirmation'
-        task.save(update_fields=['status'])
+        from_status = task.status
+        with transaction.atomic():
+            task.status = 'PendingConfirmation'
+            task.save(update_fields=['status'])
+            log_transitions(request.user, [(task, from_status)])
 
         return Response({'status': 'submitted на підтвердження'})
     
@@ -263,34 +441,36 @@ class TaskViewSet(viewsets.ModelViewSet):
         if not request.user.groups.filter(name='Manager').exists():
             return Response({'detail': 'Лише керівник може підтвердити'}, status=403)
 
-        task.status = 'Completed'
-        task.save(update_fields=['status'])
+        complete_task(task, request.user)
 
-        TaskNotification.objects.filter(task=task).update(is_read=True)
+        mark_task_notifications_read(task)
 
         return Response({'status': 'confirmed'})
     
     @action(detail=True, methods=['post'], url_path='confirm-complete')
     def confirm_complete(self, request, pk=None):
         task = self.get_object()
-        task.status = 'Completed'
-        task.save()
+        complete_task(task, request.user)
 
         # видалити всі сповіщення про задачу
-        TaskNotification.objects.filter(task=task).delete()
+        delete_task_notifications(task)
 
         return Response({'status': 'confirmed'}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'], url_path='reject-complete')
     def reject_complete(self, request, pk=None):
         task = self.get_object()
+        if task.status == 'Completed':
+            return Response({'detail': 'Задача вже підтверджена'}, status=400)
         reason = request.data.get('reason', '')
-        task.status = 'InProgress'
-        task.save()
+        from_status = task.status
+        with transaction.atomic():
+            task.status = 'InProgress'
+            task.save()
+            log_transitions(request.user, [(task, from_status)], reason=reason)
 
-        TaskNotification.objects.filter(task=task).delete()
+        delete_task_notifications(task)
 
-        # можна зберегти reason в окрему модель або лог
         return Response({'status': 'rejected', 'reason': reason}, status=status.HTTP_200_OK)
         
 from rest_framework.permissions import IsAuthenticated
@@ -302,6 +482,7 @@ class ProjectCommentViewSet(viewsets.ModelViewSet):
     queryset = Comments.objects.all()
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
         from django.contrib.contenttypes.models import ContentType
@@ -318,6 +499,7 @@ class ProjectCommentViewSet(viewsets.ModelViewSet):
 class TaskCommentViewSet(viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
         task_type = ContentType.objects.get_for_model(Task)
@@ -327,7 +509,7 @@ class TaskCommentViewSet(viewsets.ModelViewSet):
             return Comments.objects.filter(
                 content_type=task_type,
                 object_id=object_id
-            ).order_by('-created_at')
+            ).order_by('-created_at', 'id')
 
         return Comments.objects.filter(content_type=task_type)
 
@@ -339,6 +521,20 @@ class TaskCommentViewSet(viewsets.ModelViewSet):
         content_type = ContentType.objects.get_for_model(Task)
         serializer.save(author=self.request.user, content_type=content_type)
 
+def _attachment_content_type(data):
+    model = data.get('content_type_model')
+    app = data.get('content_type_app')
+    object_id = data.get('object_id')
+
+    if not all([model, app, object_id]):
+        raise ValidationError('Missing required fields')
+
+    try:
+        return ContentType.objects.get(app_label=app, model=model), object_id
+    except ContentType.DoesNotExist:
+        raise ValidationError('Invalid content_type')
+
+
 class AttachmentViewSet(viewsets.ModelViewSet):
     queryset = Attachment.objects.all()
     serializer_class = AttachmentSerializer
@@ -347,17 +543,7 @@ class AttachmentViewSet(viewsets.ModelViewSet):
     def create(self, request, *args, **kwargs):
         # print("🔹 Incoming data:", request.data)
 
-        model = request.data.get('content_type_model')
-        app = request.data.get('content_type_app')
-        object_id = request.data.get('object_id')
-
-        if not all([model, app, object_id]):
-            raise ValidationError('Missing required fields')
-
-        try:
-            ct = ContentType.objects.get(app_label=app, model=model)
-        except ContentType.DoesNotExist:
-            raise ValidationError('Invalid content_type')
+        ct, object_id = _attachment_content_type(request.data)
 
         # створюємо змінювану копію request.data
         data = request.data.copy()
@@ -371,16 +557,137 @@ class AttachmentViewSet(viewsets.ModelViewSet):
 
         serializer.save(uploaded_by=request.user)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
-    
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        return download_response(request, self.get_object())
+
+    @action(detail=True, methods=['get'])
+    def thumbnail(self, request, pk=None):
+        return preview_response(request, self.get_object(), 'thumbnail')
+
+    @action(detail=True, methods=['get'])
+    def preview(self, request, pk=None):
+        return preview_response(request, self.get_object(), 'preview')
+
+
+class ReportViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.ListModelMixin,
+                    mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    Звіти поточного користувача. POST лише ставить формування в чергу (202) —
+    стан видно в status, готовий файл віддає download.
+    """
+    serializer_class = ReportSerializer
+    permission_classes = [IsAuthenticated, IsManagerOrReadOnly]
+
+    def get_queryset(self):
+        return Report.objects.filter(created_by=self.request.user).order_by('-created_at', '-id')
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        report = request_report(created_by=request.user, **serializer.validated_data)
+        return Response(self.get_serializer(report).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        report = self.get_object()
+        if report.status != 'ready' or not report.file:
+            raise Http404('Звіт ще не сформовано')
+        extension = os.path.splitext(report.file.name)[1]
+        return FileResponse(report.file.open('rb'), as_attachment=True, filename=f'{report.title}{extension}')
+
+
+def _upload_state(upload):
+    return {'id': upload.id, 'filename': upload.filename, 'size': upload.size, 'offset': upload.offset}
+
+
+class AttachmentUploadView(APIView):
+    """
+    Поблочне завантаження великих файлів:
+    POST uploads/ -> PUT uploads/<id>/ (заголовок Upload-Offset, тіло — байти частини)
+    -> POST uploads/<id>/finalize/. GET uploads/<id>/ повертає offset для продовження.
+    Якщо у POST передано sha256 і size вмісту, що вже є у сховищі, вкладення
+    створюється одразу і повертається як {"attachment": ...}.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        ct, object_id = _attachment_content_type(request.data)
+        filename = os.path.basename(request.data.get('filename') or '')
+        if not filename:
+            raise ValidationError('Missing filename')
+        size = request.data.get('size')
+        try:
+            size = int(size) if size not in (None, '') else None
+        except (TypeError, ValueError):
+            raise ValidationError('Invalid size')
+
+        fields = dict(
+            description=request.data.get('description', ''),
+            uploaded_by=request.user,
+            content_type=ct,
+            object_id=object_id,
+        )
+        sha256 = request.data.get('sha256')
+        if sha256 and size is not None:
+            attachment = attach_existing_blob(sha256, size, filename, **fields)
+            if attachment is not None:
+                serializer = AttachmentSerializer(attachment, context={'request': request})
+                return Response({'attachment': serializer.data}, status=status.HTTP_201_CREATED)
+
+        upload = AttachmentUpload.objects.create(filename=filename, size=size, **fields)
+        return Response(_upload_state(upload), status=status.HTTP_201_CREATED)
+
+
+class AttachmentUploadDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        upload = get_object_or_404(AttachmentUpload, pk=pk, uploaded_by=request.user)
+        return Response(_upload_state(upload))
+
+    def put(self, request, pk):
+        try:
+            offset = int(request.headers['Upload-Offset'])
+        except (KeyError, ValueError):
+            raise ValidationError('Missing Upload-Offset header')
+        try:
+            # тіло читається потоком, request.data не чіпаємо
+            upload = append_chunk(pk, request.user, offset, request.stream or io.BytesIO())
+        except AttachmentUpload.DoesNotExist:
+            raise Http404
+        except UploadOffsetMismatch as e:
+            return Response({'detail': str(e), 'offset': e.offset}, status=status.HTTP_409_CONFLICT)
+        except UploadError as e:
+            return Response({'detail': str(e), 'offset': e.offset}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(_upload_state(upload))
+
+    def delete(self, request, pk):
+        upload = get_object_or_404(AttachmentUpload, pk=pk, uploaded_by=request.user)
+        discard_upload(upload)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def finalize_attachment_upload(request, pk):
+    try:
+        attachment = finalize_upload(pk, request.user)
+    except AttachmentUpload.DoesNotExist:
+        raise Http404
+    except UploadError as e:
+        return Response({'detail': str(e), 'offset': e.offset}, status=status.HTTP_400_BAD_REQUEST)
+    serializer = AttachmentSerializer(attachment, context={'request': request})
+    return Response(serializer.data, status=status.HTTP_201_CREATED)
+
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def suggest_positions(request):
     name_query = request.GET.get('name', '')
     if name_query:
-        positions = Position.objects.filter(name__icontains=name_query)[:10]
-        data = PositionSerializer(positions, many=True).data
-        return Response(data)
+        return Response(search_suggestions('positions', name_query))
     return Response([])
 
 
@@ -389,9 +696,7 @@ def suggest_positions(request):
 def suggest_departments(request):
     name_query = request.GET.get('name', '')
     if name_query:
-        qs = Department.objects.filter(name__icontains=name_query)[:10]
-        data = DepartmentSerializer(qs, many=True).data
-        return Response(data)
+        return Response(search_suggestions('departments', name_query))
     return Response([])
 
 
@@ -400,15 +705,8 @@ def suggest_departments(request):
 def suggest_employees(request):
     q = request.GET.get('name', '')
     if q:
-        qs = User.objects.filter(last_name__icontains=q)[:10]
-        data = [
-            {
-                'id': u.id,
-                'full_name': f"{u.last_name} {u.first_name} {u.middle_name or ''}".strip()
-            }
-            for u in qs
-        ]
-        return Response(data)
+        rows = ranked_search(User.objects.values(*EMPLOYEE_SUGGESTION_FIELDS), employee_name_expression(), q)
+        return Response([employee_suggestion(row) for row in rows])
     return Response([])
 
 
@@ -418,27 +716,25 @@ def suggest_project(request):
     q = request.query_params.get('name', '').strip()
     if not q:
         return Response([])
-    matches = Project.objects.filter(name__icontains=q)[:10]
-    return Response([{'id': p.id, 'name': p.name} for p in matches])
+    return Response(search_suggestions('projects', q))
 
 @api_view(['GET'])
 def suggest_employees_filtered(request):
     dept = request.GET.get('department')
     pos  = request.GET.get('position')
 
-    qs = User.objects.all()
+    qs = User.objects.values(*EMPLOYEE_SUGGESTION_FIELDS).order_by('last_name', 'first_name')
     if dept:
         qs = qs.filter(department_id=dept)
     if pos:
         qs = qs.filter(position_id=pos)
 
-    data = [{'id': u.id, 'name': f"{u.last_name} {u.first_name}"} for u in qs]
-    return Response(data)
+    return Response([employee_suggestion(row) for row in qs])
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def my_tasks(request):
-    tasks = Task.objects.filter(assignee=request.user)
+    tasks = TaskSerializer.setup_eager_loading(Task.objects.filter(assignee=request.user))
     serializer = TaskSerializer(tasks, many=True)
     return Response(serializer.data)
 
@@ -450,72 +746,185 @@ def unread_notifications(request):
                                  .order_by('-created_at')
     return Response(TaskNotificationSerializer(qs, many=True).data)
 
-from django.db.models import Count, Q
-from datetime import datetime, timedelta
-from django.utils import timezone
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def notification_count(request):
+    return Response({'unread': get_unread_count(request.user.id)})
+
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+STREAM_UNAVAILABLE = 'Потік сповіщень доступний лише під ASGI-сервером; опитуйте notifications/count/'
+
+
+def _served_over_asgi(request):
+    # під WSGI нескінченна відповідь зайняла б робочий потік назавжди
+    return hasattr(request, 'scope')
+
+
+def _stream_user_id(request):
+    # EventSource не вміє передавати заголовки, тому браузер передає одноразовий ?ticket=
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        try:
+            return int(AccessToken(header[len('Bearer '):])[jwt_settings.USER_ID_CLAIM])
+        except (TokenError, KeyError, ValueError):
+            return None
+    ticket = request.GET.get('ticket')
+    return redeem_stream_ticket(ticket) if ticket else None
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def notification_stream_ticket(request):
+    """
+    Одноразовий квиток для notifications/stream/?ticket= (діє NOTIFICATIONS_STREAM_TICKET_TTL секунд).
+    Клієнт бере новий квиток перед кожним підключенням. 503 — сервер працює під WSGI.
+    """
+    if not _served_over_asgi(request):
+        return Response({'detail': STREAM_UNAVAILABLE}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return Response({'ticket': issue_stream_ticket(request.user.id)})
+
+
+async def notification_stream(request):
+    """
+    SSE-потік нових сповіщень і змін кількості непрочитаних (див. streams.stream_events).
+    Потребує ASGI-сервера (config/asgi.py); під WSGI повертає 503.
+    """
+    if not _served_over_asgi(request):
+        return JsonResponse({'detail': STREAM_UNAVAILABLE}, status=503)
+    user_id = await sync_to_async(_stream_user_id)(request)
+    if user_id is None:
+        return JsonResponse({'detail': 'Необхідна автентифікація'}, status=401)
+
+    response = StreamingHttpResponse(
+        stream_events(user_id, get_unread_count, getattr(settings, 'NOTIFICATIONS_STREAM_KEEPALIVE', 20)),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+from .dashboard import get_dashboard_summary, dashboard_cache_stats
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def dashboard_summary(request):
-    today = timezone.now().date()
-    start_of_month = today.replace(day=1)
+    return Response(get_dashboard_summary())
 
-    tasks = Task.objects.filter(created_at__date__gte=start_of_month)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def dashboard_summary_stats(request):
+    return Response(dashboard_cache_stats())
+
+def _int_param(params, name):
+    try:
+        return int(params[name])
+    except ValueError:
+        raise ValidationError({name: 'Очікується ціле число'})
+
+def _date_range(params, days=30):
+    """?date_from=&date_to= (YYYY-MM-DD); типово — останні days днів."""
+    try:
+        date_to = date.fromisoformat(params['date_to']) if params.get('date_to') else timezone.localdate()
+        date_from = (date.fromisoformat(params['date_from']) if params.get('date_from')
+                     else date_to - timedelta(days=days - 1))
+    except (ValueError, OverflowError):
+        raise ValidationError({'date': 'Очікується дата у форматі YYYY-MM-DD'})
+    return date_from, date_to
 
-    tasks_done = tasks.filter(status='Completed').count()
-    tasks_in_progress = tasks.filter(status='InProgress').count()
-    tasks_overdue = tasks.filter(status='PendingConfirmation', due_date__lt=today).count()
-    
-    uncompleted_tasks_count = tasks.filter(status__in=['InProgress', 'PendingConfirmation']).count()
-    projects = Project.objects.filter(status__in=['InProgress', 'Planned'])
-    projects_progress = []
-    
-    for project in projects:
-        total = Task.objects.filter(project=project).count()
-        completed = Task.objects.filter(project=project, status='Completed').count()
-        percent = round((completed / total * 100), 1) if total > 0 else 0
-        projects_progress.append({
-            'id': project.id,
-            'name': project.name,
-            'percent': percent
-        })
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def employee_performance(request):
+    """
+    Ефективність працівників за період (?date_from=&date_to=, типово останні 30 днів),
+    ?employee= і ?department= для відбору. Читаються лише готові денні рядки EmployeePerformance.
+    Працівник бачить тільки власні показники.
+    """
+    params = request.query_params
+    date_from, date_to = _date_range(params)
+    rows = EmployeePerformance.objects.filter(date__range=(date_from, date_to))
+    if request.user.role != 'Manager':
+        rows = rows.filter(employee=request.user)
+    elif params.get('employee'):
+        rows = rows.filter(employee_id=_int_param(params, 'employee'))
+    if params.get('department'):
+        rows = rows.filter(employee__department_id=_int_param(params, 'department'))
 
-    # Групування по тижнях
-    weekly_tasks = []
-    for i in range(4):
-        week_start = start_of_month + timedelta(weeks=i)
-        week_end = week_start + timedelta(days=6)
-        count = tasks.filter(created_at__date__range=(week_start, week_end)).count()
-        weekly_tasks.append({"week": f"{i+1} тиждень", "tasks": count})
-
-    active_projects = Project.objects.filter(status__in=['InProgress', 'Planned'], start_date__gte=start_of_month).count()
-    completed_projects = Project.objects.filter(status='Completed', end_date__gte=start_of_month).count()
-
-    # Найближчі задачі (до дедлайну менше 7 днів)
-    deadline_threshold = today + timedelta(days=30)
-    upcoming = Task.objects.filter(
-        due_date__lte=deadline_threshold,
-        due_date__gte=today,
-    ).select_related('assignee')
-    upcoming_serialized = TaskSerializer(upcoming, many=True, context={'request': request}).data
+    return Response({
+        'date_from': date_from,
+        'date_to': date_to,
+        'employees': performance_summary(rows),
+        'days': list(rows.order_by('date', 'employee_id').values(
+            'employee', 'date', 'completed_tasks', 'avg_completion_time', 'efficiency_score',
+        )),
+    })
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def task_metrics(request):
+    """
+    Lead time, cycle time і частка відхилених підтверджень за журналом переходів
+    (?date_from=&date_to=, ?assignee=, ?project=). Працівник бачить лише власні задачі.
+    """
+    params = request.query_params
+    date_from, date_to = _date_range(params)
+    start = timezone.make_aware(datetime.combine(date_from, time.min))
+    end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min))
+    transitions = TaskStatusTransition.objects.filter(at__gte=start, at__lt=end)
+    if request.user.role != 'Manager':
+        transitions = transitions.filter(assignee=request.user)
+    elif params.get('assignee'):
+        transitions = transitions.filter(assignee_id=_int_param(params, 'assignee'))
+    if params.get('project'):
+        transitions = transitions.filter(task__project_id=_int_param(params, 'project'))
+    return Response({'date_from': date_from, 'date_to': date_to, **flow_metrics(transitions)})
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def task_stats(request):
+    """
+    Часовий ряд денної статистики задач: ?date_from=&date_to= (типово останні 30 днів),
+    ?granularity=day|week|month|year, ряд — усі задачі або ?project=, ?assignee=, ?department=.
+    Працівник бачить лише ряд власних задач.
+    """
+    params = request.query_params
+    date_from, date_to = _date_range(params)
+    if date_from > date_to:
+        raise ValidationError({'date': 'date_from пізніше за date_to'})
+    granularity = params.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        raise ValidationError({'granularity': f"Підтримуються: {', '.join(GRANULARITIES)}"})
+    if period_count(date_from, date_to, granularity) > MAX_SERIES_PERIODS:
+        raise ValidationError({'date': f'Не більше {MAX_SERIES_PERIODS} періодів; збільште granularity або звузьте проміжок'})
+
+    if request.user.role != 'Manager':
+        rows = series_rows('assignee', request.user.pk)
+    elif params.get('department'):
+        rows = series_rows(department=_int_param(params, 'department'))
+    elif params.get('assignee'):
+        rows = series_rows('assignee', _int_param(params, 'assignee'))
+    elif params.get('project'):
+        rows = series_rows('project', _int_param(params, 'project'))
+    else:
+        rows = series_rows()
     return Response({
-        "tasks_done": tasks_done,
-        "tasks_in_progress": tasks_in_progress,
-        "tasks_overdue": tasks_overdue,
-        "weekly_tasks": weekly_tasks,
-        "active_projects": active_projects,
-        "completed_projects": completed_projects,
-        "upcoming_tasks": upcoming_serialized,
-        "uncompleted_tasks_count": uncompleted_tasks_count,
-        "projects_progress": projects_progress,
+        'date_from': date_from,
+        'date_to': date_to,
+        'granularity': granularity,
+        'series': time_series(rows, date_from, date_to, granularity),
     })
 
 @api_view(['GET'])
 def suggest_tasks(request):
     title_query = request.GET.get('title', '')
     if title_query:
-        tasks = Task.objects.filter(title__icontains=title_query)[:10]
-        serializer = TaskSerializer(tasks, many=True)
-        return Response(serializer.data)
-    return Response([])
\ No newline at end of file
+        rows = ranked_search(Task.objects.values('id', 'title', 'project__name'), 'title', title_query)
+        return Response([suggestion(row['id'], row['title'], row['project__name']) for row in rows])
+    return Response([])